@@ -9,6 +9,14 @@ rhythm_loop_end_time_max = 2000
 arm_speed_min = 30
 arm_speed_max = 200
 
+# [AI FACTORY]
+batched_inference = True  # fuse nets that share an input into one forward pass
+factory_rate = 10  # Hz, default update rate of every net
+nnet_rates = {}  # Hz, per-net overrides e.g. {'core2flow': 5}
+nnet_skip_unchanged = True  # only recompute a net when its input has changed
+nnet_dtype = 'float64'  # 'float64' as trained or 'float32' for faster inference
+nnet_backend = 'torch'  # 'torch' or 'numpy' (runs without importing torch)
+
 # [HARDWARE]
 xarm_connected = True
 
@@ -17,6 +25,12 @@ data_logging = True
 path = "data"
 figsize_xy = (100, 12)
 samplerate = 0.01
+# data_format: 'jsonl' appends records in batches from a writer thread,
+# 'npz' does the same to a sidecar and converts it to compressed columns at the end,
+# 'json' writes the old JSON array
+data_format = 'jsonl'
+data_flush_interval = 1  # seconds between jsonl batch writes
+plot_chunk_rows = 10000  # records read at a time when plotting a session, the plot keeps the min/max per pixel column
 
 # [PLAY PARAMS]
 silence_listener = False
@@ -32,13 +46,23 @@ xarm_y_extents = [-500, 500]
 xarm_z_extents = [55, 1000]
 xarm_irregular_shape_extents = 50
 xarm_fenced = True
+xarm_position_feed = 'report'  # 'report' follows the SDK report callbacks, 'poll' samples at 10 Hz
+xarm_path_submit = 'pipeline'  # shape vertices as one 'pipeline' burst with blend radii, 'arc_lines' via move_arc_lines, or one move per 'vertex'
+xarm_pipeline_depth = 16  # motion commands in flight during a pipelined burst
+xarm_blend_radius = 2  # mm, corner blending between shape vertices
 
 # [SOUND IN]
 mic_sensitivity = 10000
 mic_in_prediction = 0.36
 mic_in_logging = False
+audio_source = 'mic'  # 'mic' or the path of a 16 bit WAV to replay instead
+audio_replay_speed = 1  # replay speed of a WAV source, 0 = as fast as possible
+audio_capture = 'callback'  # 'callback' hands mic frames to the listener thread, 'blocking' reads them on it
 volume_range = [10000, 20000]
 volume_seconds = 4
+incremental_envelope = True  # update the 10 Hz envelope chunk by chunk instead of a 5 sec Hilbert
+record_audio = True  # stream the mic to data/<session>/<session>.wav
+record_audio_per_experiment = False  # start a new wav file in each experiment folder
 
 # [STREAMING]
 stream_list = ['rnd_poetry',
@@ -63,6 +63,8 @@ class Main:
                     if self.first_time_through:
                         self.master_path = Path(f"{MAIN_PATH}/{self.hivemind.session_date}/IMPROV2_block_{repeat-1}_performance_{i+1}_mode_AI")
                         self.makenewdir(self.master_path)
+                        if config.record_audio and config.record_audio_per_experiment:
+                            self.nebula.recorder.rotate(self.master_path / f"audio_{self.hivemind.session_date}.wav")
                 else:
                     self.master_path = None
 
@@ -3,11 +3,14 @@ import logging
 import os
 from datetime import datetime
 from threading import Thread
-from time import sleep
+from time import monotonic_ns, time
 from pathlib import Path
 
 from nebula.hivemind import DataBorg
 from modules.ai_robot_visualiser import AI_visualiser
+from modules.jsonl_writer import JsonlWriter
+from modules.sampler import FixedRateSampler
+from modules.session_log import NpzSessionWriter
 import config
 
 
@@ -25,35 +28,56 @@ class AIRobotDataWriter:
 
         self.hivemind = DataBorg()
         self.samplerate = config.samplerate
+        self.sampler = FixedRateSampler(self.samplerate)
 
-        self.data_file_path = Path(f"{self.ai_robot_path}/AI_Robot_{self.hivemind.session_date}.json")
-        self.data_file = open(self.data_file_path, "a")
-        self.data_file.write("[")
+        self.data_format = config.data_format
+        self.writer = None
+        if self.data_format == 'jsonl':
+            self.data_file_path = Path(f"{self.ai_robot_path}/AI_Robot_{self.hivemind.session_date}.jsonl")
+            self.writer = JsonlWriter(self.data_file_path,
+                                      flush_interval=config.data_flush_interval)
+        elif self.data_format == 'npz':
+            self.data_file_path = Path(f"{self.ai_robot_path}/AI_Robot_{self.hivemind.session_date}.npz")
+            self.writer = NpzSessionWriter(self.data_file_path,
+                                          flush_interval=config.data_flush_interval)
+        else:
+            self.data_file_path = Path(f"{self.ai_robot_path}/AI_Robot_{self.hivemind.session_date}.json")
+            self.data_file = open(self.data_file_path, "a")
+            self.data_file.write("[")
 
 
     def json_update(self):
         """
-        Write a hiveming tic in the json file.
+        Write a hiveming tic in the json file. Each record carries the
+        monotonic time it was sampled at and the hivemind version it was
+        read from.
         """
+        # Read every field from the same version of the hivemind
+        snapshot = self.hivemind.snapshot()
         json_dict = {
-            "date": datetime.now().isoformat(),
-            "master_stream": self.hivemind.thought_train_stream,
-            "mic_in": self.hivemind.mic_in,
-            "rnd_poetry": self.hivemind.rnd_poetry,
-            "audio2eda": self.hivemind.audio2eda,
-            "flow2core": self.hivemind.flow2core,
-            "core2flow": self.hivemind.core2flow,
-            "audio2core": self.hivemind.audio2core,
-            "audio2flow": self.hivemind.audio2flow,
-            "flow2audio": self.hivemind.flow2audio,
-            "eda2flow": self.hivemind.eda2flow,
-            "design decision": self.hivemind.design_decision,
-            "interrupt": self.hivemind.interrupted,
-            "x": self.hivemind.current_robot_x_y_z[0],
-            "y": self.hivemind.current_robot_x_y_z[1],
-            "z": self.hivemind.current_robot_x_y_z[2],
+            "mono_ns": monotonic_ns(),
+            "version": snapshot.version,
+            "master_stream": snapshot.thought_train_stream,
+            "mic_in": snapshot.mic_in,
+            "rnd_poetry": snapshot.rnd_poetry,
+            "audio2eda": snapshot.audio2eda,
+            "flow2core": snapshot.flow2core,
+            "core2flow": snapshot.core2flow,
+            "audio2core": snapshot.audio2core,
+            "audio2flow": snapshot.audio2flow,
+            "flow2audio": snapshot.flow2audio,
+            "eda2flow": snapshot.eda2flow,
+            "design decision": snapshot.design_decision,
+            "interrupt": snapshot.interrupted,
+            "x": snapshot.current_robot_x_y_z[0],
+            "y": snapshot.current_robot_x_y_z[1],
+            "z": snapshot.current_robot_x_y_z[2],
         }
-        json_object = json.dumps(json_dict)
+        if self.writer is not None:
+            # Serialised and written off the sampling thread
+            self.writer.append(time(), json_dict)
+            return
+        json_object = json.dumps({"date": datetime.now().isoformat(), **json_dict})
         self.data_file.write(json_object)
         self.data_file.write(',\n')
 
@@ -61,6 +85,9 @@ class AIRobotDataWriter:
         """
         Terminate the json writer and close file.
         """
+        if self.writer is not None:
+            self.writer.close()
+            return
         self.data_file.seek(self.data_file.tell() - 3, os.SEEK_SET)
         self.data_file.truncate()  # remove ",\n"
         self.data_file.write("]")
@@ -80,9 +107,10 @@ class AIRobotDataWriter:
         Write realtime data from hivemind.
         """
         while self.hivemind.running:
+            self.sampler.wait()
             self.json_update()
-            sleep(self.samplerate)
         logging.info("quitting data writer thread")
+        self.sampler.log_stats("Data writer")
         self.terminate_data_writer()
 
     def process_and_plot(self):
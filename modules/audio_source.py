@@ -0,0 +1,214 @@
+import logging
+import wave
+from time import monotonic, sleep
+
+import numpy as np
+
+import config
+from nebula.buffers import SampleQueue
+
+
+class AudioSource:
+    """
+    Where the Listener gets its audio from. Sources deliver mono int16
+    chunks of a fixed size at a fixed rate.
+    """
+    rate: int = 44100
+    chunk: int = 2**11
+    finished: bool = False
+    """True once a source has no more audio to give"""
+
+    input_overflows: int = 0
+    dropped_samples: int = 0
+
+    def start(self):
+        """
+        Called when the listener starts reading.
+        """
+
+    def stop(self):
+        """
+        Called when the listener stops reading.
+        """
+
+    def read(self):
+        """
+        Next chunk of samples, or None if none is available yet.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Release the device or file.
+        """
+
+
+class PyAudioSource(AudioSource):
+    def __init__(self,
+                 rate: int = 44100,
+                 chunk: int = 2**11,
+                 mode: str = 'callback'):
+        """
+        Live mic input through PyAudio.
+
+        Parameters
+        ----------
+        rate
+            Sample rate in Hz.
+
+        chunk
+            Samples per chunk.
+
+        mode
+            'callback' copies frames into a SampleQueue on the PortAudio
+            thread and read() drains it. 'blocking' calls stream.read on
+            the reading thread.
+        """
+        import pyaudio
+        self._pyaudio = pyaudio
+
+        self.rate = rate
+        self.chunk = chunk
+        self.mode = mode
+        self.input_overflows = 0
+        """Callbacks where PortAudio reported an input overflow"""
+        self.active = False
+
+        if mode == 'callback':
+            # PortAudio thread fills the queue, read() drains it
+            self.capture_queue = SampleQueue(rate * 2, dtype=np.int16)
+            stream_callback = self.capture_callback
+        else:
+            stream_callback = None
+        self.p = pyaudio.PyAudio()
+        self.stream = self.p.open(format=pyaudio.paInt16,
+                                  channels=1,
+                                  rate=rate,
+                                  input=True,
+                                  frames_per_buffer=chunk,
+                                  stream_callback=stream_callback)
+
+    @property
+    def dropped_samples(self) -> int:
+        """
+        Samples lost because the reader fell 2 sec behind.
+        """
+        if self.mode == 'callback':
+            return self.capture_queue.dropped
+        return 0
+
+    def capture_callback(self, in_data, frame_count, time_info, status):
+        """
+        PyAudio stream callback, runs on the PortAudio thread. Only hands
+        the raw frames over, all analysis happens on the reading thread.
+        """
+        if status & self._pyaudio.paInputOverflow:
+            self.input_overflows += 1
+        if self.active:
+            self.capture_queue.put(np.frombuffer(in_data, dtype=np.int16))
+        return None, self._pyaudio.paContinue
+
+    def start(self):
+        if self.mode == 'callback':
+            self.capture_queue.discard()
+        self.active = True
+
+    def stop(self):
+        self.active = False
+
+    def read(self):
+        """
+        Next chunk of mic samples, or None if none arrived within a second.
+        """
+        if self.mode == 'callback':
+            return self.capture_queue.get(self.chunk, timeout=1)
+        return np.frombuffer(self.stream.read(self.chunk,
+                                              exception_on_overflow=False),
+                             dtype=np.int16)
+
+    def close(self):
+        self.stream.stop_stream()
+        self.stream.close()
+        self.p.terminate()
+
+
+class WavFileSource(AudioSource):
+    def __init__(self,
+                 path,
+                 chunk: int = 2**11,
+                 speed: float = 1,
+                 loop: bool = False):
+        """
+        Replays a recorded 16 bit WAV, e.g. a session recording, as if it
+        were the mic. Stereo files are mixed down to mono.
+
+        Parameters
+        ----------
+        path
+            WAV file to replay.
+
+        chunk
+            Samples per chunk.
+
+        speed
+            Replay speed relative to real time. 0 replays as fast as the
+            reader can take it.
+
+        loop
+            Start again from the top at the end of the file instead of
+            finishing.
+        """
+        self.path = path
+        self.chunk = chunk
+        self.speed = speed
+        self.loop = loop
+        self.finished = False
+
+        with wave.open(str(path), 'rb') as f:
+            if f.getsampwidth() != 2:
+                raise ValueError(f"{path} is not 16 bit PCM")
+            self.rate = f.getframerate()
+            frames = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+            channels = f.getnchannels()
+        if channels > 1:
+            frames = frames.reshape(-1, channels).mean(axis=1).astype(np.int16)
+        self.samples = frames
+        self._position = 0
+        self._next_time = None
+        logging.info(f"Replaying {path} at {speed}x")
+
+    def start(self):
+        self._next_time = monotonic()
+
+    def read(self):
+        """
+        Next chunk of the file, paced to the replay speed. Returns None
+        once the file has finished.
+        """
+        if self._position + self.chunk > len(self.samples):
+            if not self.loop or len(self.samples) < self.chunk:
+                self.finished = True
+                return None
+            self._position = 0
+
+        if self.speed:
+            if self._next_time is None:
+                self._next_time = monotonic()
+            self._next_time += self.chunk / self.rate / self.speed
+            wait = self._next_time - monotonic()
+            if wait > 0:
+                sleep(wait)
+
+        data = self.samples[self._position:self._position + self.chunk]
+        self._position += self.chunk
+        return data
+
+
+def make_audio_source() -> AudioSource:
+    """
+    Audio source selected in config: the live mic, or a WAV file to replay.
+    """
+    if config.audio_source == 'mic':
+        return PyAudioSource(mode=config.audio_capture)
+    return WavFileSource(config.audio_source,
+                         speed=config.audio_replay_speed)
@@ -49,8 +49,7 @@ class Conducter:
         gesture_thread.start()
 
         if self.drawbot:
-            position_thread = Thread(target=self.drawbot.get_normalised_position)
-            position_thread.start()
+            self.drawbot.start_position_feed()
             self.drawbot.command_list_main_loop()
 
     def gesture_manager(self):
@@ -317,6 +316,7 @@ class Conducter:
         print('TERMINATING robot and conducter')
         if self.drawbot:
             self.drawbot.clear_commands()
+            self.drawbot.stop_position_feed()
             if self.XARM_CONNECTED:
                 self.drawbot.set_fence_mode(False)
                 self.drawbot.move_gohome()
@@ -0,0 +1,138 @@
+import numpy as np
+
+from modules.session_log import iter_session_chunks
+
+
+class MinMaxDecimator:
+    def __init__(self,
+                 names: list,
+                 buckets: int,
+                 resolution_ns: int = 1_000_000):
+        """
+        Streaming min/max decimation of time series for plotting. Samples
+        are binned by time into at most `buckets` columns, and only the
+        smallest and largest sample of each column is kept, with its time,
+        so spikes survive however many samples share a pixel column. The
+        time range does not need to be known up front: columns start
+        resolution_ns wide and are merged in pairs, doubling their width,
+        whenever the samples run past the last one.
+
+        Parameters
+        ----------
+        names
+            Series to decimate.
+
+        buckets
+            Maximum number of columns, e.g. the plot width in pixels.
+
+        resolution_ns
+            Starting column width in ns.
+        """
+        self.names = list(names)
+        self.buckets = max(2, buckets + buckets % 2)
+        self.width_ns = resolution_ns
+        self.start_ns = None
+        self.samples = 0
+
+        shape = (len(self.names), self.buckets)
+        self._low = np.full(shape, np.nan)
+        self._high = np.full(shape, np.nan)
+        self._low_ns = np.zeros(shape, dtype=np.int64)
+        self._high_ns = np.zeros(shape, dtype=np.int64)
+        self._filled = np.zeros(self.buckets, dtype=bool)
+
+    def add(self, dates_ns, columns: dict):
+        """
+        Fold one chunk of samples in. Chunks must come in time order.
+
+        Parameters
+        ----------
+        dates_ns
+            Sample times in ns, ascending.
+
+        columns
+            Values per series name, the same length as dates_ns.
+        """
+        dates_ns = np.asarray(dates_ns, dtype=np.int64)
+        if not len(dates_ns):
+            return
+        if self.start_ns is None:
+            self.start_ns = int(dates_ns[0])
+        self.samples += len(dates_ns)
+        while (int(dates_ns[-1]) - self.start_ns) // self.width_ns >= self.buckets:
+            self._halve()
+
+        index = (dates_ns - self.start_ns) // self.width_ns
+        starts = np.flatnonzero(np.r_[True, index[1:] != index[:-1]])
+        ends = np.r_[starts[1:], len(index)]
+        segment = np.repeat(np.arange(len(starts)), ends - starts)
+        positions = np.arange(len(index))
+        bucket = index[starts]
+        self._filled[bucket] = True
+
+        for row, name in enumerate(self.names):
+            values = np.asarray(columns[name], dtype=np.float64)
+            low = np.fmin.reduceat(values, starts)
+            high = np.fmax.reduceat(values, starts)
+            # position of the extreme in its segment, the segment start if all NaN
+            low_at = np.maximum.reduceat(np.where(values == low[segment], positions, -1), starts)
+            high_at = np.maximum.reduceat(np.where(values == high[segment], positions, -1), starts)
+            low_ns = dates_ns[np.where(low_at < 0, starts, low_at)]
+            high_ns = dates_ns[np.where(high_at < 0, starts, high_at)]
+
+            take = (low < self._low[row, bucket]) | np.isnan(self._low[row, bucket])
+            self._low[row, bucket] = np.where(take, low, self._low[row, bucket])
+            self._low_ns[row, bucket] = np.where(take, low_ns, self._low_ns[row, bucket])
+            take = (high > self._high[row, bucket]) | np.isnan(self._high[row, bucket])
+            self._high[row, bucket] = np.where(take, high, self._high[row, bucket])
+            self._high_ns[row, bucket] = np.where(take, high_ns, self._high_ns[row, bucket])
+
+    def _halve(self):
+        """
+        Merge the columns in pairs and double their width.
+        """
+        half = self.buckets // 2
+        pairs = (len(self.names), half, 2)
+        filled = self._filled.reshape(half, 2)
+        for values, times, better in [(self._low, self._low_ns, np.less),
+                                      (self._high, self._high_ns, np.greater)]:
+            values_2 = values.reshape(pairs)
+            times_2 = times.reshape(pairs)
+            first_nan = np.isnan(values_2[..., 0]) & ~np.isnan(values_2[..., 1])
+            second = filled[:, 1] & (~filled[:, 0] | better(values_2[..., 1], values_2[..., 0]) | first_nan)
+            values[:, :half] = np.where(second, values_2[..., 1], values_2[..., 0])
+            times[:, :half] = np.where(second, times_2[..., 1], times_2[..., 0])
+            values[:, half:] = np.nan
+        self._filled[:half] = filled.any(axis=1)
+        self._filled[half:] = False
+        self.width_ns *= 2
+
+    def series(self, name: str):
+        """
+        Decimated series: sample times in ns and values, the min and max of
+        every filled column in time order, at most 2 * buckets points.
+        """
+        row = self.names.index(name)
+        filled = self._filled
+        times = np.stack([self._low_ns[row, filled], self._high_ns[row, filled]], axis=1)
+        values = np.stack([self._low[row, filled], self._high[row, filled]], axis=1)
+        order = np.argsort(times, axis=1, kind="stable")
+        return (np.take_along_axis(times, order, axis=1).ravel(),
+                np.take_along_axis(values, order, axis=1).ravel())
+
+
+def decimate_session(path, names: list, buckets: int, chunk_rows: int = 10000):
+    """
+    Read a session log in chunks and min/max decimate the named columns
+    (session_log column names, <name>_codes for the categories).
+
+    Returns
+    -------
+    The MinMaxDecimator, and the category labels per category column.
+    """
+    decimator = MinMaxDecimator(names, buckets)
+    categories = {}
+    for columns in iter_session_chunks(path, chunk_rows):
+        decimator.add(columns["date_ns"], columns)
+        categories = {name: columns[name] for name in columns if name.endswith("_categories")}
+    return decimator, categories
@@ -3,12 +3,13 @@ import math
 import numpy as np
 from enum import Enum
 from random import choice, getrandbits, randrange, uniform
-from threading import Thread
-from time import time, sleep
+from threading import Lock, Thread
+from time import monotonic, time, sleep
 
 from xarm.wrapper.xarm_api import XArmAPI
 
 import config
+from nebula.buffers import RingBuffer
 from nebula.hivemind import DataBorg
 
 
@@ -21,6 +22,89 @@ class Shapes(Enum):
     Line = 5
 
 
+class PathBuilder:
+    def __init__(self,
+                 start,
+                 z: float,
+                 lift: float,
+                 radius: float = 0,
+                 capacity: int = 16):
+        """
+        Collects the vertices of a shape in one (n, 4) array of x, y, z and
+        blend radius, so Drawbot.draw_path can submit the whole shape at
+        once instead of one round trip per vertex.
+
+        Parameters
+        ----------
+        start
+            The (x, y) pen position the path starts from.
+
+        z
+            Drawing height, the pen is on the paper.
+
+        lift
+            Height above z for pen up jumps.
+
+        radius
+            Blend radius of the corners between drawn lines, in mm.
+
+        capacity
+            Initial number of vertices, grows as needed.
+        """
+        self.start = (start[0], start[1])
+        self.z = z
+        self.lift = lift
+        self.radius = radius
+        self._points = np.empty((capacity, 4))
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def vertices(self) -> np.ndarray:
+        """
+        Rows of x, y, z, radius in drawing order.
+        """
+        return self._points[:self.count]
+
+    @property
+    def last(self) -> tuple:
+        if self.count:
+            return tuple(self._points[self.count - 1, :2])
+        return self.start
+
+    def _add(self, x, y, z, radius):
+        if self.count == len(self._points):
+            self._points = np.concatenate([self._points, np.empty_like(self._points)])
+        self._points[self.count] = x, y, z, radius
+        self.count += 1
+
+    def line_to(self, x: float, y: float):
+        """
+        Draw a line to (x, y) with the pen on the paper.
+        """
+        self._add(x, y, self.z, self.radius)
+        return self
+
+    def jump_to(self, x: float, y: float):
+        """
+        Lift the pen, move over to (x, y) and lower the pen. Lifts are not
+        blended.
+        """
+        old_x, old_y = self.last
+        self._add(old_x, old_y, self.z + self.lift, 0)
+        self._add(x, y, self.z + self.lift, 0)
+        self._add(x, y, self.z, 0)
+        return self
+
+    def close(self):
+        """
+        Draw a line back to the start of the path.
+        """
+        return self.line_to(*self.start)
+
+
 class Drawbot(XArmAPI):
     """
     Translation class for xArm control and primitive commands of robot arm.
@@ -96,6 +180,21 @@ class Drawbot(XArmAPI):
         self.z_extents = config.xarm_z_extents
         self.irregular_shape_extents = config.xarm_irregular_shape_extents
 
+        # Rolling 5 sec window of normalised xy at 10 Hz, read by core2flow
+        self.position_feed = config.xarm_position_feed
+        self.position_period = 0.1
+        self.position_window = RingBuffer(50, channels=2)
+        self.position_times = RingBuffer(50)
+        self._next_position_time = 0
+        self._position_lock = Lock()
+
+        # Shapes are submitted as whole paths, see draw_path
+        self.path_submit = config.xarm_path_submit
+        self.pipeline_depth = config.xarm_pipeline_depth
+        self.blend_radius = config.xarm_blend_radius
+        self.path_running = False
+        """True while a path drawn without waiting may still be moving in mode 0"""
+
         self.squares = []
         self.sunbursts = []
         self.irregulars = []
@@ -142,23 +241,84 @@ class Drawbot(XArmAPI):
 
             sleep(0.05)
 
+    def start_position_feed(self):
+        """
+        Start updating the normalised position in the hivemind, either from
+        the SDK's report callbacks or from a polling thread.
+        """
+        self._next_position_time = 0
+        if self.position_feed == 'report':
+            self.register_report_location_callback(self.report_position,
+                                                   report_cartesian=True,
+                                                   report_joints=False)
+        else:
+            position_thread = Thread(target=self.get_normalised_position)
+            position_thread.start()
+
+    def stop_position_feed(self):
+        if self.position_feed == 'report':
+            self.release_report_location_callback(self.report_position)
+
+    def report_position(self, report: dict):
+        """
+        Report location callback, called for every report frame the SDK
+        parses.
+        """
+        self.add_position_sample(report['cartesian'][:3], monotonic())
+
     def get_normalised_position(self):
         while self.hivemind.running:
-            pose = self.position[:3]
+            self.add_position_sample(self.position[:3], monotonic())
+            sleep(self.position_period)
+
+    def add_position_sample(self,
+                            pose,
+                            timestamp: float):
+        """
+        Publish a new robot position. The xyz is published on every sample,
+        the xy window only advances once per position_period so it keeps
+        the 10 Hz rate core2flow was trained on, whatever the report rate.
+
+        Parameters
+        ----------
+        pose
+            x, y, z in mm.
+
+        timestamp
+            time.monotonic() when the pose was received.
+        """
+        norm_xyz = self.normalise_position(pose)
+        with self._position_lock:
+            if timestamp < self._next_position_time:
+                self.hivemind.current_robot_x_y_z = norm_xyz
+                return
 
-            norm_x = ((pose[0] - self.x_extents[0]) / (self.x_extents[1] - self.x_extents[0])) * (1 - 0) + 0
-            norm_y = ((pose[1] - self.y_extents[0]) / (self.y_extents[1] - self.y_extents[0])) * (1 - 0) + 0
-            norm_z = ((pose[2] - self.z_extents[0]) / (self.z_extents[1] - self.z_extents[0])) * (1 - 0) + 0
+            self.position_window.append(norm_xyz[:2])
+            self.position_times.append(timestamp)
+            self._next_position_time += self.position_period
+            if self._next_position_time <= timestamp:
+                # First sample, or reports stopped for a while
+                self._next_position_time = timestamp + self.position_period
 
-            norm_xyz = (norm_x, norm_y, norm_z)
-            norm_xyz = tuple(np.clip(norm_xyz, 0.0, 1.0))
-            norm_xy_2d = np.array(norm_xyz[:2])[:, np.newaxis]
+            # Snapshots must not change under readers, so publish copies
+            self.hivemind.publish(current_robot_x_y_z=norm_xyz,
+                                  current_robot_x_y=self.position_window.view().copy(),
+                                  current_robot_x_y_times=self.position_times.view().copy())
 
-            self.hivemind.current_robot_x_y_z = norm_xyz
-            self.hivemind.current_robot_x_y = np.append(self.hivemind.current_robot_x_y, norm_xy_2d, axis=1)
-            self.hivemind.current_robot_x_y = np.delete(self.hivemind.current_robot_x_y, 0, axis=1)
+    def normalise_position(self,
+                           pose) -> tuple:
+        """
+        Scale a cartesian pose to 0.0 - 1.0 within the drawing extents.
 
-            sleep(0.1)
+        Parameters
+        ----------
+        pose
+            x, y, z in mm.
+        """
+        return tuple(min(max((coord - low) / (high - low), 0.0), 1.0)
+                     for coord, (low, high) in zip(pose, (self.x_extents,
+                                                          self.y_extents,
+                                                          self.z_extents)))
 
     def safety_position_check(self,
                               pose: tuple) -> tuple:
@@ -314,6 +474,7 @@ class Drawbot(XArmAPI):
         coordinates.
         """
         logging.info('Arc / circle')
+        self.end_path()
         self.move_circle(pose1=pose1,
                          pose2=pose2,
                          percent=percent,
@@ -334,6 +495,7 @@ class Drawbot(XArmAPI):
         """
         Move to the position (x, y, z) at a given speed and acceleration.
         """
+        self.end_path()
         self.set_position(
             x=x,
             y=y,
@@ -348,6 +510,102 @@ class Drawbot(XArmAPI):
             # motion_type=2
         )
 
+    def new_path(self) -> PathBuilder:
+        """
+        Start a path from the current pen position, for draw_path.
+        """
+        return PathBuilder(self.get_pose()[:2],
+                           z=self.z,
+                           lift=abs(self.ready_position[-1] - self.z),
+                           radius=self.blend_radius)
+
+    def end_path(self):
+        """
+        Go back to mode 7 if a path may still be running in mode 0. The
+        mode change stops whatever is left of the path, so the next command
+        preempts it like any command in mode 7.
+        """
+        if self.path_running:
+            self.path_running = False
+            self.set_mode(7)
+            self.set_state(0)
+
+    def draw_path(self, path: PathBuilder, wait: bool = None):
+        """
+        Draw all the vertices of a path. With path_submit 'pipeline' the
+        moves go out as one burst of blended lines without waiting for each
+        reply, with 'arc_lines' they go through move_arc_lines, and with
+        'vertex' every vertex is its own move as before.
+
+        Both batched modes need the queued motion of mode 0, as mode 7
+        would interrupt each line with the next one. Without wait the arm
+        stays in mode 0 while the path runs, and the next motion command
+        goes back to mode 7 first (see end_path), cutting the path short
+        just as mode 7 would. Interrupts clear it with clear_commands.
+
+        Parameters
+        ----------
+        path : PathBuilder
+            The vertices to draw.
+
+        wait : bool
+            Block until the whole path has been drawn, and go back to mode 7
+            after it. Defaults to wait_commands.
+        """
+        wait = self.wait_commands if wait is None else wait
+        self.end_path()
+        vertices = path.vertices
+        for x, y, z, _ in vertices:
+            if z == self.z:
+                self.coords.append((x, y))
+        if not len(vertices):
+            return
+
+        if self.path_submit == 'vertex':
+            for x, y, z, _ in vertices:
+                self.bot_move_to(x=x,
+                                 y=y,
+                                 z=z,
+                                 speed=self.speed,
+                                 mvacc=self.mvacc,
+                                 wait=wait)
+            return
+
+        roll, pitch, yaw = [self.last_used_position[3 + i] if value is None else value
+                            for i, value in enumerate((self.roll, self.pitch, self.yaw))]
+        self.set_mode(0)
+        self.set_state(0)
+        if self.path_submit == 'arc_lines':
+            paths = [[x, y, z, roll, pitch, yaw, radius]
+                     for x, y, z, radius in vertices.tolist()]
+            self.move_arc_lines(paths,
+                                automatic_calibration=False,
+                                first_pause_time=0,
+                                speed=self.speed,
+                                mvacc=self.mvacc,
+                                wait=wait)
+        else:
+            self.set_pipeline_depth(self.pipeline_depth)
+            last = len(vertices) - 1
+            for i, (x, y, z, radius) in enumerate(vertices.tolist()):
+                self.set_position(x=x,
+                                  y=y,
+                                  z=z,
+                                  roll=roll,
+                                  pitch=pitch,
+                                  yaw=yaw,
+                                  radius=radius if i < last else 0,
+                                  speed=self.speed,
+                                  mvacc=self.mvacc,
+                                  wait=wait and i == last)
+            code = self.drain_pipeline()
+            self.set_pipeline_depth(0)
+            if code != 0:
+                logging.warning(f'Path of {len(vertices)} vertices failed, code={code}')
+        self.path_running = True
+        if wait:
+            self.end_path()
+
     def tool_move(self,
                   abs_angle: int,
                   speed: int = 100,
@@ -356,6 +614,7 @@ class Drawbot(XArmAPI):
         """
         Moves the tool to an absolute angle.
         """
+        self.end_path()
         self.set_servo_angle(servo_id=6,
                              angle=abs_angle,
                              speed=speed,
@@ -652,7 +911,8 @@ class Drawbot(XArmAPI):
         size : float
             Size of the square.
         """
-        x, y = self.get_pose()[:2]
+        path = self.new_path()
+        x, y = path.start
         square = []
 
         local_pos = [(size, 0), (size, size), (0, size)]
@@ -662,16 +922,12 @@ class Drawbot(XArmAPI):
                 x + local_pos[i][0],
                 y + local_pos[i][1]
             ]
-            self.go_draw(x=next_pos[0],
-                         y=next_pos[1],
-                         wait=self.wait_commands)
+            path.line_to(*next_pos)
 
             square.append(next_pos)
             self.coords.append(next_pos)
 
-        self.go_draw(x=x,
-                     y=y,
-                     wait=self.wait_commands)
+        self.draw_path(path.close())
 
         self.squares.append(square)
 
@@ -686,7 +942,8 @@ class Drawbot(XArmAPI):
         size : float
             Size of the triangle.
         """
-        pos = self.get_pose()[:2]  # x, y
+        path = self.new_path()
+        pos = path.start  # x, y
         triangle = []
 
         rand_type = randrange(0, 2)
@@ -712,15 +969,13 @@ class Drawbot(XArmAPI):
                 pos[0] + local_pos[i][0],
                 pos[1] + local_pos[i][1]
             ]
-            self.go_draw(x=next_pos[0],
-                         y=next_pos[1],
-                         wait=self.wait_commands)
+            path.line_to(*next_pos)
 
             triangle.append(next_pos)
             self.coords.append(next_pos)
 
         # Go back to the first vertex to join up the shape
-        self.go_draw(x=pos[0], y=pos[1], wait=self.wait_commands)
+        self.draw_path(path.close())
         self.triangles.append(triangle)
 
     def draw_sunburst(self, r,
@@ -739,7 +994,8 @@ class Drawbot(XArmAPI):
         randomAngle : bool
             Random angle.
         """
-        pos = self.get_pose()
+        path = self.new_path()
+        pos = path.start
 
         if randomAngle is True:
             random_angles = [
@@ -775,11 +1031,12 @@ class Drawbot(XArmAPI):
             self.coords.append(next_pos)
 
             # Draw line from centre point outwards
-            self.go_draw(x=next_pos[0], y=next_pos[1], wait=self.wait_commands)
+            path.line_to(*next_pos)
 
             # Return to centre point to then draw another line
-            self.go_draw(x=pos[0], y=pos[1], wait=self.wait_commands)
+            path.line_to(*pos)
 
+        self.draw_path(path)
         self.sunbursts.append(sunburst)
 
     def draw_irregular_shape(self, num_vertices):
@@ -793,7 +1050,8 @@ class Drawbot(XArmAPI):
             Number of randomly generated vertices. If set to 0, will be
             randomised between 3 and 10.
         """
-        pos = self.get_pose()
+        path = self.new_path()
+        pos = path.start
 
         if num_vertices <= 0:
             num_vertices = randrange(3, 10)
@@ -809,10 +1067,10 @@ class Drawbot(XArmAPI):
             x, y = vertices[i]
             x = pos[0] + x
             y = pos[1] + y
-            self.go_draw(x=x, y=y, wait=self.wait_commands)
+            path.line_to(x, y)
 
         # Return to centre point to then draw another line
-        self.go_draw(x=pos[0], y=pos[1], wait=self.wait_commands)
+        self.draw_path(path.close())
 
         self.irregulars.append(vertices)
 
@@ -848,7 +1106,8 @@ class Drawbot(XArmAPI):
         lines are drawn in this function whereas letters with curves are drawn
         in their own respective functions.
         """
-        pos = self.get_pose()[:2]  # x, y
+        path = self.new_path()
+        pos = path.start  # x, y
         char = []
         char.append(_char.upper())
 
@@ -925,18 +1184,17 @@ class Drawbot(XArmAPI):
                 pos[0] + local_pos[i][0], pos[1] + local_pos[i][1]  # calculate the next world position to draw
             ]
 
-            if jump_num != -1:  # for characters that need a jump
-                if i == jump_num:
-                    self.go_draw_up(next_pos[0], next_pos[1])
-                else:
-                    self.go_draw(next_pos[0], next_pos[1], wait=self.wait_commands)
+            if jump_num != -1 and i == jump_num:  # for characters that need a jump
+                path.jump_to(*next_pos)
 
             else:  # the rest of the letters can be drawn in a continuous line
-                self.go_draw(next_pos[0], next_pos[1], wait=self.wait_commands)
+                path.line_to(*next_pos)
 
             char.append(next_pos)  # append the current position to the letter
             self.coords.append(next_pos)
 
+        self.draw_path(path)
+
     def draw_p(self, size, wait=False):
         """
         Draw the letter P at the pens current position.
@@ -0,0 +1,85 @@
+import numpy as np
+from scipy import signal
+
+from nebula.buffers import RingBuffer
+
+
+def hilbert_envelope(window, rate: int = 44100, envelope_rate: int = 10):
+    """
+    Envelope of a whole window from the magnitude of its analytic signal,
+    resampled to envelope_rate points per second.
+    """
+    envelope = np.abs(signal.hilbert(window))
+    num = int(len(envelope) / rate * envelope_rate)
+    return signal.resample(envelope, num)[np.newaxis, :]
+
+
+class EnvelopeFollower:
+    def __init__(self,
+                 rate: int = 44100,
+                 envelope_rate: int = 10,
+                 seconds: int = 5):
+        """
+        Incremental amplitude envelope of a live signal. Each incoming chunk
+        is rectified and averaged into envelope_rate bins per second, with
+        the part-filled bin carried over to the next chunk, so only the new
+        samples are processed. The mean of a rectified sine is 2/pi of its
+        amplitude, so bins are scaled by pi/2 to match the Hilbert envelope
+        the nets were trained on.
+
+        Parameters
+        ----------
+        rate
+            Sample rate of the incoming signal.
+
+        envelope_rate
+            Envelope points per second.
+
+        seconds
+            Length of the rolling envelope window.
+        """
+        self.bin_size = rate // envelope_rate
+        self.window = RingBuffer(envelope_rate * seconds, channels=1)
+        self._bin_sum = 0.0
+        self._bin_count = 0
+
+    @property
+    def full(self) -> bool:
+        return self.window.full
+
+    def update(self, chunk) -> int:
+        """
+        Add a chunk of samples. Returns the number of envelope points
+        completed by this chunk.
+        """
+        rectified = np.abs(np.asarray(chunk, dtype=np.float64))
+
+        # Finish the bin carried over from the last chunk
+        needed = self.bin_size - self._bin_count
+        if len(rectified) < needed:
+            self._bin_sum += rectified.sum()
+            self._bin_count += len(rectified)
+            return 0
+        points = [self._bin_sum + rectified[:needed].sum()]
+        rectified = rectified[needed:]
+
+        # Whole bins in this chunk
+        n_bins = len(rectified) // self.bin_size
+        if n_bins:
+            whole = rectified[:n_bins * self.bin_size].reshape(n_bins, self.bin_size)
+            points.extend(whole.sum(axis=1))
+
+        # Carry the remainder over
+        remainder = rectified[n_bins * self.bin_size:]
+        self._bin_sum = remainder.sum()
+        self._bin_count = len(remainder)
+
+        envelope = np.array(points) * (np.pi / 2 / self.bin_size)
+        self.window.extend(envelope[np.newaxis, :])
+        return len(points)
+
+    def view(self) -> np.ndarray:
+        """
+        (1, envelope_rate * seconds) envelope window, oldest point first.
+        """
+        return self.window.view()
@@ -0,0 +1,99 @@
+import json
+import logging
+import os
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from threading import Condition, Thread
+
+
+class JsonlWriter:
+    def __init__(self,
+                 path,
+                 flush_interval: float = 1,
+                 fsync: bool = True):
+        """
+        Line delimited JSON log. Records are handed over in memory and a
+        background thread serialises and appends them in batches, so the
+        caller's loop never waits on json.dumps, write or fsync. Every line
+        is a complete record, so a crash loses at most the last batch and
+        leaves a readable file.
+
+        Parameters
+        ----------
+        path
+            File to append to.
+
+        flush_interval
+            Seconds between batch writes.
+
+        fsync
+            Sync each batch to disk after writing it.
+        """
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.written = 0
+
+        self._queue = deque()
+        self._closed = False
+        self._ready = Condition()
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._thread = Thread(target=self._writer, daemon=True)
+        self._thread.start()
+
+    def append(self, timestamp: float, record: dict):
+        """
+        Queue one record. The timestamp (seconds since the epoch) is
+        written as the ISO "date" field.
+        """
+        self._queue.append((timestamp, record))
+
+    def close(self):
+        """
+        Write out everything queued and close the file.
+        """
+        with self._ready:
+            self._closed = True
+            self._ready.notify()
+        self._thread.join()
+        self._file.close()
+
+    def _writer(self):
+        while True:
+            with self._ready:
+                if not self._closed:
+                    self._ready.wait(self.flush_interval)
+                closed = self._closed
+            # deque append/popleft are thread safe, no lock on the caller's side
+            batch = [self._queue.popleft() for _ in range(len(self._queue))]
+            if batch:
+                self._write(batch)
+            if closed:
+                return
+
+    def _write(self, batch):
+        lines = []
+        for timestamp, record in batch:
+            lines.append(json.dumps({"date": datetime.fromtimestamp(timestamp).isoformat(),
+                                     **record}))
+        lines.append('')
+        self._file.write('\n'.join(lines))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.written += len(batch)
+
+
+def read_jsonl(path) -> list:
+    """
+    Records of a JSONL file. A last line cut short by a crash is skipped.
+    """
+    records = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                logging.warning(f"Skipping incomplete record in {path}")
+    return records
@@ -1,12 +1,13 @@
 import logging
 import numpy as np
-import pyaudio
 from random import random
-from scipy import signal
-from scipy.io import wavfile
 from time import time
 
 import config
+from modules.audio_source import AudioSource, make_audio_source
+from modules.envelope import EnvelopeFollower, hilbert_envelope
+from modules.wav_recorder import WavRecorder
+from nebula.buffers import RingBuffer
 from nebula.hivemind import DataBorg
 
 
@@ -20,9 +21,15 @@ def buffer_scaler(in_feature, mins, maxs):
 
 
 class Listener:
-    def __init__(self):
+    def __init__(self, source: AudioSource = None):
         """
-        controls audio listening by opening up a stream in Pyaudio.
+        controls audio listening from the live mic or a replayed recording.
+
+        Parameters
+        ----------
+        source
+            Where to read audio from. Defaults to the source selected by
+            config.audio_source.
         """
         print("Starting listener")
 
@@ -32,16 +39,12 @@ class Listener:
         self.mic_logging = config.mic_in_logging
 
         # Set up mic listening
-        self.CHUNK = 2**11
-        self.RATE = 44100
-        self.p = pyaudio.PyAudio()
-        self.stream = self.p.open(format=pyaudio.paInt16,
-                                  channels=1,
-                                  rate=self.RATE,
-                                  input=True,
-                                  frames_per_buffer=self.CHUNK)
+        self.source = source if source is not None else make_audio_source()
+        self.CHUNK = self.source.chunk
+        self.RATE = self.source.rate
 
         self.mic_sensitivity = config.mic_sensitivity
+        self.incremental_envelope = config.incremental_envelope
 
         # print(f"Checking mic volume - Please play a sustained note or chords for at least {config.volume_seconds} seconds at the correct volume.")
         # start_time = time()
@@ -68,40 +71,51 @@ class Listener:
         # Plug into the hive mind data borg
         self.hivemind = DataBorg()
 
+        # Stream the mic recording to disk as it is played
+        self.recorder = WavRecorder(self.RATE)
+        if config.record_audio and not config.record_audio_per_experiment:
+            session_date = self.hivemind.session_date
+            self.recorder.open(f'{config.path}/{session_date}/{session_date}.wav')
+
     def snd_listen(self):
         """
         Loop thread listening to live sound and analysing amplitude. Normalises
         then stores this into the nebula dataclass for shared use.
         """
         logging.info("Starting mic listening stream & thread")
-        data_buffer = np.empty(0)
+        data_buffer = RingBuffer(self.RATE * 5)  # 5 sec buffer
+        envelope_follower = EnvelopeFollower(self.RATE, envelope_rate=10, seconds=5)
 
         # Set silence listener to 10 seconds in future
         silence_timer = time() + 10
         first_minute = time() + 60
+        self.source.start()
 
         # Main loop
         while self.hivemind.running:
             # Get amplitude from mic input
-            data = np.frombuffer(self.stream.read(
-                self.CHUNK,
-                exception_on_overflow=False),
-                dtype=np.int16)
+            data = self.source.read()
+            if data is None:
+                if self.source.finished:
+                    break
+                continue
 
             # Make audio envelope buffer for nets
-            data_buffer = np.append(data_buffer, data)
-            self.hivemind.audio_buffer_raw = np.append(
-                self.hivemind.audio_buffer_raw, data)
-            if len(data_buffer) > self.RATE*5:  # 5 sec buffer
-                data_buffer = data_buffer[-(self.RATE*5):]
-                hb_data = signal.hilbert(data_buffer)
-                envelope = np.abs(hb_data)
-                num = int(len(envelope)/self.RATE*10.0)
-                envelope = signal.resample(envelope, num)[np.newaxis, :]
+            self.recorder.write(data)
+            fields = {}
+            envelope = None
+            if self.incremental_envelope:
+                if envelope_follower.update(data) and envelope_follower.full:
+                    envelope = envelope_follower.view()
+            else:
+                data_buffer.extend(data)
+                if data_buffer.full:
+                    envelope = hilbert_envelope(data_buffer.view(), self.RATE)
+            if envelope is not None:
                 envelope_norm = buffer_scaler(envelope,
                                               self.hivemind.audio_mins,
                                               self.hivemind.audio_maxs)
-                self.hivemind.audio_buffer = envelope_norm
+                fields['audio_buffer'] = envelope_norm
 
             peak = np.average(np.abs(data)) * 2
             if peak > 1000:
@@ -119,27 +133,29 @@ class Listener:
                 normalised_peak = 1.0
 
             # Put normalised amplitude into Nebula's dictionary for use
-            self.hivemind.mic_in = normalised_peak
+            fields['mic_in'] = normalised_peak
 
-            # If loud sound then 63% affect gesture manager
-            if normalised_peak > 0.8:
-                if random() > 0.63:
-                    self.hivemind.interrupted = True
-                    self.hivemind.randomiser()
-                    print("-------------- MICROPHONE INTERRUPT --------------")
+            # If loud sound then 63% affect gesture manager,
+            # the random blitz replaces this chunk's fields
+            if normalised_peak > 0.8 and random() > 0.63:
+                self.hivemind.randomiser(interrupted=True)
+                print("-------------- MICROPHONE INTERRUPT --------------")
+            else:
+                self.hivemind.publish(**fields)
 
             # Check human musician induced ending (wait for 5 secs)
             if config.silence_listener:
                 if time() > first_minute:
                     if time() >= silence_timer:
                         self.hivemind.running = False
+        self.source.stop()
         logging.info('quitting listener thread')
+        if self.source.input_overflows or self.source.dropped_samples:
+            logging.warning(f"MIC LISTENER: {self.source.input_overflows} input overflows, "
+                            f"{self.source.dropped_samples} samples dropped")
         # self.terminate_listener()
 
     def terminate_listener(self):
-        wavfile.write(f'data/{self.hivemind.session_date}/{self.hivemind.session_date}.wav', self.RATE,
-                      self.hivemind.audio_buffer_raw.astype(np.int16))
-        self.stream.stop_stream()
-        self.stream.close()
-        self.p.terminate()
+        self.recorder.close()
+        self.source.close()
 
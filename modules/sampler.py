@@ -0,0 +1,50 @@
+import logging
+from time import monotonic, sleep
+
+
+class FixedRateSampler:
+    def __init__(self, period: float):
+        """
+        Paces a sampling loop against fixed monotonic deadlines, so the
+        time spent taking a sample does not stretch the period. Deadlines
+        that have already passed when the loop gets round to them are
+        skipped and counted rather than sampled in a burst.
+
+        Parameters
+        ----------
+        period
+            Seconds between samples.
+        """
+        self.period = period
+        self.missed = 0
+        """Deadlines skipped because the loop was too late for them"""
+        self.max_lateness = 0.0
+        """Longest wake up after a deadline, in seconds"""
+        self._deadline = None
+
+    def wait(self) -> float:
+        """
+        Sleep until the next deadline and return it. The first call
+        returns straight away and starts the schedule.
+        """
+        now = monotonic()
+        if self._deadline is None:
+            self._deadline = now
+            return now
+
+        self._deadline += self.period
+        if now > self._deadline + self.period:
+            skipped = int((now - self._deadline) // self.period)
+            self.missed += skipped
+            self._deadline += skipped * self.period
+        wait = self._deadline - now
+        if wait > 0:
+            sleep(wait)
+        self.max_lateness = max(self.max_lateness, monotonic() - self._deadline)
+        return self._deadline
+
+    def log_stats(self, name: str):
+        if self.missed:
+            logging.warning(f"{name} missed {self.missed} deadlines, max lateness {self.max_lateness * 1000:.1f} ms")
+        else:
+            logging.info(f"{name} kept every deadline, max lateness {self.max_lateness * 1000:.1f} ms")
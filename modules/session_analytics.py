@@ -0,0 +1,238 @@
+import argparse
+import json
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from modules.session_log import iter_session_chunks
+
+NETS = ["mic_in", "rnd_poetry", "audio2eda", "flow2core", "core2flow",
+        "audio2core", "audio2flow", "flow2audio", "eda2flow"]
+COVERAGE_GRID = 20
+"""Cells per side of the xy grid that robot coverage is counted on"""
+
+EXPERIMENT = re.compile(r"(?P<experiment>.+)_block_(?P<block>\d+)_performance_(?P<performance>\d+)"
+                        r"_mode_(?P<mode>.+)")
+FORMATS = [".npz", ".jsonl", ".json"]
+"""Preferred first when one session has been logged or converted to several"""
+
+
+def find_sessions(root) -> list:
+    """
+    Every AI_Robot session log under root, as
+    data/<YYYY_MM_DD_HHMM>/<experiment>_block_<n>_performance_<n>_mode_<m>/ai_robot/.
+    Sessions converted to NPZ are only listed once, as the NPZ.
+    """
+    sessions = {}
+    for path in Path(root).glob("**/ai_robot/AI_Robot_*"):
+        if path.suffix not in FORMATS:
+            continue
+        key = path.with_suffix("")
+        if key not in sessions or FORMATS.index(path.suffix) < FORMATS.index(sessions[key].suffix):
+            sessions[key] = path
+    return sorted(sessions.values())
+
+
+def summarise_session(path) -> dict:
+    """
+    Summary of one session log, read in chunks.
+
+    Returns
+    -------
+    A dict with the session, experiment, block, performance and mode from
+    the path, the number of records and duration, mean/std/min/max of every
+    net output, the design decision histogram, the fraction of samples
+    interrupted and the number of interrupts, and the robot coverage: the
+    xyz extents, distance travelled in normalised units, and the fraction
+    of a COVERAGE_GRID x COVERAGE_GRID grid over the normalised xy plane
+    that was visited.
+    """
+    path = Path(path)
+    summary = {"path": str(path), "session": path.parents[2].name}
+    match = EXPERIMENT.fullmatch(path.parents[1].name)
+    summary.update(match.groupdict() if match else {"experiment": path.parents[1].name})
+
+    records = 0
+    first_ns = last_ns = None
+    count = {name: 0 for name in NETS}
+    total = {name: 0.0 for name in NETS}
+    squares = {name: 0.0 for name in NETS}
+    low = {name: np.inf for name in NETS}
+    high = {name: -np.inf for name in NETS}
+    decisions = {}
+    interrupted = interrupts = 0
+    last_interrupt = False
+    xyz_low = np.full(3, np.inf)
+    xyz_high = np.full(3, -np.inf)
+    distance = 0.0
+    last_xyz = None
+    visited = np.zeros((COVERAGE_GRID, COVERAGE_GRID), dtype=bool)
+
+    for columns in iter_session_chunks(path):
+        dates_ns = columns["date_ns"]
+        records += len(dates_ns)
+        first_ns = int(dates_ns[0]) if first_ns is None else first_ns
+        last_ns = int(dates_ns[-1])
+
+        for name in NETS:
+            values = columns[name].astype(np.float64)
+            values = values[~np.isnan(values)]
+            if len(values):
+                count[name] += len(values)
+                total[name] += values.sum()
+                squares[name] += np.square(values).sum()
+                low[name] = min(low[name], values.min())
+                high[name] = max(high[name], values.max())
+
+        labels = columns["design_decision_categories"]
+        for code, n in enumerate(np.bincount(columns["design_decision_codes"], minlength=len(labels))):
+            if n:
+                decisions[str(labels[code])] = decisions.get(str(labels[code]), 0) + int(n)
+
+        interrupt = columns["interrupt"]
+        interrupted += int(interrupt.sum())
+        interrupts += int((interrupt & ~np.r_[last_interrupt, interrupt[:-1]]).sum())
+        last_interrupt = bool(interrupt[-1])
+
+        xyz = np.stack([columns["x"], columns["y"], columns["z"]], axis=1).astype(np.float64)
+        xyz = xyz[~np.isnan(xyz).any(axis=1)]
+        if len(xyz):
+            xyz_low = np.minimum(xyz_low, xyz.min(axis=0))
+            xyz_high = np.maximum(xyz_high, xyz.max(axis=0))
+            steps = np.diff(xyz if last_xyz is None else np.vstack([last_xyz, xyz]), axis=0)
+            distance += float(np.linalg.norm(steps, axis=1).sum())
+            last_xyz = xyz[-1]
+            cells = np.clip((xyz[:, :2] * COVERAGE_GRID).astype(int), 0, COVERAGE_GRID - 1)
+            visited[cells[:, 0], cells[:, 1]] = True
+
+    summary["records"] = records
+    summary["duration"] = (last_ns - first_ns) / 1e9 if records else 0.0
+    for name in NETS:
+        n = count[name]
+        mean = float(total[name] / n) if n else np.nan
+        summary[f"{name}_mean"] = mean
+        summary[f"{name}_std"] = float(np.sqrt(max(squares[name] / n - mean ** 2, 0))) if n else np.nan
+        summary[f"{name}_min"] = float(low[name]) if n else np.nan
+        summary[f"{name}_max"] = float(high[name]) if n else np.nan
+    summary["design_decisions"] = decisions
+    summary["interrupt_rate"] = interrupted / records if records else 0.0
+    summary["interrupts"] = interrupts
+    for i, axis in enumerate("xyz"):
+        summary[f"{axis}_min"] = float(xyz_low[i]) if last_xyz is not None else np.nan
+        summary[f"{axis}_max"] = float(xyz_high[i]) if last_xyz is not None else np.nan
+    summary["distance"] = distance
+    summary["coverage"] = float(visited.mean())
+    return summary
+
+
+def load_cache(path) -> dict:
+    """
+    Cached summaries by log path, {} if there is no cache yet.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError:
+        logging.warning(f"Ignoring unreadable summary cache {path}")
+        return {}
+
+
+def save_cache(path, cache: dict):
+    """
+    Write the cache under a temporary name and rename it, like save_npz.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def summarise_archive(root, cache_path=None, workers=None) -> list:
+    """
+    Summaries of every session under root, see summarise_session. Logs
+    whose mtime and size match the cache are not read again, the others
+    are summarised in parallel by a process pool and added to the cache.
+
+    Parameters
+    ----------
+    root
+        Data archive to search, see find_sessions.
+
+    cache_path
+        JSON file of cached summaries, <root>/session_summaries.json by
+        default.
+
+    workers
+        Worker processes, the CPU count by default. 1 summarises in this
+        process.
+    """
+    cache_path = Path(root) / "session_summaries.json" if cache_path is None else Path(cache_path)
+    cache = load_cache(cache_path)
+    paths = find_sessions(root)
+
+    stamps = {}
+    stale = []
+    for path in paths:
+        stat = path.stat()
+        stamps[str(path)] = [stat.st_mtime_ns, stat.st_size]
+        entry = cache.get(str(path))
+        if entry is None or entry["stamp"] != stamps[str(path)]:
+            stale.append(path)
+    logging.info(f"{len(paths)} sessions under {root}, {len(stale)} to summarise")
+
+    if workers == 1:
+        summaries = list(map(summarise_session, stale))
+    elif stale:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            summaries = list(pool.map(summarise_session, stale))
+    else:
+        summaries = []
+    for path, summary in zip(stale, summaries):
+        cache[str(path)] = {"stamp": stamps[str(path)], "summary": summary}
+
+    # forget deleted sessions
+    if stale or len(cache) != len(stamps):
+        cache = {path: cache[path] for path in stamps}
+        save_cache(cache_path, cache)
+    return [cache[str(path)]["summary"] for path in paths]
+
+
+def summary_table(summaries: list):
+    """
+    Summaries as a DataFrame, one row per session, with a column per
+    design decision holding its share of the session.
+    """
+    import pandas as pd
+
+    rows = []
+    for summary in summaries:
+        row = {name: value for name, value in summary.items() if name != "design_decisions"}
+        records = summary["records"] or 1
+        for decision, n in summary["design_decisions"].items():
+            row[f"decision: {decision.strip() or 'none'}"] = n / records
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Summarise every AI_Robot session in the data archive")
+    parser.add_argument("root", nargs="?", default="data")
+    parser.add_argument("--cache", help="summary cache, <root>/session_summaries.json by default")
+    parser.add_argument("--workers", type=int, help="worker processes, the CPU count by default")
+    parser.add_argument("--csv", help="also write the table to this CSV file")
+    args = parser.parse_args()
+
+    table = summary_table(summarise_archive(args.root, cache_path=args.cache, workers=args.workers))
+    if args.csv:
+        table.to_csv(args.csv, index=False)
+    columns = ["session", "experiment", "block", "performance", "mode", "records", "duration",
+               "interrupt_rate", "interrupts", "distance", "coverage"]
+    print(table[[name for name in columns if name in table]].to_string(index=False))
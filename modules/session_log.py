@@ -0,0 +1,279 @@
+import argparse
+import json
+import logging
+import os
+import zipfile
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from modules.jsonl_writer import JsonlWriter
+
+FLOAT_COLUMNS = ["mic_in", "rnd_poetry", "audio2eda", "flow2core", "core2flow",
+                 "audio2core", "audio2flow", "flow2audio", "eda2flow",
+                 "x", "y", "z"]
+INT_COLUMNS = ["mono_ns", "version"]
+CATEGORY_COLUMNS = {"master_stream": "master_stream",
+                    "design_decision": "design decision"}
+"""NPZ column name: field name in the JSON records"""
+
+
+def encode_records(dates_ns, records, categories=None) -> dict:
+    """
+    Columnar arrays for a list of session records: int64 ns timestamps,
+    float32 values (NaN where a field is missing), int64 monotonic sample
+    times and hivemind versions (-1 where missing), a bool interrupt
+    column and dictionary encoded strings, stored as <name>_codes indexing
+    into <name>_categories.
+
+    Parameters
+    ----------
+    dates_ns
+        Timestamp of every record in ns since the epoch.
+
+    records
+        One dict per sample, as in the JSON logs.
+
+    categories
+        Category dicts ({string: code}) per category column, extended in
+        place, to keep codes consistent across chunks of one log. New
+        dicts by default.
+    """
+    columns = {"date_ns": np.asarray(dates_ns, dtype=np.int64)}
+    for name in FLOAT_COLUMNS:
+        columns[name] = np.array([record.get(name, np.nan) for record in records],
+                                 dtype=np.float32)
+    for name in INT_COLUMNS:
+        columns[name] = np.array([record.get(name, -1) for record in records], dtype=np.int64)
+    columns["interrupt"] = np.array([bool(record.get("interrupt", False)) for record in records])
+    for name, field in CATEGORY_COLUMNS.items():
+        known = {} if categories is None else categories.setdefault(name, {})
+        codes = np.array([known.setdefault(str(record.get(field, "")), len(known))
+                          for record in records], dtype=np.int32)
+        dtype = np.uint8 if len(known) <= 256 else np.int32
+        columns[f"{name}_codes"] = codes.astype(dtype)
+        columns[f"{name}_categories"] = np.array(list(known), dtype=str)
+    return columns
+
+
+def save_npz(path, columns: dict):
+    """
+    Write the columns as a compressed NPZ. The file is written under a
+    temporary name and renamed, so path is either complete or absent.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(f, **columns)
+    os.replace(tmp_path, path)
+
+
+def parse_date_ns(date: str) -> int:
+    """
+    ISO date of the JSON logs as ns since the epoch, read as local time
+    like datetime.now() wrote it.
+    """
+    return int(round(datetime.fromisoformat(date).timestamp() * 1e6)) * 1000
+
+
+def read_json_records(path) -> list:
+    """
+    Records of a JSON array or JSONL session log, one record per line.
+    Logs cut short by a crash (no closing bracket, half a line) are read
+    up to their last complete record.
+    """
+    return list(_iter_json_records(path))
+
+
+def _iter_json_records(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip().lstrip("[").rstrip(",]")
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logging.warning(f"Skipping incomplete record in {path}")
+
+
+class NpzSessionWriter:
+    def __init__(self, path, flush_interval: float = 1):
+        """
+        Columnar session log. Records are appended to a JSONL sidecar next
+        to path by a JsonlWriter during the piece, and converted to one
+        compressed NPZ on close, see encode_records. If the piece never
+        closes (crash, kill) the sidecar keeps everything up to the last
+        batch, and convert_archive turns it into the NPZ later. Same
+        interface as JsonlWriter.
+
+        Parameters
+        ----------
+        path
+            The .npz file to write.
+
+        flush_interval
+            Seconds between batch writes to the sidecar.
+        """
+        self.path = Path(path)
+        self.log_path = self.path.with_suffix(".jsonl")
+        self._log = JsonlWriter(self.log_path, flush_interval=flush_interval)
+
+    def append(self, timestamp: float, record: dict):
+        """
+        Queue one record, timestamp in seconds since the epoch.
+        """
+        self._log.append(timestamp, record)
+
+    def close(self):
+        self._log.close()
+        convert_json(self.log_path, self.path)
+        self.log_path.unlink()
+        logging.info(f"Wrote {self._log.written} records to {self.path}")
+
+
+def _open_npy(npz_file: zipfile.ZipFile, name: str):
+    """
+    Stream over one array of an NPZ: the open member and its dtype, with
+    the file positioned at the first element.
+    """
+    f = npz_file.open(f"{name}.npy")
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+    return f, dtype
+
+
+def _iter_npz_chunks(path, chunk_rows: int):
+    with np.load(path) as npz:
+        names = [name for name in ["date_ns", "interrupt"] + FLOAT_COLUMNS + INT_COLUMNS
+                 if name in npz.files]
+        names += [f"{name}_codes" for name in CATEGORY_COLUMNS]
+        # category labels are a handful of strings, read them whole
+        categories = {f"{name}_categories": npz[f"{name}_categories"] for name in CATEGORY_COLUMNS}
+    with zipfile.ZipFile(path) as npz_file:
+        members = {name: _open_npy(npz_file, name) for name in names}
+        try:
+            while True:
+                columns = {}
+                for name, (f, dtype) in members.items():
+                    data = f.read(chunk_rows * dtype.itemsize)
+                    columns[name] = np.frombuffer(data, dtype=dtype)
+                if not len(columns["date_ns"]):
+                    return
+                columns.update(categories)
+                yield columns
+        finally:
+            for f, _ in members.values():
+                f.close()
+
+
+def _iter_json_chunks(path, chunk_rows: int):
+    categories = {}
+    records = []
+    for record in _iter_json_records(path):
+        records.append(record)
+        if len(records) == chunk_rows:
+            yield encode_records([parse_date_ns(r["date"]) for r in records], records, categories)
+            records = []
+    if records:
+        yield encode_records([parse_date_ns(r["date"]) for r in records], records, categories)
+
+
+def iter_session_chunks(path, chunk_rows: int = 10000):
+    """
+    Read a session log (.npz, .jsonl or .json) chunk_rows records at a
+    time, as dicts of columns like encode_records makes them. NPZ columns
+    are decompressed as they are read and JSON records are parsed line by
+    line, so memory stays bounded by the chunk size however long the
+    session was. Category codes are consistent across the chunks, the
+    <name>_categories arrays of each chunk cover all codes so far.
+
+    Parameters
+    ----------
+    path
+        Session log to read.
+
+    chunk_rows
+        Records per chunk.
+    """
+    if Path(path).suffix == ".npz":
+        return _iter_npz_chunks(path, chunk_rows)
+    return _iter_json_chunks(path, chunk_rows)
+
+
+def local_dates(dates_ns):
+    """
+    ns timestamps as naive datetimes in local time, like the JSON logs.
+    """
+    import pandas as pd
+    from dateutil.tz import tzlocal
+
+    dates = pd.to_datetime(dates_ns, unit="ns", utc=True)
+    return dates.tz_convert(tzlocal()).tz_localize(None)
+
+
+def load_session(path):
+    """
+    A session log (.npz, .jsonl or .json) as a DataFrame with a datetime
+    "date" column in local time, float32 values and categorical strings,
+    under the field names of the JSON logs.
+    """
+    import pandas as pd
+
+    path = Path(path)
+    if path.suffix == ".npz":
+        with np.load(path) as npz:
+            data = {"date": local_dates(npz["date_ns"])}
+            for name in FLOAT_COLUMNS + INT_COLUMNS:
+                if name in npz.files:
+                    data[name] = npz[name]
+            data["interrupt"] = npz["interrupt"]
+            for name, field in CATEGORY_COLUMNS.items():
+                data[field] = pd.Categorical.from_codes(npz[f"{name}_codes"].astype(np.int32),
+                                                        categories=npz[f"{name}_categories"])
+        return pd.DataFrame(data)
+
+    records = read_json_records(path)
+    df = pd.DataFrame(records)
+    df["date"] = pd.to_datetime(df["date"], format="ISO8601")
+    return df
+
+
+def convert_json(path, out_path=None) -> Path:
+    """
+    Convert a JSON or JSONL session log to NPZ, next to it by default.
+    """
+    path = Path(path)
+    out_path = path.with_suffix(".npz") if out_path is None else Path(out_path)
+    records = read_json_records(path)
+    dates_ns = [parse_date_ns(record["date"]) for record in records]
+    save_npz(out_path, encode_records(dates_ns, records))
+    return out_path
+
+
+def convert_archive(root, overwrite: bool = False) -> list:
+    """
+    Convert every AI_Robot JSON/JSONL log under root that has no NPZ yet.
+    """
+    converted = []
+    for path in sorted(Path(root).glob("**/ai_robot/AI_Robot_*.json*")):
+        out_path = path.with_suffix(".npz")
+        if out_path.exists() and not overwrite:
+            continue
+        convert_json(path, out_path)
+        logging.info(f"{path} ({path.stat().st_size} bytes) -> {out_path} ({out_path.stat().st_size} bytes)")
+        converted.append(out_path)
+    return converted
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Convert AI_Robot JSON session logs to NPZ")
+    parser.add_argument("root", nargs="?", default="data")
+    parser.add_argument("--overwrite", action="store_true")
+    args = parser.parse_args()
+    convert_archive(args.root, overwrite=args.overwrite)
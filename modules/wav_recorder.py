@@ -0,0 +1,135 @@
+import logging
+import struct
+from pathlib import Path
+from queue import Queue, Empty, Full
+from threading import Thread
+from time import monotonic
+
+import numpy as np
+
+
+WAV_HEADER = struct.Struct('<4sI4s4sIHHIIHH4sI')
+
+
+class WavRecorder:
+    def __init__(self,
+                 rate: int = 44100,
+                 channels: int = 1,
+                 queue_size: int = 256,
+                 header_interval: float = 5):
+        """
+        Streams 16 bit PCM chunks to a WAV file from a background thread, so
+        the session is on disk as it is played rather than written in one go
+        at shutdown. The RIFF sizes are patched every header_interval
+        seconds and on close, so a crash leaves a readable file.
+
+        Parameters
+        ----------
+        rate
+            Sample rate in Hz.
+
+        channels
+            Number of interleaved channels.
+
+        queue_size
+            Number of chunks that can wait for the writer. If the disk
+            falls behind further than this, chunks are dropped and counted
+            rather than blocking the listener.
+
+        header_interval
+            Seconds between header fix ups while recording.
+        """
+        self.rate = rate
+        self.channels = channels
+        self.header_interval = header_interval
+        self.path = None
+        self.dropped_chunks = 0
+
+        self._queue = Queue(maxsize=queue_size)
+        self._file = None
+        self._data_bytes = 0
+        self._thread = Thread(target=self._writer, daemon=True)
+        self._thread.start()
+
+    def open(self, path):
+        """
+        Start a new recording at path. Any open recording is closed first.
+        """
+        self._queue.put(('open', Path(path)))
+
+    def rotate(self, path):
+        """
+        Close the current segment and continue recording into path, e.g.
+        one file per experiment.
+        """
+        self.open(path)
+
+    def write(self, chunk):
+        """
+        Queue a chunk of int16 samples. Never blocks.
+        """
+        try:
+            self._queue.put_nowait(('write', np.asarray(chunk, dtype=np.int16).tobytes()))
+        except Full:
+            self.dropped_chunks += 1
+
+    def close(self):
+        """
+        Write out everything queued, fix the header and stop the writer.
+        """
+        self._queue.put(('close', None))
+        self._thread.join()
+        if self.dropped_chunks:
+            logging.warning(f"WAV recorder dropped {self.dropped_chunks} chunks")
+
+    def _writer(self):
+        next_patch = monotonic() + self.header_interval
+        while True:
+            try:
+                command, payload = self._queue.get(timeout=self.header_interval)
+            except Empty:
+                command, payload = None, None
+
+            if command == 'write':
+                if self._file is not None:
+                    self._file.write(payload)
+                    self._data_bytes += len(payload)
+            elif command == 'open':
+                self._close_file()
+                self._open_file(payload)
+            elif command == 'close':
+                self._close_file()
+                return
+
+            if self._file is not None and monotonic() >= next_patch:
+                self._patch_header()
+                self._file.flush()
+                next_patch = monotonic() + self.header_interval
+
+    def _open_file(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, 'wb')
+        self._data_bytes = 0
+        self.path = path
+        self._file.write(self._header())
+        logging.info(f"Recording audio to {path}")
+
+    def _close_file(self):
+        if self._file is None:
+            return
+        self._patch_header()
+        self._file.close()
+        self._file = None
+
+    def _patch_header(self):
+        end = self._file.tell()
+        self._file.seek(0)
+        self._file.write(self._header())
+        self._file.seek(end)
+
+    def _header(self) -> bytes:
+        block_align = self.channels * 2
+        return WAV_HEADER.pack(b'RIFF', 36 + self._data_bytes, b'WAVE',
+                               b'fmt ', 16, 1, self.channels, self.rate,
+                               self.rate * block_align, block_align, 16,
+                               b'data', self._data_bytes)
@@ -1,17 +1,25 @@
 import logging
 import numpy as np
-import torch
 from random import random
-from time import sleep
+from time import monotonic, sleep
 
+import config
 from nebula.hivemind import DataBorg
-from nebula.models.pt_models import Hourglass
+from nebula.inference import InferenceEngine
+
+# The numpy backend lets the live rig run without importing torch
+if config.nnet_backend == 'numpy':
+    from nebula.models.np_models import NumpyHourglass
+else:
+    import torch
+    from nebula.models.pt_models import load_hourglass
 
 class NNetRAMI:
     def __init__(self,
                  name: str,
                  model: str,
-                 in_feature: str):
+                 in_feature: str,
+                 rate: float):
         """
         Make an object  for each neural net in AI factory.
 
@@ -25,18 +33,26 @@ class NNetRAMI:
 
         in_feature
             NNet input from DataBorg to use.
+
+        rate
+            Maximum update rate of this NNet in Hz, see
+            AIFactoryRAMI.net_rate.
         """
         self.hivemind = DataBorg()
         self.name = name
         self.in_feature = in_feature
 
-        state_dict = torch.load(model)
-        n_ch_in = list(state_dict.values())[0].size()[1]
-        n_ch_out = list(state_dict.values())[-2].size()[1]
-        pt_model = Hourglass(n_ch_in, n_ch_out).double()
-        pt_model.load_state_dict(state_dict)
-        pt_model.eval()
-        self.model = pt_model
+        # Scheduling vars
+        self.rate = rate
+        self.next_due = 0
+        self.last_in_val = None
+
+        self.backend = config.nnet_backend
+        if self.backend == 'numpy':
+            self.model = NumpyHourglass.load([model], config.nnet_dtype)
+        else:
+            self.dtype = getattr(torch, config.nnet_dtype)
+            self.model = load_hourglass(model, config.nnet_dtype)
         logging.info(f"{name} initialized")
 
     def make_prediction(self, in_val):
@@ -49,15 +65,58 @@ class NNetRAMI:
             2D input value for this NNet
         """
         # Make prediction
-        prediction = self.model(torch.tensor(in_val[np.newaxis, :, :]))
-        prediction = np.squeeze(prediction.detach().numpy(), axis=0)
-        setattr(self.hivemind, f'{self.name}_2d', prediction)
-
-        # Get average from prediction and save to data dict
-        individual_val = np.mean(prediction)
-        setattr(self.hivemind, self.name, individual_val)
+        if self.backend == 'numpy':
+            prediction = self.model(in_val[np.newaxis, :, :])[0]
+        else:
+            with torch.inference_mode():
+                prediction = self.model(torch.as_tensor(in_val[np.newaxis, :, :],
+                                                        dtype=self.dtype))
+            prediction = prediction.numpy()
+        prediction = np.squeeze(prediction, axis=0)
+        individual_val = self.publish(prediction)
         logging.debug(f"NNet {self.name} in: {in_val} predicted {individual_val}")
 
+    def publish(self, prediction):
+        """
+        Save a 2D prediction and its average to the data dict, in one
+        publish so readers never see one without the other.
+
+        Parameters
+        ----------
+        prediction
+            2D output value for this NNet
+        """
+        individual_val = float(np.mean(prediction))
+        self.hivemind.publish(**{f'{self.name}_2d': prediction,
+                                 self.name: individual_val})
+        return individual_val
+
+    def is_due(self, now: float) -> bool:
+        """
+        Is this NNet due an update at monotonic time now?
+        """
+        return now >= self.next_due
+
+    def schedule_next(self, now: float):
+        """
+        Set the next deadline. If the NNet has fallen more than a period
+        behind it skips ahead rather than bursting to catch up.
+        """
+        period = 1 / self.rate
+        self.next_due += period
+        if self.next_due < now:
+            self.next_due = now + period
+
+    def has_new_input(self, in_val) -> bool:
+        """
+        Dirty flag for the input. Returns True (and remembers in_val) if it
+        differs from the input of the last prediction.
+        """
+        if self.last_in_val is not None and np.array_equal(in_val, self.last_in_val):
+            return False
+        self.last_in_val = np.array(in_val, copy=True)
+        return True
+
 
 class AIFactoryRAMI:
     def __init__(self):  #, speed: float = 1):
@@ -80,42 +139,51 @@ class AIFactoryRAMI:
 
         self.net_logging = False
         self.hivemind = DataBorg()
+        self.skip_unchanged = config.nnet_skip_unchanged
+        self.missed_ticks = 0
         # self.global_speed = speed
         # Instantiate nets as objects and make models
         logging.info('NNetRework1 - Audio to eda initialization')
         self.audio2eda = NNetRAMI(name="audio2eda",
                                    model='nebula/models/audio2eda.pt',
-                                   in_feature='audio_buffer')
+                                   in_feature='audio_buffer',
+                                   rate=self.net_rate('audio2eda'))
 
         logging.info('NNetRework2 - Flow to core initialization')
         self.flow2core = NNetRAMI(name="flow2core",
                                     model='nebula/models/flow2core.pt',
-                                    in_feature='eda2flow_2d')
+                                    in_feature='eda2flow_2d',
+                                    rate=self.net_rate('flow2core'))
 
         logging.info('NNetRework3 - Core to flow initialization')
         self.core2flow = NNetRAMI(name="core2flow",
                                     model='nebula/models/core2flow.pt',
-                                    in_feature='current_robot_x_y')
+                                    in_feature='current_robot_x_y',
+                                    rate=self.net_rate('core2flow'))
 
         logging.info('NNetRework4 - Audio to core initialization')
         self.audio2core = NNetRAMI(name="audio2core",
                                      model='nebula/models/audio2core.pt',
-                                     in_feature='audio_buffer')
+                                     in_feature='audio_buffer',
+                                     rate=self.net_rate('audio2core'))
 
         logging.info('NNetRework5 - Audio to flow initialization')
         self.audio2flow = NNetRAMI(name="audio2flow",
                                      model='nebula/models/audio2flow.pt',
-                                     in_feature='audio_buffer')
+                                     in_feature='audio_buffer',
+                                     rate=self.net_rate('audio2flow'))
 
         logging.info('NNetRework6 - Flow to audio initialization')
         self.flow2audio = NNetRAMI(name="flow2audio",
                                      model='nebula/models/flow2audio.pt',
-                                     in_feature='eda2flow_2d')
+                                     in_feature='eda2flow_2d',
+                                     rate=self.net_rate('flow2audio'))
 
         logging.info('NNetRework7 - Conductor to flow initialization')
         self.eda2flow = NNetRAMI(name="eda2flow",
                                    model='nebula/models/conductor2flow.pt',
-                                   in_feature='audio2eda_2d')
+                                   in_feature='audio2eda_2d',
+                                   rate=self.net_rate('eda2flow'))
 
         self.netlist = [self.audio2eda,
                         self.flow2core,
@@ -124,32 +192,65 @@ class AIFactoryRAMI:
                         self.audio2flow,
                         self.flow2audio,
                         self.eda2flow]
+
+        # Nets sharing an input run as one fused forward pass
+        self.engine = InferenceEngine(self.netlist,
+                                      fuse=config.batched_inference)
+
+        # Base tick must be fast enough for the fastest net
+        self.tick_rate = max([config.factory_rate] + [net.rate for net in self.netlist])
         print("AI factory initialized")
 
+    @staticmethod
+    def net_rate(name: str) -> float:
+        """
+        Update rate in Hz for the named NNet from config.
+        """
+        return config.nnet_rates.get(name, config.factory_rate)
+
     def make_data(self):
         """
         Makes a prediction for each NNet in the AI factory while hivemind is
-        running.
+        running. Each NNet runs at its own rate, and only if its input has
+        changed since its last prediction. Ticks are scheduled against
+        monotonic deadlines so the rate does not drift under load.
         """
         print("Started making data for Nebula")
+        period = 1 / self.tick_rate
+        next_tick = monotonic()
         while self.hivemind.running:
-            for net in self.netlist:
-                in_val = self.get_seed(net)
-                net.make_prediction(in_val)
+            self.tick(monotonic())
 
             # Create a stream of random poetry
             rnd = random()
             self.hivemind.rnd_poetry = rnd
 
-            sleep(0.1)  # 10 Hz
-
-    def get_seed(self, net_name):
+            next_tick += period
+            delay = next_tick - monotonic()
+            if delay > 0:
+                sleep(delay)
+            elif delay < -period:
+                # Overran by more than a tick, so restart the schedule from now
+                self.missed_ticks += 1
+                logging.debug(f"AI factory missed tick ({self.missed_ticks} total)")
+                next_tick = monotonic()
+
+    def tick(self, now: float):
         """
-        Get the seed data for a given NNet.
+        Run every NNet that is due at monotonic time now and has new input.
         """
-        seed_source = net_name.in_feature
-        seed = getattr(self.hivemind, seed_source)
-        return seed
+        for in_feature, group in self.engine.groups.items():
+            due = [net for net in group if net.is_due(now)]
+            if not due:
+                continue
+            in_val = getattr(self.hivemind, in_feature)
+            dirty = []
+            for net in due:
+                net.schedule_next(now)
+                if net.has_new_input(in_val) or not self.skip_unchanged:
+                    dirty.append(net)
+            if dirty:
+                self.engine.run_group(in_feature, in_val, dirty)
 
     def quit(self):
         """
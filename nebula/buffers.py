@@ -0,0 +1,151 @@
+import numpy as np
+from threading import Event
+
+
+class RingBuffer:
+    def __init__(self,
+                 length: int,
+                 channels: int = None,
+                 dtype=np.float64):
+        """
+        Preallocated sliding window over the last axis. Every value is
+        written twice, length apart, so the current window is always one
+        contiguous slice of the storage and view() never copies.
+
+        Parameters
+        ----------
+        length
+            Number of samples in the window.
+
+        channels
+            Number of rows for a 2D (channels, length) window. None for a
+            1D window.
+
+        dtype
+            Data type of the samples.
+        """
+        self.length = length
+        self.channels = channels
+        shape = (2 * length,) if channels is None else (channels, 2 * length)
+        self._data = np.zeros(shape, dtype=dtype)
+        self._head = 0
+        self.count = 0
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.length
+
+    def append(self, value):
+        """
+        Add one sample (a scalar, or one value per channel).
+        """
+        head = self._head
+        self._data[..., head] = value
+        self._data[..., head + self.length] = value
+        self._head = (head + 1) % self.length
+        self.count += 1
+
+    def extend(self, values):
+        """
+        Add a block of samples along the last axis.
+        """
+        values = np.asarray(values)
+        n = values.shape[-1]
+        if n >= self.length:
+            values = values[..., -self.length:]
+            self.count += n - self.length
+            n = self.length
+        head = self._head
+        first = min(n, self.length - head)
+        self._data[..., head:head + first] = values[..., :first]
+        self._data[..., head + self.length:head + self.length + first] = values[..., :first]
+        rest = n - first
+        if rest:
+            self._data[..., :rest] = values[..., first:]
+            self._data[..., self.length:self.length + rest] = values[..., first:]
+        self._head = (head + n) % self.length
+        self.count += n
+
+    def view(self) -> np.ndarray:
+        """
+        Contiguous window, oldest sample first. This is a view into the
+        buffer, so copy it if it must outlive the next append/extend.
+        """
+        return self._data[..., self._head:self._head + self.length]
+
+    def clear(self):
+        self._data[...] = 0
+        self._head = 0
+        self.count = 0
+
+
+class SampleQueue:
+    def __init__(self,
+                 capacity: int,
+                 dtype=np.int16):
+        """
+        Preallocated single producer, single consumer sample queue, for
+        handing audio from the PyAudio callback thread to the analysis
+        thread. The producer only moves the write count and the consumer
+        only moves the read count, so neither side takes a lock. Blocks
+        that do not fit are dropped and counted, never waited on.
+
+        Parameters
+        ----------
+        capacity
+            Number of samples the queue can hold.
+
+        dtype
+            Data type of the samples.
+        """
+        self.capacity = capacity
+        self.dropped = 0
+        self._data = np.zeros(capacity, dtype=dtype)
+        self._written = 0
+        self._read = 0
+        self._ready = Event()
+
+    def __len__(self) -> int:
+        return self._written - self._read
+
+    def put(self, values) -> bool:
+        """
+        Producer side. Add a 1D block of samples, or drop it if there is no
+        room. Returns False if the block was dropped.
+        """
+        n = len(values)
+        if n > self.capacity - (self._written - self._read):
+            self.dropped += n
+            return False
+        start = self._written % self.capacity
+        first = min(n, self.capacity - start)
+        self._data[start:start + first] = values[:first]
+        self._data[:n - first] = values[first:]
+        self._written += n
+        self._ready.set()
+        return True
+
+    def get(self, n: int, timeout: float = None):
+        """
+        Consumer side. Wait for n samples and return a copy of them, or
+        None if they did not arrive within timeout seconds.
+        """
+        while self._written - self._read < n:
+            self._ready.clear()
+            if self._written - self._read >= n:
+                break
+            if not self._ready.wait(timeout):
+                return None
+        start = self._read % self.capacity
+        first = min(n, self.capacity - start)
+        out = np.empty(n, dtype=self._data.dtype)
+        out[:first] = self._data[start:start + first]
+        out[first:] = self._data[:n - first]
+        self._read += n
+        return out
+
+    def discard(self):
+        """
+        Consumer side. Drop everything waiting in the queue.
+        """
+        self._read = self._written
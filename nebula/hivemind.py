@@ -2,17 +2,84 @@ import numpy as np
 import pickle
 from datetime import datetime
 from random import random, randrange
+from threading import Lock
+
+
+class Snapshot:
+    """
+    Immutable view of every DataBorg field at one version. Fields are read
+    as attributes or items, and all of them come from the same publish.
+    """
+    __slots__ = ('version', '_fields')
+
+    def __init__(self, version: int, fields: dict):
+        object.__setattr__(self, 'version', version)
+        object.__setattr__(self, '_fields', fields)
+
+    def __getattr__(self, name):
+        try:
+            return self._fields[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, name):
+        return self._fields[name]
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Snapshot is read only, use DataBorg.publish")
+
+    def get(self, name, default=None):
+        return self._fields.get(name, default)
+
+    def as_dict(self) -> dict:
+        return dict(self._fields)
+
+
+FIELD_GROUPS = {
+    # one group per writer, so writers never wait on each other
+    'audio2eda': ('audio2eda', 'audio2eda_2d'),
+    'flow2core': ('flow2core', 'flow2core_2d'),
+    'core2flow': ('core2flow', 'core2flow_2d'),
+    'audio2core': ('audio2core', 'audio2core_2d'),
+    'audio2flow': ('audio2flow', 'audio2flow_2d'),
+    'flow2audio': ('flow2audio', 'flow2audio_2d'),
+    'eda2flow': ('eda2flow', 'eda2flow_2d'),
+    'listener': ('mic_in', 'audio_buffer'),
+    'sensors': ('eeg_buffer_raw', 'eeg_buffer', 'eda_buffer_raw', 'eda_buffer'),
+    'factory': ('rnd_poetry',),
+    'conducter': ('master_stream', 'thought_train_stream', 'rhythm_rate', 'design_decision'),
+    'robot': ('current_robot_x_y_z', 'current_robot_x_y', 'current_robot_x_y_times',
+              'current_nnet_x_y_z'),
+    'control': ('interrupted', 'running', 'MASTER_RUNNING'),
+}
+"""Fields published together, by the module that writes them. Any other
+field belongs to the 'shared' group."""
+
+GROUP_OF = {field: group for group, fields in FIELD_GROUPS.items() for field in fields}
 
 
 # DataBorg Pattern
 # https://www.oreilly.com/library/view/python-cookbook/0596001673/ch05s23.html
 # https://stackoverflow.com/questions/1318406/why-is-the-borg-pattern-better-than-the-singleton-pattern-in-python
 class DataBorg:
+    """
+    Shared data for every module. The fields are split into groups, one
+    per writer (see FIELD_GROUPS), and each group is an immutable Snapshot
+    with its own version. A write copies only its group's fields under
+    that group's lock and swaps the new Snapshot in with a single
+    reference assignment, so writers of different groups never contend
+    and readers never take a lock. Plain attribute reads still work and
+    return the latest value of one field; use snapshot() to read several
+    fields that belong together, e.g. a net's _2d output and its mean.
+    """
     __hivemind = None
+    _group_locks = {group: Lock() for group in list(FIELD_GROUPS) + ['shared']}
 
     def __init__(self):
         if not DataBorg.__hivemind:
             DataBorg.__hivemind = self.__dict__
+            self._groups = {group: Snapshot(0, {}) for group in DataBorg._group_locks}
+            self._merged = ((), Snapshot(0, {}))
 
             self.session_date = datetime.now().strftime("%Y_%m_%d_%H%M")
 
@@ -51,7 +118,6 @@ class DataBorg:
             self.audio_mins: list = audio_mins
             self.audio_maxs: list = audio_maxs
 
-            self.audio_buffer_raw = np.empty(0)
             self.audio_buffer: np.array = np.random.uniform(size=(1, 50))
 
             self.eeg_buffer_raw: np.array = np.random.uniform(size=(4, 50))
@@ -112,6 +178,9 @@ class DataBorg:
             self.current_robot_x_y: np.array = np.zeros((2, 50))
             """Normalised 5 sec xy cartesian robot coords buffer"""
 
+            self.current_robot_x_y_times: np.array = np.zeros(50)
+            """time.monotonic() of each sample in current_robot_x_y"""
+
             self.current_nnet_x_y_z: tuple = (0, 0, 0)
             # TODO: 2 first elements could be assigned based on the NNets out
             # eg. flow2core or audio2core
@@ -132,34 +201,92 @@ class DataBorg:
         else:
             self.__dict__ = DataBorg.__hivemind
 
-    def randomiser(self):
-        """ Blitz's the DataBorg dict with random numbers"""
-        self.master_stream = random()
-        self.mic_in = random()
-        self.rnd_poetry = random()
-        self.rhythm_rate = randrange(30, 100) / 100
-
-        self.eeg_buffer = np.random.uniform(size=(4, 50))
-        self.eda_buffer = np.random.uniform(size=(1, 50))
-        self.audio_buffer = np.random.uniform(size=(1, 50))
-
-        self.audio2eda = random()
-        self.audio2eda_2d = np.random.uniform(size=(1, 50))
-
-        self.flow2core = random()
-        self.flow2core_2d = np.random.uniform(size=(2, 50))
-
-        self.core2flow = random()
-        self.core2flow_2d = np.random.uniform(size=(1, 50))
-
-        self.audio2core = random()
-        self.audio2core_2d = np.random.uniform(size=(2, 50))
-
-        self.audio2flow = random()
-        self.audio2flow_2d = np.random.uniform(size=(1, 50))
-
-        self.flow2audio = random()
-        self.flow2audio_2d = np.random.uniform(size=(1, 50))
-
-        self.eda2flow = random()
-        self.eda2flow_2d = np.random.uniform(size=(1, 50))
+    def __setattr__(self, name, value):
+        if name.startswith('_'):
+            object.__setattr__(self, name, value)
+        else:
+            self.publish(**{name: value})
+
+    def publish(self, **fields):
+        """
+        Update one or more fields. Fields of the same group are updated
+        atomically, readers see either all of them or none of them in
+        snapshot(). Fields of different groups are published one group
+        after the other.
+        """
+        by_group = {}
+        for name, value in fields.items():
+            by_group.setdefault(GROUP_OF.get(name, 'shared'), {})[name] = value
+        for group, values in by_group.items():
+            with DataBorg._group_locks[group]:
+                snapshot = self._groups[group]
+                new_fields = dict(snapshot._fields)
+                new_fields.update(values)
+                self.__dict__.update(values)
+                self._groups[group] = Snapshot(snapshot.version + 1, new_fields)
+
+    def snapshot(self) -> Snapshot:
+        """
+        Read only view of every field, combined from the latest Snapshot
+        of each group. Its version is the sum of the group versions. The
+        combined view is only rebuilt when a group has changed.
+        """
+        groups = tuple(self._groups.values())
+        merged_from, merged = self._merged
+        if len(groups) == len(merged_from) and all(a is b for a, b in zip(groups, merged_from)):
+            return merged
+        fields = {}
+        for snapshot in groups:
+            fields.update(snapshot._fields)
+        merged = Snapshot(sum(snapshot.version for snapshot in groups), fields)
+        self._merged = (groups, merged)
+        return merged
+
+    def group_snapshot(self, group: str) -> Snapshot:
+        """
+        Latest Snapshot of one group of FIELD_GROUPS, without combining.
+        """
+        return self._groups[group]
+
+    @property
+    def version(self) -> int:
+        """
+        Number of group publishes so far.
+        """
+        return sum(snapshot.version for snapshot in tuple(self._groups.values()))
+
+    def randomiser(self, **fields):
+        """ Blitz's the DataBorg dict with random numbers, in one publish
+        with any other fields given"""
+        self.publish(
+            **fields,
+            master_stream=random(),
+            mic_in=random(),
+            rnd_poetry=random(),
+            rhythm_rate=randrange(30, 100) / 100,
+
+            eeg_buffer=np.random.uniform(size=(4, 50)),
+            eda_buffer=np.random.uniform(size=(1, 50)),
+            audio_buffer=np.random.uniform(size=(1, 50)),
+
+            audio2eda=random(),
+            audio2eda_2d=np.random.uniform(size=(1, 50)),
+
+            flow2core=random(),
+            flow2core_2d=np.random.uniform(size=(2, 50)),
+
+            core2flow=random(),
+            core2flow_2d=np.random.uniform(size=(1, 50)),
+
+            audio2core=random(),
+            audio2core_2d=np.random.uniform(size=(2, 50)),
+
+            audio2flow=random(),
+            audio2flow_2d=np.random.uniform(size=(1, 50)),
+
+            flow2audio=random(),
+            flow2audio_2d=np.random.uniform(size=(1, 50)),
+
+            eda2flow=random(),
+            eda2flow_2d=np.random.uniform(size=(1, 50)),
+        )
@@ -0,0 +1,88 @@
+import logging
+import numpy as np
+
+import config
+from nebula.hivemind import DataBorg
+
+if config.nnet_backend == 'numpy':
+    from nebula.models.np_models import NumpyHourglass
+else:
+    import torch
+    from nebula.models.pt_models import FusedHourglass
+
+
+class InferenceEngine:
+    def __init__(self, netlist: list, fuse: bool = True):
+        """
+        Runs the AI factory nets grouped by their input feature. Nets that
+        read the same DataBorg feature (e.g. audio2eda, audio2core and
+        audio2flow all read audio_buffer) share one fused forward pass.
+
+        Parameters
+        ----------
+        netlist
+            NNetRAMI objects in the order they should be run. Groups keep
+            the order in which their first net appears.
+
+        fuse
+            Fuse groups of nets into one forward pass. If False every net
+            runs its own model.
+        """
+        self.hivemind = DataBorg()
+
+        self.groups = {}
+        for net in netlist:
+            self.groups.setdefault(net.in_feature, []).append(net)
+
+        self.fused = {}
+        for in_feature, nets in self.groups.items():
+            if fuse and len(nets) > 1:
+                state_dicts = [net.model.state_dict() for net in nets]
+                if config.nnet_backend == 'numpy':
+                    self.fused[in_feature] = NumpyHourglass(state_dicts,
+                                                            config.nnet_dtype)
+                else:
+                    self.fused[in_feature] = FusedHourglass(state_dicts)
+                logging.info(f"Fused {[net.name for net in nets]} on {in_feature}")
+
+    def run(self):
+        """
+        Make a prediction for every net, one forward pass per input group.
+        """
+        for in_feature in self.groups:
+            self.run_group(in_feature, getattr(self.hivemind, in_feature))
+
+    def run_group(self, in_feature: str, in_val, nets: list = None):
+        """
+        Make predictions for the nets that read in_feature.
+
+        Parameters
+        ----------
+        in_feature
+            DataBorg feature shared by the group.
+
+        in_val
+            2D input value for the group.
+
+        nets
+            Subset of the group to publish. Defaults to the whole group.
+        """
+        if nets is None:
+            nets = self.groups[in_feature]
+
+        if in_feature not in self.fused or len(nets) == 1:
+            for net in nets:
+                net.make_prediction(in_val)
+            return
+
+        fused = self.fused[in_feature]
+        if config.nnet_backend == 'numpy':
+            predictions = fused(in_val[np.newaxis, :, :])
+        else:
+            with torch.inference_mode():
+                x = torch.as_tensor(in_val[np.newaxis, :, :],
+                                    dtype=fused.conv1.weight.dtype)
+                predictions = [prediction.numpy() for prediction in fused(x)]
+        for net, prediction in zip(self.groups[in_feature], predictions):
+            if net in nets:
+                net.publish(np.squeeze(prediction, axis=0))
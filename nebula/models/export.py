@@ -0,0 +1,59 @@
+"""
+Export the trained Hourglass state dicts as TorchScript artifacts and NumPy
+weights next to the .pt files, so the AI factory can load them without
+rebuilding the nets (or without torch at all for the numpy backend).
+Run from the project root after retraining:
+
+    python -m nebula.models.export
+"""
+import logging
+import numpy as np
+import torch
+from pathlib import Path
+
+from nebula.models.np_models import weights_path
+from nebula.models.pt_models import build_hourglass, script_path
+
+MODELS_PATH = Path(__file__).parent
+
+
+def export_torchscript(model, dtype: str = 'float64') -> Path:
+    """
+    Trace one .pt state dict and save it as TorchScript in the given dtype.
+    """
+    pt_model = build_hourglass(torch.load(model), dtype)
+
+    example = torch.zeros(1, pt_model.conv1.in_channels, 50, dtype=getattr(torch, dtype))
+    with torch.no_grad():
+        traced = torch.jit.trace(pt_model, example)
+    out_path = script_path(model, dtype)
+    torch.jit.save(traced, out_path)
+    logging.info(f"Exported {out_path}")
+    return out_path
+
+
+def export_numpy(model) -> Path:
+    """
+    Save one .pt state dict as NumPy arrays for the numpy backend.
+    """
+    state_dict = torch.load(model)
+    out_path = weights_path(model)
+    np.savez(out_path, **{key: value.numpy() for key, value in state_dict.items()})
+    logging.info(f"Exported {out_path}")
+    return out_path
+
+
+def export_all(models_path=MODELS_PATH, dtypes=('float64', 'float32')):
+    """
+    Export every .pt model in models_path as NumPy weights and as
+    TorchScript in each dtype.
+    """
+    for model in sorted(Path(models_path).glob('*.pt')):
+        export_numpy(model)
+        for dtype in dtypes:
+            export_torchscript(model, dtype)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    export_all()
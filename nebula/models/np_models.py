@@ -0,0 +1,98 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from pathlib import Path
+
+
+def weights_path(model) -> Path:
+    """
+    Location of the NumPy weights exported for a .pt model.
+    """
+    return Path(model).with_suffix('.npz')
+
+
+def load_state_dict(model) -> dict:
+    """
+    Load the NumPy weights for a .pt model as a state dict of arrays.
+    """
+    path = weights_path(model)
+    if not path.exists():
+        raise FileNotFoundError(f"{path} not found, run python -m nebula.models.export")
+    with np.load(path) as weights:
+        return {key: weights[key] for key in weights.files}
+
+
+class NumpyHourglass:
+    """
+    Pure NumPy inference for one or more trained Hourglass nets that read the
+    same input. BatchNorm is folded into the conv at load time and the
+    weights of several nets are stacked, so a group runs as one vectorized
+    pass. Matches Hourglass.forward in eval mode.
+    """
+
+    def __init__(self, state_dicts: list, dtype: str = 'float64', eps: float = 1e-5):
+        dtype = np.dtype(dtype)
+        self.dtype = dtype
+        self.state_dicts = state_dicts
+        self.n_nets = len(state_dicts)
+        self.n_ch_out = [sd['tconv1.weight'].shape[1] for sd in state_dicts]
+        self.max_ch_out = max(self.n_ch_out)
+
+        # Encoder, BatchNorm folded into the conv
+        conv_w, conv_b = [], []
+        for sd in state_dicts:
+            scale = sd['bn1.weight'] / np.sqrt(sd['bn1.running_var'] + eps)
+            conv_w.append(sd['conv1.weight'] * scale[:, np.newaxis, np.newaxis])
+            conv_b.append((sd['conv1.bias'] - sd['bn1.running_mean']) * scale + sd['bn1.bias'])
+        self.conv_w = np.concatenate(conv_w).astype(dtype)
+        self.conv_b = np.concatenate(conv_b)[:, np.newaxis].astype(dtype)
+        self.fc1_w = np.stack([sd['fc1.weight'].T for sd in state_dicts]).astype(dtype)
+        self.fc1_b = np.stack([sd['fc1.bias'] for sd in state_dicts])[:, np.newaxis].astype(dtype)
+
+        # Decoder, nets with fewer output channels are zero padded
+        self.fc2_w = np.stack([sd['fc2.weight'].T for sd in state_dicts]).astype(dtype)
+        self.fc2_b = np.stack([sd['fc2.bias'] for sd in state_dicts])[:, np.newaxis].astype(dtype)
+        self.tconv_w = np.zeros((self.n_nets, 8, self.max_ch_out, 5), dtype=dtype)
+        self.tconv_b = np.zeros((self.n_nets, self.max_ch_out, 1), dtype=dtype)
+        for i, sd in enumerate(state_dicts):
+            self.tconv_w[i, :, :self.n_ch_out[i]] = sd['tconv1.weight']
+            self.tconv_b[i, :self.n_ch_out[i], 0] = sd['tconv1.bias']
+
+    @classmethod
+    def load(cls, models: list, dtype: str = 'float64'):
+        """
+        Build from the exported weights of one or more .pt models.
+        """
+        return cls([load_state_dict(model) for model in models], dtype)
+
+    def state_dict(self) -> dict:
+        """
+        Weights of the first (or only) net, as exported.
+        """
+        return self.state_dicts[0]
+
+    def __call__(self, x) -> list:
+        """
+        Forward pass for a (batch, n_ch_in, length) input. Returns one
+        (batch, n_ch_out, length) prediction per net.
+        """
+        x = np.asarray(x, dtype=self.dtype)
+        batch_size = x.shape[0]
+
+        # Encode
+        windows = sliding_window_view(x, 5, axis=2)[:, :, ::3]
+        x = np.einsum('bctj,ocj->bot', windows, self.conv_w) + self.conv_b
+        np.maximum(x, 0, out=x)
+        length = x.shape[-1]
+        x = x.reshape(batch_size, self.n_nets, -1).transpose(1, 0, 2)  # flatten per net
+        x = np.maximum(x @ self.fc1_w + self.fc1_b, 0)
+
+        # Decode
+        x = np.maximum(x @ self.fc2_w + self.fc2_b, 0)
+        x = x.reshape(self.n_nets, batch_size, 8, length)  # un-flatten
+        taps = np.einsum('kbct,kcoj->bkojt', x, self.tconv_w)
+        out = np.empty((batch_size, self.n_nets, self.max_ch_out, (length - 1) * 3 + 5), dtype=self.dtype)
+        out[:] = self.tconv_b
+        for j in range(5):
+            out[..., j:j + length * 3 - 2:3] += taps[..., j, :]
+        out = 1 / (1 + np.exp(-out))
+        return [out[:, i, :n_out] for i, n_out in enumerate(self.n_ch_out)]
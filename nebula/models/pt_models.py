@@ -1,5 +1,8 @@
+import logging
+import torch
 import torch.nn as nn
 import torch.nn.functional as F
+from pathlib import Path
 
 
 class Hourglass(nn.Module):
@@ -25,3 +28,113 @@ class Hourglass(nn.Module):
         x = x.view(batch_size, 8, -1)  # un-flatten
         x = F.sigmoid(self.tconv1(x))
         return x
+
+
+class FusedHourglass(nn.Module):
+    """
+    Several trained Hourglass nets that read the same input, fused into a
+    single forward pass. The encoder convs are stacked into one wide conv,
+    the dense layers run as one batched matmul and the decoders as one
+    grouped transposed conv. Inference only (BatchNorm uses running stats).
+    """
+
+    def __init__(self, state_dicts):
+        super(FusedHourglass, self).__init__()
+        self.n_nets = len(state_dicts)
+        self.n_ch_out = [sd['tconv1.weight'].size(1) for sd in state_dicts]
+        self.max_ch_out = max(self.n_ch_out)
+        n_ch_in = state_dicts[0]['conv1.weight'].size(1)
+        dtype = state_dicts[0]['conv1.weight'].dtype
+
+        # Encoder
+        self.conv1 = nn.Conv1d(n_ch_in, 8 * self.n_nets, kernel_size=5, stride=3)
+        self.bn1 = nn.BatchNorm1d(8 * self.n_nets)
+        self.fc1_weight = nn.Parameter(torch.empty(self.n_nets, 128, 32))
+        self.fc1_bias = nn.Parameter(torch.empty(self.n_nets, 1, 32))
+        # Decoder
+        self.fc2_weight = nn.Parameter(torch.empty(self.n_nets, 32, 128))
+        self.fc2_bias = nn.Parameter(torch.empty(self.n_nets, 1, 128))
+        self.tconv1 = nn.ConvTranspose1d(8 * self.n_nets,
+                                         self.max_ch_out * self.n_nets,
+                                         kernel_size=5, stride=3,
+                                         groups=self.n_nets)
+        self.to(dtype)
+
+        with torch.no_grad():
+            self.conv1.weight.copy_(torch.cat([sd['conv1.weight'] for sd in state_dicts]))
+            self.conv1.bias.copy_(torch.cat([sd['conv1.bias'] for sd in state_dicts]))
+            for param in ['weight', 'bias', 'running_mean', 'running_var']:
+                getattr(self.bn1, param).copy_(torch.cat([sd[f'bn1.{param}'] for sd in state_dicts]))
+            self.fc1_weight.copy_(torch.stack([sd['fc1.weight'].t() for sd in state_dicts]))
+            self.fc1_bias.copy_(torch.stack([sd['fc1.bias'] for sd in state_dicts]).unsqueeze(1))
+            self.fc2_weight.copy_(torch.stack([sd['fc2.weight'].t() for sd in state_dicts]))
+            self.fc2_bias.copy_(torch.stack([sd['fc2.bias'] for sd in state_dicts]).unsqueeze(1))
+
+            # Nets with fewer output channels are zero padded up to max_ch_out
+            self.tconv1.weight.zero_()
+            self.tconv1.bias.zero_()
+            for i, sd in enumerate(state_dicts):
+                n_out = self.n_ch_out[i]
+                self.tconv1.weight[i * 8:(i + 1) * 8, :n_out] = sd['tconv1.weight']
+                start = i * self.max_ch_out
+                self.tconv1.bias[start:start + n_out] = sd['tconv1.bias']
+        self.eval()
+
+    def forward(self, x):
+        batch_size = x.size(0)
+        # Encode
+        x = F.relu(self.bn1(self.conv1(x)))
+        x = x.view(batch_size, self.n_nets, -1).transpose(0, 1)  # flatten per net
+        x = F.relu(torch.baddbmm(self.fc1_bias, x, self.fc1_weight))
+        # Decode
+        x = F.relu(torch.baddbmm(self.fc2_bias, x, self.fc2_weight))
+        x = x.transpose(0, 1).reshape(batch_size, self.n_nets * 8, -1)  # un-flatten
+        x = F.sigmoid(self.tconv1(x))
+        x = x.view(batch_size, self.n_nets, self.max_ch_out, -1)
+        return [x[:, i, :n_out] for i, n_out in enumerate(self.n_ch_out)]
+
+
+def script_path(model, dtype: str = 'float64') -> Path:
+    """
+    Location of the TorchScript artifact exported for a .pt model.
+    """
+    model = Path(model)
+    return model.with_name(f"{model.stem}_{dtype}.ts")
+
+
+def build_hourglass(state_dict, dtype: str = 'float64'):
+    """
+    Hourglass from a trained state dict in the given dtype. The module is
+    cast before the weights are loaded, so float64 weights are copied as
+    they are instead of through a float32 module.
+    """
+    n_ch_in = state_dict['conv1.weight'].size(1)
+    n_ch_out = state_dict['tconv1.weight'].size(1)
+    pt_model = Hourglass(n_ch_in, n_ch_out).to(getattr(torch, dtype))
+    pt_model.load_state_dict(state_dict)
+    pt_model.eval()
+    return pt_model
+
+
+def load_hourglass(model, dtype: str = 'float64'):
+    """
+    Load a trained Hourglass ready for inference. Prefers the TorchScript
+    artifact written by nebula/models/export.py if it is up to date with the
+    .pt state dict, otherwise rebuilds the net from the state dict.
+
+    Parameters
+    ----------
+    model
+        Location of the .pt state dict.
+
+    dtype
+        'float64' (as trained) or 'float32'.
+    """
+    scripted = script_path(model, dtype)
+    if scripted.exists() and scripted.stat().st_mtime >= Path(model).stat().st_mtime:
+        pt_model = torch.jit.load(scripted)
+        logging.debug(f"Loaded TorchScript {scripted}")
+    else:
+        pt_model = build_hourglass(torch.load(model), dtype)
+    pt_model.eval()
+    return pt_model
@@ -0,0 +1,89 @@
+import numpy as np
+
+import config
+import nebula.ai_factory as ai_factory
+from nebula.ai_factory import AIFactoryRAMI
+
+
+def make_factory(monkeypatch, rates=None, skip_unchanged=True):
+    monkeypatch.setattr(config, 'factory_rate', 10)
+    monkeypatch.setattr(config, 'nnet_rates', rates or {})
+    monkeypatch.setattr(config, 'nnet_skip_unchanged', skip_unchanged)
+    factory = AIFactoryRAMI()
+    runs = {net.name: 0 for net in factory.netlist}
+    run_group = factory.engine.run_group
+
+    def counting_run_group(in_feature, in_val, nets=None):
+        for net in nets:
+            runs[net.name] += 1
+        run_group(in_feature, in_val, nets)
+
+    monkeypatch.setattr(factory.engine, 'run_group', counting_run_group)
+    return factory, runs
+
+
+def new_inputs(hivemind):
+    hivemind.publish(audio_buffer=np.random.uniform(size=(1, 50)),
+                     eda2flow_2d=np.random.uniform(size=(1, 50)),
+                     audio2eda_2d=np.random.uniform(size=(1, 50)),
+                     current_robot_x_y=np.random.uniform(size=(2, 50)))
+
+
+def test_nets_run_at_their_own_rate(monkeypatch, hivemind):
+    factory, runs = make_factory(monkeypatch, rates={'audio2eda': 5})
+    assert factory.audio2eda.rate == 5 and factory.audio2core.rate == 10
+    # fake clock at 100 Hz for 10 seconds, fresh input every tick
+    for i in range(1000):
+        new_inputs(hivemind)
+        factory.tick(i / 100)
+
+    assert abs(runs['audio2core'] - 100) <= 1
+    assert abs(runs['audio2eda'] - 50) <= 1
+    assert abs(runs['audio2core'] - 2 * runs['audio2eda']) <= 2
+
+
+def test_unchanged_input_is_skipped(monkeypatch, hivemind):
+    # nets whose input no other net writes, eda2flow reads audio2eda_2d etc.
+    sources = ['audio2eda', 'audio2core', 'audio2flow', 'core2flow']
+    new_inputs(hivemind)
+    factory, runs = make_factory(monkeypatch, skip_unchanged=True)
+    # tick just after each 10 Hz deadline, the summed periods round up
+    for i in range(10):
+        factory.tick(i / 10 + 0.001)
+    assert [runs[name] for name in sources] == [1, 1, 1, 1]
+
+    hivemind.audio_buffer = np.random.uniform(size=(1, 50))
+    factory.tick(1.001)
+    assert runs['audio2eda'] == runs['audio2core'] == runs['audio2flow'] == 2
+    assert runs['core2flow'] == 1
+
+    factory, runs = make_factory(monkeypatch, skip_unchanged=False)
+    for i in range(10):
+        factory.tick(i / 10 + 0.001)
+    assert set(runs.values()) == {10}
+
+
+def test_overrun_counts_missed_ticks(monkeypatch, hivemind):
+    factory, _ = make_factory(monkeypatch)
+    clock = [100.0]
+    ticks = []
+
+    def tick(now):
+        ticks.append(now)
+        if len(ticks) == 3:
+            clock[0] += 0.5  # one tick takes five periods
+        if len(ticks) == 10:
+            hivemind.running = False
+
+    def sleep(seconds):
+        clock[0] += seconds
+
+    monkeypatch.setattr(ai_factory, 'monotonic', lambda: clock[0])
+    monkeypatch.setattr(ai_factory, 'sleep', sleep)
+    monkeypatch.setattr(factory, 'tick', tick)
+    hivemind.running = True
+    factory.make_data()
+
+    assert factory.missed_ticks == 1
+    # the schedule restarts after the overrun instead of bursting to catch up
+    assert np.allclose(np.diff(ticks), [0.1, 0.1, 0.5] + [0.1] * 6)
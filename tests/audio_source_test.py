@@ -0,0 +1,71 @@
+import wave
+
+import numpy as np
+
+import config
+import modules.audio_source as audio_source
+from modules.audio_source import WavFileSource
+
+
+def write_wav(path, samples, rate=44100):
+    with wave.open(str(path), 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(samples.astype(np.int16).tobytes())
+
+
+def tone(seconds, rate=44100):
+    t = np.arange(int(seconds * rate)) / rate
+    return 8000 * np.sin(2 * np.pi * 220 * t) * (1 + np.sin(2 * np.pi * 0.5 * t)) / 2
+
+
+def test_replay_returns_file_in_chunks(tmp_path):
+    samples = tone(1).astype(np.int16)
+    write_wav(tmp_path / 'tone.wav', samples)
+    source = WavFileSource(tmp_path / 'tone.wav', chunk=1000, speed=0)
+    source.start()
+
+    chunks = []
+    while (chunk := source.read()) is not None:
+        chunks.append(chunk)
+    assert source.finished
+    np.testing.assert_array_equal(np.concatenate(chunks), samples[:len(chunks) * 1000])
+
+
+def test_replay_is_paced(tmp_path, monkeypatch):
+    clock = [0.0]
+
+    def sleep(seconds):
+        clock[0] += seconds
+
+    monkeypatch.setattr(audio_source, 'monotonic', lambda: clock[0])
+    monkeypatch.setattr(audio_source, 'sleep', sleep)
+    write_wav(tmp_path / 'tone.wav', tone(1))
+    source = WavFileSource(tmp_path / 'tone.wav', chunk=4410, speed=4)
+    source.start()
+
+    # each chunk is due a quarter of its duration after the last one
+    delivered = []
+    while (chunk := source.read()) is not None:
+        delivered.append((clock[0], len(chunk)))
+    assert [n for _, n in delivered] == [4410] * 10
+    np.testing.assert_allclose([t for t, _ in delivered], np.arange(1, 11) * 0.025)
+
+
+def test_listener_runs_from_replay(tmp_path, monkeypatch, hivemind):
+    from modules.listener import Listener
+
+    monkeypatch.setattr(config, 'record_audio', False)
+    monkeypatch.setattr(config, 'silence_listener', False)
+    write_wav(tmp_path / 'session.wav', tone(8))
+
+    listener = Listener(WavFileSource(tmp_path / 'session.wav', speed=0))
+    hivemind.running = True
+    hivemind.audio_buffer = None
+    listener.snd_listen()
+    listener.terminate_listener()
+
+    assert hivemind.audio_buffer.shape == (1, 50)
+    assert 0 <= hivemind.audio_buffer.min() and hivemind.audio_buffer.max() <= 1
+    assert 0 <= hivemind.mic_in <= 1
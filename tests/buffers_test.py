@@ -0,0 +1,51 @@
+import numpy as np
+from threading import Thread
+
+from nebula.buffers import RingBuffer, SampleQueue
+
+
+def test_ring_buffer_matches_sliding_window():
+    ring = RingBuffer(50)
+    expected = np.empty(0)
+    for _ in range(40):
+        chunk = np.random.uniform(size=np.random.randint(1, 30))
+        ring.extend(chunk)
+        expected = np.append(expected, chunk)[-50:]
+        if ring.full:
+            np.testing.assert_array_equal(ring.view(), expected)
+            assert ring.view().flags['C_CONTIGUOUS']
+
+
+def test_ring_buffer_channels():
+    ring = RingBuffer(3, channels=2)
+    for i in range(5):
+        ring.append((i, -i))
+    np.testing.assert_array_equal(ring.view(), [[2, 3, 4], [-2, -3, -4]])
+
+    ring.extend(np.arange(8).reshape(2, 4))
+    np.testing.assert_array_equal(ring.view(), [[1, 2, 3], [5, 6, 7]])
+
+
+def test_sample_queue_hands_over_in_order():
+    queue = SampleQueue(capacity=1000)
+    sent = np.arange(20000, dtype=np.int16)
+
+    def producer():
+        for start in range(0, len(sent), 300):
+            while not queue.put(sent[start:start + 300]):
+                queue.dropped = 0  # consumer is behind, retry
+
+    thread = Thread(target=producer)
+    thread.start()
+    received = [queue.get(250, timeout=5) for _ in range(len(sent) // 250)]
+    thread.join()
+    np.testing.assert_array_equal(np.concatenate(received), sent)
+
+
+def test_sample_queue_counts_dropped_blocks():
+    queue = SampleQueue(capacity=10)
+    assert queue.put(np.ones(8))
+    assert not queue.put(np.ones(5))
+    assert queue.dropped == 5
+    assert len(queue.get(8)) == 8
+    assert queue.get(1, timeout=0.01) is None
@@ -0,0 +1,15 @@
+import pytest
+
+from nebula.hivemind import DataBorg
+
+
+@pytest.fixture
+def hivemind():
+    """
+    The shared DataBorg, with the fields it had before the test published
+    back afterwards.
+    """
+    hivemind = DataBorg()
+    fields = hivemind.snapshot().as_dict()
+    yield hivemind
+    hivemind.publish(**fields)
@@ -0,0 +1,61 @@
+import json
+
+import numpy as np
+
+from modules.decimate import MinMaxDecimator, decimate_session
+from modules.session_log import convert_json, iter_session_chunks
+from tests.session_log_test import make_records
+
+
+def test_extremes_survive_chunking():
+    rng = np.random.default_rng(0)
+    dates_ns = 1_700_000_000_000_000_000 + np.arange(50000, dtype=np.int64) * 10_000_000
+    values = rng.normal(size=len(dates_ns))
+    values[12345] = 40
+    values[40000] = -40
+    values[100:200] = np.nan
+
+    whole = MinMaxDecimator(["v"], 500)
+    whole.add(dates_ns, {"v": values})
+    chunked = MinMaxDecimator(["v"], 500)
+    for start in range(0, len(dates_ns), 777):
+        chunked.add(dates_ns[start:start + 777], {"v": values[start:start + 777]})
+
+    times, decimated = chunked.series("v")
+    assert 500 <= len(times) <= 1000
+    assert (np.diff(times) >= 0).all()
+    assert np.nanmax(decimated) == 40 and np.nanmin(decimated) == -40
+    assert times[np.nanargmax(decimated)] == dates_ns[12345]
+    # every point is a real sample
+    assert np.isin(times, dates_ns).all()
+    index = np.searchsorted(dates_ns, times)
+    np.testing.assert_array_equal(decimated[~np.isnan(decimated)],
+                                  values[index][~np.isnan(decimated)])
+
+    whole_times, whole_decimated = whole.series("v")
+    np.testing.assert_array_equal(times, whole_times)
+    np.testing.assert_array_equal(decimated, whole_decimated)
+
+
+def test_chunks_of_json_and_npz_agree(tmp_path):
+    records = make_records(250)
+    path = tmp_path / "log.jsonl"
+    path.write_text("\n".join(json.dumps(record) for record in records) + "\n")
+    npz_path = convert_json(path)
+
+    json_chunks = list(iter_session_chunks(path, chunk_rows=100))
+    npz_chunks = list(iter_session_chunks(npz_path, chunk_rows=100))
+    assert [len(chunk["date_ns"]) for chunk in npz_chunks] == [100, 100, 50]
+    assert len(json_chunks) == len(npz_chunks)
+    for json_chunk, npz_chunk in zip(json_chunks, npz_chunks):
+        for name in ["date_ns", "mic_in", "interrupt", "master_stream_codes"]:
+            np.testing.assert_array_equal(json_chunk[name], npz_chunk[name])
+    # codes keep their meaning across chunks, the second half only has "arc"
+    assert list(json_chunks[-1]["design_decision_categories"]) == ["dot", "arc"]
+    assert set(json_chunks[-1]["design_decision_codes"]) == {1}
+
+    decimator, categories = decimate_session(npz_path, ["mic_in", "master_stream_codes"], 100, chunk_rows=64)
+    assert decimator.samples == 250
+    assert list(categories["master_stream_categories"]) == ["mic_in", "rnd_poetry", " "]
+    times, values = decimator.series("mic_in")
+    assert values.max() == np.float32(249e-5)
@@ -0,0 +1,109 @@
+import numpy as np
+
+from modules.draw_xarm import Drawbot, PathBuilder
+
+
+class RecordingDrawbot(Drawbot):
+    """
+    Drawbot without an arm, records the motion calls of draw_path.
+    """
+    last_used_position = [0, 0, 158, 180, 0, 0]
+
+    def __init__(self, path_submit):
+        self.calls = []
+        self.coords = []
+        self.squares = []
+        self.z = 158
+        self.ready_position = [0, 0, 258]
+        self.roll = None
+        self.pitch = None
+        self.yaw = 0
+        self.speed = 150
+        self.mvacc = 150
+        self.wait_commands = False
+        self.path_submit = path_submit
+        self.pipeline_depth = 16
+        self.blend_radius = 2
+        self.path_running = False
+
+    def get_pose(self):
+        return [10, 20, self.z]
+
+    def set_mode(self, mode=0, **kwargs):
+        self.calls.append(('set_mode', mode))
+
+    def set_state(self, state=0):
+        self.calls.append(('set_state', state))
+
+    def set_pipeline_depth(self, depth):
+        self.calls.append(('set_pipeline_depth', depth))
+
+    def drain_pipeline(self, timeout=None):
+        self.calls.append(('drain_pipeline',))
+        return 0
+
+    def set_position(self, **kwargs):
+        self.calls.append(('set_position', kwargs))
+
+    def move_arc_lines(self, paths, **kwargs):
+        self.calls.append(('move_arc_lines', paths, kwargs))
+
+
+def test_path_builder_vertices():
+    path = PathBuilder((0, 0), z=158, lift=100, radius=2, capacity=2)
+    path.line_to(10, 0).line_to(10, 10).jump_to(20, 20).line_to(30, 20).close()
+    np.testing.assert_array_equal(path.vertices, [
+        [10, 0, 158, 2],
+        [10, 10, 158, 2],
+        [10, 10, 258, 0],
+        [20, 20, 258, 0],
+        [20, 20, 158, 0],
+        [30, 20, 158, 2],
+        [0, 0, 158, 2],
+    ])
+
+
+def test_square_is_one_pipelined_burst():
+    drawbot = RecordingDrawbot('pipeline')
+    drawbot.draw_square(30)
+
+    names = [call[0] for call in drawbot.calls]
+    assert names == ['set_mode', 'set_state', 'set_pipeline_depth'] + ['set_position'] * 4 + \
+        ['drain_pipeline', 'set_pipeline_depth']
+    moves = [call[1] for call in drawbot.calls if call[0] == 'set_position']
+    assert [(move['x'], move['y']) for move in moves] == [(40, 20), (40, 50), (10, 50), (10, 20)]
+    assert [move['radius'] for move in moves] == [2, 2, 2, 0]
+    assert not any(move['wait'] for move in moves)
+    assert moves[0]['roll'] == 180 and moves[0]['yaw'] == 0
+    assert drawbot.squares == [[[40, 20], [40, 50], [10, 50]]]
+
+    # the square is still running in mode 0, the next move preempts it in mode 7
+    assert drawbot.path_running
+    drawbot.calls = []
+    drawbot.bot_move_to(x=0, y=0, z=258)
+    assert [call[:2] for call in drawbot.calls[:2]] == [('set_mode', 7), ('set_state', 0)]
+    assert drawbot.calls[2][0] == 'set_position'
+    assert not drawbot.path_running
+
+
+def test_path_waits_when_asked():
+    drawbot = RecordingDrawbot('pipeline')
+    path = drawbot.new_path().line_to(40, 20).line_to(40, 50)
+    drawbot.draw_path(path, wait=True)
+
+    moves = [call[1] for call in drawbot.calls if call[0] == 'set_position']
+    assert [move['wait'] for move in moves] == [False, True]
+    assert drawbot.calls[-2:] == [('set_mode', 7), ('set_state', 0)]
+    assert not drawbot.path_running
+
+
+def test_char_jump_with_arc_lines():
+    drawbot = RecordingDrawbot('arc_lines')
+    drawbot.draw_char('F', 10)
+
+    (_, paths, kwargs), = [call for call in drawbot.calls if call[0] == 'move_arc_lines']
+    assert not kwargs['wait'] and not kwargs['automatic_calibration']
+    assert [path[:3] for path in paths] == [
+        [10, 20, 158], [30, 20, 158], [30, 15, 158],
+        [30, 15, 258], [20, 15, 258], [20, 15, 158],
+        [20, 20, 158]]
@@ -0,0 +1,63 @@
+"""
+Benchmark the incremental envelope against the full-window Hilbert envelope
+used by the listener, on 30 sec of synthetic mic input in 2048 sample chunks.
+Run from the project root:
+
+    python -m tests.envelope_benchmark
+"""
+import numpy as np
+from time import perf_counter
+
+from modules.envelope import EnvelopeFollower, hilbert_envelope
+from nebula.buffers import RingBuffer
+
+RATE = 44100
+CHUNK = 2**11
+SECONDS = 30
+
+
+def make_signal():
+    t = np.arange(RATE * SECONDS) / RATE
+    amplitude = 6000 * (1 + np.sin(2 * np.pi * 0.3 * t)) + 500
+    tone = np.sin(2 * np.pi * 220 * t) + 0.3 * np.sin(2 * np.pi * 661 * t)
+    noise = np.random.normal(scale=200, size=len(t))
+    return np.clip(amplitude * tone + noise, -2**15, 2**15 - 1).astype(np.int16)
+
+
+def main():
+    audio = make_signal()
+    chunks = [audio[i:i + CHUNK] for i in range(0, len(audio) - CHUNK, CHUNK)]
+
+    data_buffer = RingBuffer(RATE * 5)
+    full_time = 0
+    for chunk in chunks:
+        start = perf_counter()
+        data_buffer.extend(chunk)
+        if data_buffer.full:
+            hilbert_envelope(data_buffer.view(), RATE)
+        full_time += perf_counter() - start
+
+    follower = EnvelopeFollower(RATE)
+    incremental_time = 0
+    for chunk in chunks:
+        start = perf_counter()
+        follower.update(chunk)
+        incremental_time += perf_counter() - start
+    incremental = follower.view()
+
+    # Compare against the Hilbert envelope of the same bins, ignoring the
+    # resample edge effects
+    bin_size = RATE // 10
+    end = len(chunks) * CHUNK // bin_size * bin_size
+    reference = hilbert_envelope(audio[end - RATE * 5:end], RATE)[0, 2:-2]
+    error = np.abs(incremental[0, 2:-2] - reference).mean() / reference.mean()
+
+    print(f"chunks: {len(chunks)}")
+    print(f"full window hilbert: {full_time / len(chunks) * 1e6:.1f} us per chunk")
+    print(f"incremental:         {incremental_time / len(chunks) * 1e6:.1f} us per chunk")
+    print(f"speedup:             {full_time / incremental_time:.0f}x")
+    print(f"mean relative difference: {error:.3f}")
+
+
+if __name__ == "__main__":
+    main()
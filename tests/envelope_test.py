@@ -0,0 +1,47 @@
+import numpy as np
+
+from modules.envelope import EnvelopeFollower, hilbert_envelope
+
+CHUNKS = [30, 250, 70, 1, 99, 512, 38]
+
+
+def uneven_chunks(audio):
+    start = 0
+    while start < len(audio):
+        for size in CHUNKS:
+            yield audio[start:start + size]
+            start += size
+
+
+def test_partial_bins_carry_over():
+    rng = np.random.default_rng(0)
+    audio = rng.normal(scale=1000, size=5000)
+    follower = EnvelopeFollower(rate=1000, envelope_rate=10, seconds=5)
+
+    done = 0
+    for chunk in uneven_chunks(audio):
+        points = follower.update(chunk)
+        # only bins finished by this chunk count, the rest is carried over
+        assert points == (done + len(chunk)) // 100 - done // 100
+        done += len(chunk)
+
+    assert follower.full
+    # the same bins as binning the whole signal at once
+    expected = np.abs(audio).reshape(50, 100).mean(axis=1) * np.pi / 2
+    np.testing.assert_allclose(follower.view()[0], expected)
+
+
+def test_matches_hilbert_envelope():
+    rate = 44100
+    t = np.arange(rate * 6) / rate
+    amplitude = 6000 * (1 + 0.2 * np.sin(2 * np.pi * 0.05 * t))
+    audio = (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+    follower = EnvelopeFollower(rate)
+
+    points = sum(follower.update(chunk) for chunk in uneven_chunks(audio))
+    assert points == len(audio) // (rate // 10)
+
+    # the reference samples bin starts rather than averaging bins, so keep
+    # the amplitude slow, and ignore its resample edge effects
+    reference = hilbert_envelope(audio[-rate * 5:], rate)[0, 2:-2]
+    np.testing.assert_allclose(follower.view()[0, 2:-2], reference, rtol=0.02)
@@ -0,0 +1,60 @@
+import numpy as np
+from threading import Thread
+
+from nebula.hivemind import DataBorg, FIELD_GROUPS
+
+
+def test_attribute_access_publishes(hivemind):
+    version = hivemind.version
+    hivemind.mic_in = 0.5
+
+    assert hivemind.mic_in == 0.5
+    assert DataBorg().mic_in == 0.5
+    assert hivemind.snapshot().mic_in == 0.5
+    assert hivemind.version == version + 1
+
+
+def test_snapshot_is_immutable_and_stable(hivemind):
+    hivemind.publish(audio2core=0.1, audio2core_2d=np.full((2, 50), 0.1))
+    snapshot = hivemind.snapshot()
+    hivemind.publish(audio2core=0.9, audio2core_2d=np.full((2, 50), 0.9))
+
+    assert snapshot.audio2core == 0.1
+    assert (snapshot['audio2core_2d'] == 0.1).all()
+    assert hivemind.snapshot().audio2core == 0.9
+    assert hivemind.snapshot().version == snapshot.version + 1
+
+
+def test_grouped_fields_are_read_together(hivemind):
+    hivemind.publish(flow2core=0.0, flow2core_2d=np.zeros((2, 50)))
+
+    def writer():
+        for i in range(2000):
+            value = i / 2000
+            hivemind.publish(flow2core=value,
+                             flow2core_2d=np.full((2, 50), value))
+
+    thread = Thread(target=writer)
+    thread.start()
+    while thread.is_alive():
+        snapshot = hivemind.snapshot()
+        assert snapshot.flow2core_2d[0, 0] == snapshot.flow2core
+    thread.join()
+
+
+def test_groups_are_published_separately(hivemind):
+    listener = hivemind.group_snapshot('listener')
+    robot = hivemind.group_snapshot('robot')
+    version = hivemind.version
+    hivemind.publish(mic_in=0.25, audio_buffer=np.zeros((1, 50)))
+
+    assert hivemind.group_snapshot('listener').version == listener.version + 1
+    assert hivemind.group_snapshot('robot') is robot
+    assert hivemind.version == version + 1
+    # one publish across groups bumps each of them once
+    hivemind.publish(mic_in=0.5, current_robot_x_y_z=(0.1, 0.2, 0.3), session_date='today')
+    assert hivemind.version == version + 4
+    snapshot = hivemind.snapshot()
+    assert snapshot.mic_in == 0.5 and snapshot.current_robot_x_y_z == (0.1, 0.2, 0.3)
+    assert snapshot is hivemind.snapshot()
+    assert 'mic_in' in FIELD_GROUPS['listener']
@@ -0,0 +1,32 @@
+import shutil
+
+import numpy as np
+import torch
+
+from nebula.models.export import export_torchscript
+from nebula.models.pt_models import build_hourglass, load_hourglass, script_path
+
+
+def test_exported_script_matches_eager(tmp_path):
+    model = tmp_path / 'audio2flow.pt'
+    shutil.copy('nebula/models/audio2flow.pt', model)
+    state_dict = torch.load(model)
+
+    for dtype in ['float64', 'float32']:
+        eager = build_hourglass(state_dict, dtype)
+        out_path = export_torchscript(model, dtype)
+        assert out_path == script_path(model, dtype)
+
+        scripted = load_hourglass(model, dtype)
+        assert isinstance(scripted, torch.jit.ScriptModule)
+        x = torch.tensor(np.random.uniform(size=(2, eager.conv1.in_channels, 50)),
+                         dtype=getattr(torch, dtype))
+        with torch.inference_mode():
+            torch.testing.assert_close(scripted(x), eager(x), rtol=0, atol=0)
+
+
+def test_float64_weights_are_not_truncated():
+    state_dict = torch.load('nebula/models/audio2flow.pt')
+    pt_model = build_hourglass(state_dict, 'float64')
+    for name, value in pt_model.state_dict().items():
+        assert torch.equal(value, state_dict[name]), name
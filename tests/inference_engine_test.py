@@ -0,0 +1,27 @@
+import numpy as np
+import torch
+
+from nebula.models.pt_models import FusedHourglass, Hourglass
+
+
+def load(model):
+    state_dict = torch.load(model)
+    pt_model = Hourglass(state_dict['conv1.weight'].size(1),
+                         state_dict['tconv1.weight'].size(1)).double()
+    pt_model.load_state_dict(state_dict)
+    pt_model.eval()
+    return pt_model
+
+
+def test_fused_matches_individual_nets():
+    models = [load(f'nebula/models/{name}.pt')
+              for name in ['audio2eda', 'audio2core', 'audio2flow']]
+    fused = FusedHourglass([model.state_dict() for model in models])
+    x = torch.tensor(np.random.uniform(size=(1, 1, 50)))
+
+    with torch.inference_mode():
+        predictions = fused(x)
+        for model, prediction in zip(models, predictions):
+            expected = model(x)
+            assert prediction.shape == expected.shape
+            assert torch.allclose(prediction, expected, atol=1e-10)
@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from modules.jsonl_writer import JsonlWriter, read_jsonl
+
+
+def test_records_are_written_in_order(tmp_path):
+    path = tmp_path / 'log.jsonl'
+    writer = JsonlWriter(path, flush_interval=0.01, fsync=False)
+    for i in range(1000):
+        writer.append(1700000000 + i * 0.01, {"mic_in": i, "interrupt": False})
+    writer.close()
+
+    records = read_jsonl(path)
+    assert [record["mic_in"] for record in records] == list(range(1000))
+    assert records[0]["date"] == datetime.fromtimestamp(1700000000).isoformat()
+    assert list(records[0]) == ["date", "mic_in", "interrupt"]
+    assert writer.written == 1000
+
+
+def test_cut_off_line_is_skipped(tmp_path):
+    path = tmp_path / 'log.jsonl'
+    writer = JsonlWriter(path)
+    writer.append(1700000000, {"x": 0.5})
+    writer.close()
+    with open(path, 'a') as f:
+        f.write('{"date": "2024-11-21T12:22:33", "x": 0.')
+
+    assert read_jsonl(path) == [{"date": datetime.fromtimestamp(1700000000).isoformat(), "x": 0.5}]
+
+
+def test_reopening_appends(tmp_path):
+    path = tmp_path / 'log.jsonl'
+    for i in range(2):
+        writer = JsonlWriter(path)
+        writer.append(1700000000, {"run": i})
+        writer.close()
+    assert [record["run"] for record in read_jsonl(path)] == [0, 1]
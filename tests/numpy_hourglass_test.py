@@ -0,0 +1,43 @@
+import subprocess
+import sys
+
+import numpy as np
+import torch
+
+from nebula.models.np_models import NumpyHourglass
+from nebula.models.pt_models import load_hourglass
+
+MODELS = ['audio2core', 'audio2eda', 'audio2flow', 'conductor2flow',
+          'core2flow', 'eeg2flow', 'flow2audio', 'flow2core']
+
+
+def test_numpy_matches_torch():
+    for name in MODELS:
+        model = f'nebula/models/{name}.pt'
+        pt_model = load_hourglass(model)
+        np_model = NumpyHourglass.load([model])
+        x = np.random.uniform(size=(3, pt_model.conv1.in_channels, 50))
+
+        with torch.inference_mode():
+            expected = pt_model(torch.tensor(x)).numpy()
+        prediction = np_model(x)[0]
+        assert prediction.shape == expected.shape
+        np.testing.assert_allclose(prediction, expected, atol=1e-10)
+
+
+def test_fused_numpy_matches_torch():
+    models = [f'nebula/models/{name}.pt' for name in ['audio2eda', 'audio2core', 'audio2flow']]
+    np_model = NumpyHourglass.load(models)
+    x = np.random.uniform(size=(1, 1, 50))
+
+    for model, prediction in zip(models, np_model(x)):
+        with torch.inference_mode():
+            expected = load_hourglass(model)(torch.tensor(x)).numpy()
+        np.testing.assert_allclose(prediction, expected, atol=1e-10)
+
+
+def test_numpy_backend_skips_torch():
+    code = ("import sys, config; config.nnet_backend = 'numpy'; "
+            "from nebula.ai_factory import AIFactoryRAMI; AIFactoryRAMI().engine.run(); "
+            "assert 'torch' not in sys.modules")
+    subprocess.run([sys.executable, '-c', code], check=True)
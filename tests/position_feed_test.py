@@ -0,0 +1,48 @@
+import numpy as np
+from threading import Lock
+
+from modules.draw_xarm import Drawbot
+from nebula.buffers import RingBuffer
+from nebula.hivemind import DataBorg
+
+
+def make_drawbot():
+    # Only the position feed state, no connection to an arm
+    drawbot = Drawbot.__new__(Drawbot)
+    drawbot.hivemind = DataBorg()
+    drawbot.x_extents = [-500, 500]
+    drawbot.y_extents = [-500, 500]
+    drawbot.z_extents = [55, 1000]
+    drawbot.position_period = 0.1
+    drawbot.position_window = RingBuffer(50, channels=2)
+    drawbot.position_times = RingBuffer(50)
+    drawbot._next_position_time = 0
+    drawbot._position_lock = Lock()
+    return drawbot
+
+
+def test_reports_are_decimated_to_window_rate():
+    drawbot = make_drawbot()
+    hivemind = drawbot.hivemind
+
+    # 100 Hz reports for 2 sec, x sweeps across the extents
+    for i in range(200):
+        t = 100 + i * 0.01
+        drawbot.add_position_sample((-500 + i * 5, 0, 55), t)
+
+    times = hivemind.current_robot_x_y_times
+    assert np.count_nonzero(times) == 20
+    np.testing.assert_allclose(np.diff(times[-20:]), 0.1, atol=1e-9)
+    assert hivemind.current_robot_x_y.shape == (2, 50)
+    assert hivemind.current_robot_x_y_z == (0.995, 0.5, 0.0)
+
+
+def test_gap_in_reports_does_not_burst():
+    drawbot = make_drawbot()
+    drawbot.add_position_sample((0, 0, 55), 10.0)
+    drawbot.add_position_sample((0, 0, 55), 12.0)
+    drawbot.add_position_sample((0, 0, 55), 12.05)
+    drawbot.add_position_sample((0, 0, 55), 12.1)
+
+    times = drawbot.hivemind.current_robot_x_y_times
+    np.testing.assert_allclose(times[-3:], [10.0, 12.0, 12.1])
@@ -0,0 +1,91 @@
+"""
+Benchmark the precompiled report frame decoders against the per-value
+convert calls the report handlers used before, on synthetic frames.
+Run from the project root:
+
+    python -m tests.report_decoder_benchmark
+"""
+import random
+import struct
+from timeit import timeit
+
+from xarm.core.utils import convert, report
+
+N = 20000
+
+
+def make_frame(size: int) -> bytes:
+    """
+    Report frame of the given size with plausible values in every field.
+    """
+    frame = bytearray(random.getrandbits(8) for _ in range(size))
+    struct.pack_into('>IBH', frame, 0, size, 2 | 1 << 4, 7)
+    struct.pack_into('<20f', frame, 7, *(random.uniform(-500, 500) for _ in range(20)))
+    if size == 135:
+        struct.pack_into('<12f', frame, 87, *(random.uniform(-50, 50) for _ in range(12)))
+    if size >= 145:
+        struct.pack_into('<4B', frame, 87, 0xFF, 0xFF, 0, 0)
+        struct.pack_into('<10f', frame, 91, *(random.uniform(-1, 1) for _ in range(10)))
+        struct.pack_into('<2B3f', frame, 131, 3, 2, 0, 0, -1)
+    if size >= 245:
+        struct.pack_into('<6B', frame, 145, 3, 6, 1, 2, 3, 4)
+        struct.pack_into('<12f', frame, 181, *(random.uniform(0, 1000) for _ in range(12)))
+    return bytes(frame)
+
+
+def legacy_unpack_normal(rx_data):
+    state, mode = rx_data[4] & 0x0F, rx_data[4] >> 4
+    cmd_num = convert.bytes_to_u16(rx_data[5:7])
+    angles = convert.bytes_to_fp32s(rx_data[7:7 * 4 + 7], 7)
+    pose = convert.bytes_to_fp32s(rx_data[35:6 * 4 + 35], 6)
+    torque = convert.bytes_to_fp32s(rx_data[59:7 * 4 + 59], 7)
+    mtbrake, mtable, error_code, warn_code = rx_data[87:91]
+    pose_offset = convert.bytes_to_fp32s(rx_data[91:6 * 4 + 91], 6)
+    tcp_load = convert.bytes_to_fp32s(rx_data[115:4 * 4 + 115], 4)
+    collis_sens, teach_sens = rx_data[131:133]
+    length = convert.bytes_to_u32(rx_data[0:4])
+    gravity_direction = convert.bytes_to_fp32s(rx_data[133:3 * 4 + 133], 3)
+    return (length, state, mode, cmd_num, angles, pose, torque,
+            mtbrake, mtable, error_code, warn_code, pose_offset, tcp_load,
+            collis_sens, teach_sens, gravity_direction)
+
+
+def legacy_unpack_rich(rx_data):
+    return (*rx_data[145:151],
+            tuple(convert.bytes_to_fp32s(rx_data[181:201], 5)),
+            tuple(convert.bytes_to_fp32s(rx_data[201:221], 5)),
+            tuple(convert.bytes_to_fp32s(rx_data[221:229], 2)),
+            tuple(val for val in rx_data[229:245]))
+
+
+def legacy_unpack_real(rx_data):
+    state, mode = rx_data[4] & 0x0F, rx_data[4] >> 4
+    cmd_num = convert.bytes_to_u16(rx_data[5:7])
+    angles = convert.bytes_to_fp32s(rx_data[7:7 * 4 + 7], 7)
+    pose = convert.bytes_to_fp32s(rx_data[35:6 * 4 + 35], 6)
+    torque = convert.bytes_to_fp32s(rx_data[59:7 * 4 + 59], 7)
+    ft_ext_force = convert.bytes_to_fp32s(rx_data[87:111], 6)
+    ft_raw_force = convert.bytes_to_fp32s(rx_data[111:135], 6)
+    return (convert.bytes_to_u32(rx_data[0:4]), state, mode, cmd_num, angles, pose, torque,
+            ft_ext_force, ft_raw_force)
+
+
+def main():
+    normal = make_frame(145)
+    rich = make_frame(494)
+    real = make_frame(135)
+    cases = [
+        ('real', lambda: legacy_unpack_real(real), lambda: report.unpack_real(real)),
+        ('normal', lambda: legacy_unpack_normal(normal), lambda: report.unpack_normal(normal)),
+        ('rich', lambda: (legacy_unpack_normal(rich), legacy_unpack_rich(rich)),
+         lambda: (report.unpack_normal(rich), report.unpack_rich(rich))),
+    ]
+    for name, legacy, precompiled in cases:
+        legacy_time = timeit(legacy, number=N) / N * 1e6
+        precompiled_time = timeit(precompiled, number=N) / N * 1e6
+        print(f"{name:>6}: convert {legacy_time:6.1f} us, struct {precompiled_time:5.2f} us per frame "
+              f"({legacy_time / precompiled_time:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
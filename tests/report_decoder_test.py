@@ -0,0 +1,21 @@
+from tests.report_decoder_benchmark import (legacy_unpack_normal, legacy_unpack_real,
+                                            legacy_unpack_rich, make_frame)
+from xarm.core.utils import report
+
+
+def test_normal_matches_convert():
+    frame = make_frame(145)
+    assert report.unpack_normal(frame) == legacy_unpack_normal(frame)
+    assert report.unpack_normal(memoryview(frame)) == legacy_unpack_normal(frame)
+
+
+def test_rich_matches_convert():
+    frame = make_frame(494)
+    assert report.unpack_normal(frame) == legacy_unpack_normal(frame)
+    assert report.unpack_rich(frame) == legacy_unpack_rich(frame)
+
+
+def test_real_matches_convert():
+    frame = make_frame(135)
+    assert report.unpack_real(frame) == legacy_unpack_real(frame)
+    assert report.unpack_real(frame[:87])[-2:] == (None, None)
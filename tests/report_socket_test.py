@@ -0,0 +1,50 @@
+import random
+import socket
+import struct
+from threading import Thread
+from time import sleep
+
+from xarm.core.comm import SocketPort
+
+
+def frame(seq: int, size: int = 145) -> bytes:
+    return struct.pack('>I', size) + struct.pack('<I', seq) + bytes(range(size - 8))
+
+
+def serve(server, frames):
+    conn, _ = server.accept()
+    data = b''.join(frames)
+    position = 0
+    while position < len(data):
+        # Split the stream at random points, across and within frames
+        step = random.randint(1, 400)
+        conn.sendall(data[position:position + step])
+        position += step
+        sleep(0.0005)
+    sleep(0.5)
+    conn.close()
+
+
+def test_frames_survive_fragmentation():
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+    frames = [frame(seq) for seq in range(2000)]
+    Thread(target=serve, args=(server, frames), daemon=True).start()
+
+    port = SocketPort('127.0.0.1', server.getsockname()[1], buffer_size=1024)
+    received = []
+    while True:
+        data = port.read(timeout=1)
+        if data == -1:
+            break
+        received.append(data)
+    server.close()
+
+    # The queue only keeps the latest frames, so some may be skipped
+    assert len(received) > 100
+    assert all(isinstance(data, memoryview) for data in received)
+    assert all(bytes(data) == frames[struct.unpack_from('<I', data, 4)[0]] for data in received)
+    seqs = [struct.unpack_from('<I', data, 4)[0] for data in received]
+    assert seqs == sorted(seqs)
+    assert seqs[-1] == len(frames) - 1
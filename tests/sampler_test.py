@@ -0,0 +1,25 @@
+from time import monotonic, sleep
+
+from modules.sampler import FixedRateSampler
+
+
+def test_deadlines_do_not_drift():
+    sampler = FixedRateSampler(0.01)
+    start = sampler.wait()
+    for _ in range(20):
+        deadline = sampler.wait()
+        sleep(0.004)  # time spent sampling
+    assert abs(deadline - (start + 0.2)) < 1e-9
+    assert monotonic() - start < 0.2 + 0.01 + 0.05
+    assert sampler.missed == 0
+
+
+def test_late_deadlines_are_skipped_and_counted():
+    sampler = FixedRateSampler(0.01)
+    start = sampler.wait()
+    sleep(0.055)
+    deadline = sampler.wait()
+    assert sampler.missed >= 4
+    # the schedule keeps its phase
+    assert abs((deadline - start) / 0.01 - round((deadline - start) / 0.01)) < 1e-6
+    assert deadline >= monotonic() - 0.01 - 0.005
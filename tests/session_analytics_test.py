@@ -0,0 +1,51 @@
+import json
+import os
+
+from modules.session_analytics import find_sessions, summarise_archive, summary_table
+from modules.session_log import convert_json
+from tests.session_log_test import make_records
+
+
+def write_session(root, session, experiment, records):
+    path = root / session / experiment / "ai_robot" / f"AI_Robot_{session}.jsonl"
+    path.parent.mkdir(parents=True)
+    path.write_text("\n".join(json.dumps(record) for record in records) + "\n")
+    return path
+
+
+def test_summaries_and_cache(tmp_path):
+    records = make_records(100)
+    for i, record in enumerate(records):
+        record["x"] = (i % 10) / 10
+        record["interrupt"] = 20 <= i < 30 or i >= 90
+    first = write_session(tmp_path, "2025_01_31_1309", "WOLFF1_block_1_performance_2_mode_3", records)
+    second = write_session(tmp_path, "2025_01_31_1326", "WOLFF1_block_2_performance_1_mode_1", make_records(10))
+    convert_json(second)
+    assert find_sessions(tmp_path) == [first, second.with_suffix(".npz")]
+
+    summary, other = summarise_archive(tmp_path, workers=2)
+    assert summary["session"] == "2025_01_31_1309"
+    assert (summary["experiment"], summary["block"], summary["performance"], summary["mode"]) == \
+        ("WOLFF1", "1", "2", "3")
+    assert summary["records"] == 100
+    assert abs(summary["duration"] - 0.99) < 1e-6
+    assert summary["design_decisions"] == {"dot": 50, "arc": 50}
+    assert summary["interrupt_rate"] == 0.2
+    assert summary["interrupts"] == 2
+    assert summary["flow2core_mean"] == 0.25 and summary["flow2core_std"] == 0
+    assert summary["coverage"] == 10 / 400
+    assert other["records"] == 10
+
+    table = summary_table([summary, other])
+    assert list(table["decision: arc"]) == [0.5, 0.5]
+
+    # only the touched session is read again
+    cache_path = tmp_path / "session_summaries.json"
+    cache = json.loads(cache_path.read_text())
+    cache[str(second.with_suffix(".npz"))]["summary"]["records"] = -1
+    cache_path.write_text(json.dumps(cache))
+    first.write_text("\n".join(json.dumps(record) for record in records[:50]) + "\n")
+    os.utime(first, ns=(1, 1))
+    summary, other = summarise_archive(tmp_path, workers=1)
+    assert summary["records"] == 50
+    assert other["records"] == -1
@@ -0,0 +1,104 @@
+import json
+import time
+from datetime import datetime
+
+import numpy as np
+
+from modules.session_log import (NpzSessionWriter, convert_archive, convert_json,
+                                 load_session, read_json_records)
+
+
+def make_records(n):
+    return [{"date": datetime.fromtimestamp(1700000000 + i * 0.01).isoformat(),
+             "master_stream": ["mic_in", "rnd_poetry", " "][i % 3],
+             "mic_in": i * 1e-5,
+             "rnd_poetry": 0.5,
+             "flow2core": 0.25,
+             "design decision": "dot" if i < n / 2 else "arc",
+             "interrupt": i % 2 == 0,
+             "x": 0.1, "y": 0.2, "z": 0.3}
+            for i in range(n)]
+
+
+def test_json_archive_round_trip(tmp_path):
+    path = tmp_path / "ai_robot" / "AI_Robot_2025_01_31_1349.json"
+    path.parent.mkdir()
+    records = make_records(100)
+    # hand built array as the old writer made it, cut off mid record
+    with open(path, "w") as f:
+        f.write("[" + ",\n".join(json.dumps(record) for record in records) + ',\n{"date": "2025')
+
+    assert read_json_records(path) == records
+    out_path, = convert_archive(tmp_path)
+    assert out_path == path.with_suffix(".npz")
+    assert convert_archive(tmp_path) == []
+
+    with np.load(out_path) as npz:
+        assert npz["mic_in"].dtype == np.float32
+        assert npz["date_ns"].dtype == np.int64
+        assert npz["design_decision_codes"].dtype == np.uint8
+        assert list(npz["design_decision_categories"]) == ["dot", "arc"]
+        assert np.isnan(npz["audio2eda"]).all()
+
+    df = load_session(out_path)
+    legacy = load_session(path)
+    assert len(df) == len(legacy) == 100
+    assert (df["date"] == legacy["date"]).all()
+    assert list(df["design decision"]) == list(legacy["design decision"])
+    assert list(df["master_stream"]) == list(legacy["master_stream"])
+    np.testing.assert_allclose(df["mic_in"], legacy["mic_in"], rtol=1e-6)
+    assert list(df["interrupt"]) == list(legacy["interrupt"])
+
+
+def test_writer_matches_converter(tmp_path):
+    records = make_records(10)
+    writer = NpzSessionWriter(tmp_path / "written.npz")
+    for record in records:
+        record = dict(record)
+        timestamp = datetime.fromisoformat(record.pop("date")).timestamp()
+        writer.append(timestamp, record)
+    writer.close()
+
+    path = tmp_path / "log.jsonl"
+    path.write_text("\n".join(json.dumps(record) for record in records) + "\n")
+    convert_json(path)
+
+    with np.load(tmp_path / "written.npz") as written, np.load(tmp_path / "log.npz") as converted:
+        assert sorted(written.files) == sorted(converted.files)
+        for name in written.files:
+            np.testing.assert_array_equal(written[name], converted[name])
+    assert not (tmp_path / "written.jsonl").exists()
+
+
+def test_abandoned_writer_keeps_records(tmp_path):
+    path = tmp_path / "ai_robot" / "AI_Robot_2025_01_31_1349.npz"
+    path.parent.mkdir()
+    records = make_records(20)
+    writer = NpzSessionWriter(path, flush_interval=0.01)
+    for record in records:
+        record = dict(record)
+        writer.append(datetime.fromisoformat(record.pop("date")).timestamp(), record)
+    deadline = time.monotonic() + 5
+    while writer._log.written < len(records) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # the piece dies here, close() never runs
+    del writer
+
+    assert not path.exists()
+    assert convert_archive(tmp_path) == [path]
+    df = load_session(path)
+    assert len(df) == 20
+    assert list(df["design decision"]) == [record["design decision"] for record in records]
+
+
+def test_sample_times_and_versions(tmp_path):
+    records = make_records(3)
+    for i, record in enumerate(records[1:]):
+        record["mono_ns"] = 5_000_000_000 + i * 10_000_000
+        record["version"] = 40 + i
+    path = tmp_path / "log.jsonl"
+    path.write_text("\n".join(json.dumps(record) for record in records) + "\n")
+
+    df = load_session(convert_json(path))
+    assert list(df["mono_ns"]) == [-1, 5_000_000_000, 5_010_000_000]
+    assert list(df["version"]) == [-1, 40, 41]
@@ -0,0 +1,53 @@
+import queue
+import struct
+from threading import Timer
+
+from xarm.core.config.x_config import XCONF
+from xarm.core.wrapper.uxbus_cmd_tcp import UxbusCmdTcp
+
+
+def reply(bus_flag, funcode, payload=b'', state=0):
+    return struct.pack('>HHHBB', bus_flag, 2, len(payload) + 2, funcode, state) + payload
+
+
+class LoopbackPort:
+    """
+    Answers every request from a timer thread, the way the recv thread
+    would, with a stale reply and a split frame thrown in.
+    """
+    def __init__(self):
+        self.rx_que = queue.Queue()
+        self.rx_parse = None
+
+    def flush(self):
+        raise AssertionError('send should not flush the port')
+
+    def write(self, data):
+        bus_flag, _, _, funcode = struct.unpack_from('>HHHB', data)
+        frame = reply(bus_flag, funcode, struct.pack('<f', 1.5))
+        stale = reply(bus_flag - 1, funcode, struct.pack('<f', -1.0))
+
+        def answer():
+            self.rx_parse.put(stale + frame[:5])
+            self.rx_parse.put(frame[5:])
+        Timer(0.01, answer).start()
+        return 0
+
+
+def test_reply_is_matched_by_bus_flag():
+    cmd = UxbusCmdTcp(LoopbackPort())
+    for _ in range(3):
+        assert cmd.send_xbus(XCONF.UxbusReg.GET_TCP_POSE, 0, 0) == 0
+        ret = cmd.send_pend(XCONF.UxbusReg.GET_TCP_POSE, 4, 1)
+        assert ret[0] == 0
+        assert struct.unpack('<f', bytes(ret[1:5]))[0] == 1.5
+
+
+def test_timeout_without_reply():
+    port = LoopbackPort()
+    port.write = lambda data: 0
+    cmd = UxbusCmdTcp(port)
+    assert cmd.send_xbus(XCONF.UxbusReg.GET_TCP_POSE, 0, 0) == 0
+    ret = cmd.send_pend(XCONF.UxbusReg.GET_TCP_POSE, 4, 0.05)
+    assert ret == [XCONF.UxbusState.ERR_TOUT, 0, 0, 0, 0]
+    assert cmd._dispatcher._pending == {}
@@ -0,0 +1,98 @@
+import queue
+import struct
+import threading
+import time
+
+from xarm.core.config.x_config import XCONF
+from xarm.core.wrapper.uxbus_cmd_tcp import UxbusCmdTcp
+
+
+def reply(bus_flag, funcode, state=0):
+    return struct.pack('>HHHBB', bus_flag, 2, 2, funcode, state)
+
+
+class DelayedPort:
+    """
+    Holds every request until release() is called, then answers them all,
+    optionally flagging one as an error.
+    """
+    def __init__(self):
+        self.rx_que = queue.Queue()
+        self.rx_parse = None
+        self.requests = []
+        self.error_flag = None
+
+    def write(self, data):
+        bus_flag, _, _, funcode = struct.unpack_from('>HHHB', data)
+        self.requests.append((bus_flag, funcode))
+        return 0
+
+    def release(self):
+        requests, self.requests = self.requests, []
+        for bus_flag, funcode in requests:
+            state = 0x40 if bus_flag == self.error_flag else 0
+            self.rx_parse.put(reply(bus_flag, funcode, state))
+
+
+def move(cmd):
+    return cmd.move_line([300, 0, 200, 180, 0, 0], 100, 2000, 0)
+
+
+def test_commands_are_sent_without_waiting():
+    port = DelayedPort()
+    cmd = UxbusCmdTcp(port)
+    cmd.set_pipeline(8)
+    start = time.monotonic()
+    for _ in range(8):
+        assert move(cmd)[0] == 0
+    assert time.monotonic() - start < 0.5
+    assert len(port.requests) == 8
+    port.release()
+    assert cmd.drain(1) == 0
+    assert cmd._outstanding == {}
+
+
+def test_in_flight_limit():
+    port = DelayedPort()
+    cmd = UxbusCmdTcp(port)
+    cmd.set_pipeline(2)
+    move(cmd)
+    move(cmd)
+    blocked = threading.Thread(target=move, args=(cmd,))
+    blocked.start()
+    time.sleep(0.05)
+    assert len(port.requests) == 2
+    port.release()
+    blocked.join(1)
+    assert len(port.requests) == 1
+    port.release()
+    assert cmd.drain(1) == 0
+
+
+def test_drain_reports_errors_and_timeouts():
+    port = DelayedPort()
+    cmd = UxbusCmdTcp(port)
+    cmd.set_pipeline(4)
+    for _ in range(3):
+        move(cmd)
+    port.error_flag = port.requests[1][0]
+    port.release()
+    assert cmd.drain(1) == XCONF.UxbusState.ERR_CODE
+    assert cmd.drain(1) == 0
+
+    move(cmd)
+    assert cmd.drain(0.05) == XCONF.UxbusState.ERR_TOUT
+    assert cmd._dispatcher._pending == {}
+    # the slot of the lost reply is free again
+    for _ in range(4):
+        move(cmd)
+    assert len(port.requests) == 5
+
+
+def test_queries_still_wait_for_their_reply():
+    port = DelayedPort()
+    cmd = UxbusCmdTcp(port)
+    cmd.set_pipeline(4)
+    threading.Timer(0.02, port.release).start()
+    ret = cmd.get_state()
+    assert ret[0] == 0
@@ -0,0 +1,51 @@
+import wave
+from time import sleep
+
+import numpy as np
+
+from modules.wav_recorder import WavRecorder
+
+
+def read_wav(path):
+    with wave.open(str(path), 'rb') as f:
+        assert f.getframerate() == 44100
+        assert f.getsampwidth() == 2
+        return np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+
+
+def test_streamed_file_matches_input(tmp_path):
+    rng = np.random.default_rng(0)
+    chunks = [rng.integers(-2**15, 2**15, 2048, dtype=np.int16) for _ in range(20)]
+    recorder = WavRecorder(44100)
+    recorder.open(tmp_path / 'session' / 'session.wav')
+    for chunk in chunks:
+        recorder.write(chunk)
+    recorder.close()
+
+    np.testing.assert_array_equal(read_wav(tmp_path / 'session' / 'session.wav'),
+                                  np.concatenate(chunks))
+    assert recorder.dropped_chunks == 0
+
+
+def test_header_is_patched_while_recording(tmp_path):
+    recorder = WavRecorder(44100, header_interval=0.05)
+    recorder.open(tmp_path / 'live.wav')
+    recorder.write(np.ones(1000, dtype=np.int16))
+    sleep(0.3)
+    recorder.write(np.ones(10, dtype=np.int16))
+    sleep(0.3)
+
+    assert len(read_wav(tmp_path / 'live.wav')) == 1010
+    recorder.close()
+
+
+def test_rotate_splits_segments(tmp_path):
+    recorder = WavRecorder(44100)
+    recorder.open(tmp_path / 'a.wav')
+    recorder.write(np.full(100, 1, dtype=np.int16))
+    recorder.rotate(tmp_path / 'b.wav')
+    recorder.write(np.full(300, 2, dtype=np.int16))
+    recorder.close()
+
+    np.testing.assert_array_equal(read_wav(tmp_path / 'a.wav'), np.full(100, 1))
+    np.testing.assert_array_equal(read_wav(tmp_path / 'b.wav'), np.full(300, 2))
@@ -0,0 +1,97 @@
+import asyncio
+import math
+import struct
+
+from tests.report_decoder_benchmark import make_frame
+from xarm.core.config.x_config import XCONF
+from xarm.core.wrapper.uxbus_cmd_aio import UxbusCmdAio
+from xarm.wrapper import AsyncXArmAPI
+
+POSE = [300, 0, 200, math.pi, 0, 0]
+
+
+async def control_server(reader, writer, states):
+    """
+    Answers uxbus requests, delaying the pose so replies come back out of
+    order, and moving through the given states on each get_state.
+    """
+    async def answer(bus_flag, funcode, payload, delay):
+        await asyncio.sleep(delay)
+        writer.write(struct.pack('>HHHBB', bus_flag, 2, len(payload) + 2, funcode, 0) + payload)
+
+    try:
+        while True:
+            bus_flag, _, length, funcode = struct.unpack('>HHHB', await reader.readexactly(7))
+            await reader.readexactly(length - 1)
+            delay = 0
+            payload = b''
+            if funcode == XCONF.UxbusReg.GET_TCP_POSE:
+                payload, delay = struct.pack('<6f', *POSE), 0.05
+            elif funcode == XCONF.UxbusReg.GET_JOINT_POS:
+                payload = struct.pack('<7f', *[0.1] * 7)
+            elif funcode == XCONF.UxbusReg.GET_STATE:
+                payload = bytes([states.pop(0) if len(states) > 1 else states[0]])
+            elif funcode == XCONF.UxbusReg.GET_ERROR:
+                payload = bytes([0, 0])
+            asyncio.ensure_future(answer(bus_flag, funcode, payload, delay))
+    except (asyncio.IncompleteReadError, asyncio.CancelledError):
+        writer.close()
+
+
+async def report_server(reader, writer):
+    for _ in range(3):
+        writer.write(make_frame(145))
+        await writer.drain()
+    writer.close()
+
+
+async def start_arm(states):
+    control = await asyncio.start_server(lambda r, w: control_server(r, w, states), '127.0.0.1', 0)
+    reports = await asyncio.start_server(report_server, '127.0.0.1', 0)
+    port = control.sockets[0].getsockname()[1]
+    report_port = reports.sockets[0].getsockname()[1]
+    arm = AsyncXArmAPI('127.0.0.1')
+    arm.arm_cmd = await UxbusCmdAio.open('127.0.0.1', port)
+    return arm, report_port, (control, reports)
+
+
+def test_concurrent_calls_are_matched_by_bus_flag():
+    async def run():
+        arm, _, servers = await start_arm([0])
+        (code, pose), (state_code, state), (angle_code, angles) = await asyncio.gather(
+            arm.get_position(), arm.get_state(), arm.get_servo_angle(is_radian=True))
+        assert code == state_code == angle_code == 0
+        assert abs(pose[0] - 300) < 1e-3 and abs(pose[3] - 180) < 1e-3
+        assert state == 0
+        assert abs(angles[0] - 0.1) < 1e-6
+        await arm.disconnect()
+        for server in servers:
+            server.close()
+    asyncio.run(run())
+
+
+def test_move_and_wait():
+    async def run():
+        arm, _, servers = await start_arm([1, 1, 2])
+        assert await arm.set_position(x=350, speed=50, wait=True, timeout=2) == 0
+        assert arm._last_position[0] == 350
+        assert arm.state == 2
+        await arm.disconnect()
+        for server in servers:
+            server.close()
+    asyncio.run(run())
+
+
+def test_reports():
+    async def run():
+        arm, report_port, servers = await start_arm([0])
+        received = [item async for item in arm.reports(report_port)]
+        assert len(received) == 3
+        assert received[0]['state'] == 2 and received[0]['mode'] == 1 and received[0]['cmdnum'] == 7
+        assert received[0]['mtable'] == [True] * 8
+        assert len(received[0]['joints']) == 7 and len(received[0]['cartesian']) == 6
+        assert arm.position == received[-1]['cartesian']
+        await arm.disconnect()
+        for server in servers:
+            server.close()
+    asyncio.run(run())
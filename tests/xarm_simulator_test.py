@@ -0,0 +1,113 @@
+import asyncio
+import struct
+import time
+
+from xarm.core.config.x_config import XCONF
+from xarm.core.utils import report
+from xarm.core.wrapper.uxbus_cmd_aio import UxbusCmdAio
+from xarm.tools.simulator import XArmSimulator
+from xarm.wrapper import AsyncXArmAPI, XArmAPI
+
+
+def move_line(x, y, z, speed, radius=None):
+    values = [x, y, z, 3.14, 0, 0, speed, 1000, 0]
+    if radius is not None:
+        values.append(radius)
+    return struct.pack('<{}f'.format(len(values)), *values)
+
+
+def test_motion_is_integrated_at_speed():
+    sim = XArmSimulator()
+    sim.pose = [200, 0, 100, 3.14, 0, 0]
+    flags, _ = sim.handle(XCONF.UxbusReg.MOVE_LINE, move_line(300, 0, 100, 100))
+    assert flags == 0 and sim.state == 1
+    sim.handle(XCONF.UxbusReg.MOVE_LINE, move_line(300, 100, 100, 100))
+    for _ in range(10):
+        sim._step(0.1)
+    assert abs(sim.pose[0] - 300) < 1e-6 and sim.pose[1] == 0
+    assert sim.state == 1
+    for _ in range(10):
+        sim._step(0.1)
+    assert abs(sim.pose[1] - 100) < 1e-6
+    assert sim.state == 2
+
+
+def test_stop_and_online_mode():
+    sim = XArmSimulator()
+    sim.handle(XCONF.UxbusReg.MOVE_LINE, move_line(300, 0, 100, 100))
+    sim.handle(XCONF.UxbusReg.SET_STATE, bytes([4]))
+    assert sim.queue == [] and sim.state == 4
+    flags, _ = sim.handle(XCONF.UxbusReg.MOVE_LINE, move_line(300, 0, 100, 100))
+    assert flags & 0x10
+    sim.handle(XCONF.UxbusReg.SET_MODE, bytes([7]))
+    sim.handle(XCONF.UxbusReg.SET_STATE, bytes([0]))
+    sim.handle(XCONF.UxbusReg.MOVE_LINE, move_line(300, 0, 100, 100))
+    sim.handle(XCONF.UxbusReg.MOVE_LINE, move_line(400, 0, 100, 100))
+    assert len(sim.queue) == 1 and sim.queue[0].pose[0] == 400
+
+
+def test_client_against_simulator():
+    sim = XArmSimulator(port=0, normal_port=0, rich_port=0, latency=0.01, report_rate=200).start()
+
+    async def run():
+        arm = AsyncXArmAPI('127.0.0.1')
+        arm.arm_cmd = await UxbusCmdAio.open('127.0.0.1', sim.ports['control'])
+        start = time.monotonic()
+        assert (await arm.get_state()) == (0, 2)
+        assert time.monotonic() - start >= 0.01
+        await arm.get_position(is_radian=True)
+        arm._last_position = arm._position
+        assert await arm.set_position(x=250, speed=500, wait=True, timeout=5) == 0
+        code, pose = await arm.get_position()
+        assert code == 0 and abs(pose[0] - 250) < 1e-3
+
+        normal = []
+        async for item in arm.reports(sim.ports['normal']):
+            normal.append(item)
+            if len(normal) == 5:
+                break
+        assert normal[-1]['state'] == 2 and abs(normal[-1]['cartesian'][0] - 250) < 1e-3
+
+        reader, writer = await asyncio.open_connection('127.0.0.1', sim.ports['rich'])
+        frame = await reader.readexactly(report.RICH_SIZE)
+        writer.close()
+        assert report.HEAD.unpack_from(frame)[0] == report.RICH_SIZE
+        arm_type, axis = report.unpack_rich(frame)[:2]
+        assert axis == 6
+        await arm.disconnect()
+
+    try:
+        asyncio.run(run())
+    finally:
+        sim.stop()
+
+
+def test_threaded_api_against_simulator(monkeypatch):
+    sim = XArmSimulator(port=0, normal_port=0, rich_port=0, latency=0.005, report_rate=100).start()
+    # XArmAPI always connects to the standard ports, point them at the simulator
+    monkeypatch.setattr(XCONF.SocketConf, 'TCP_CONTROL_PORT', sim.ports['control'])
+    monkeypatch.setattr(XCONF.SocketConf, 'TCP_REPORT_NORM_PORT', sim.ports['normal'])
+    monkeypatch.setattr(XCONF.SocketConf, 'TCP_REPORT_RICH_PORT', sim.ports['rich'])
+    arm = XArmAPI('127.0.0.1')
+    try:
+        assert arm.connected
+        arm.motion_enable(enable=True)
+        arm.set_mode(0)
+        arm.set_state(0)
+        assert arm.set_position(x=250, y=0, z=150, roll=180, pitch=0, yaw=0, speed=500, wait=True, timeout=5) == 0
+        code, pose = arm.get_position()
+        assert code == 0 and abs(pose[0] - 250) < 1e-3 and abs(pose[2] - 150) < 1e-3
+
+        commands = sim.commands
+        assert arm.set_pipeline_depth(8) == 0
+        for i in range(1, 11):
+            assert arm.set_position(x=250, y=i * 5, z=150, speed=1000, radius=2) == 0
+        assert arm.drain_pipeline(timeout=5) == 0
+        assert arm.set_pipeline_depth(0) == 0
+        assert sim.commands - commands >= 10
+        assert arm.set_position(x=250, y=50, z=150, wait=True, timeout=5) == 0
+        code, pose = arm.get_position()
+        assert code == 0 and abs(pose[1] - 50) < 1e-3
+    finally:
+        arm.disconnect()
+        sim.stop()
@@ -0,0 +1,39 @@
+import struct
+
+from xarm.core.utils import convert
+from xarm.core.wrapper.uxbus_cmd_tcp import UxbusCmdTcp
+
+
+class RecordingPort:
+    def __init__(self):
+        self.sent = []
+        self.rx_que = None
+        self.rx_parse = None
+
+    def write(self, data):
+        self.sent.append(bytes(data))
+        return 0
+
+
+def test_batch_encoders_match_per_value_packing():
+    values = [300.5, -12.25, 158.0, 180.0, 0.0, -90.125, 100, 2000, 0]
+    assert convert.fp32s_to_bytes(values, 9) == b''.join(struct.pack('<f', v) for v in values)
+    assert convert.fp32s_to_bytes(values, 3) == b''.join(struct.pack('<f', v) for v in values[:3])
+
+    ints = [1, -1, 2**31 - 1, -2**31]
+    assert convert.int32s_to_bytes(ints, 4) == b''.join(struct.pack('<i', v) for v in ints)
+
+    u16s = [0, 1, 256, 65535, 65536 + 7, -1]
+    assert convert.u16s_to_bytes(u16s, 6) == b''.join(convert.u16_to_bytes(v) for v in u16s)
+    assert convert.u16s_to_bytes(u16s, 0) == b''
+
+
+def test_send_xbus_frame():
+    port = RecordingPort()
+    cmd = UxbusCmdTcp(port)
+    payload = convert.fp32s_to_bytes([1.0, 2.0, 3.0], 3)
+
+    assert cmd.send_xbus(21, payload, 12) == 0
+    assert cmd.send_xbus(22, 0, 0) == 0
+    assert port.sent[0] == bytes([0, 1, 0, 2, 0, 13, 21]) + payload
+    assert port.sent[1] == bytes([0, 2, 0, 2, 0, 1, 22])
@@ -36,6 +36,7 @@ class Port(threading.Thread):
         self.com = None
         self.rx_parse = RxParse(self.rx_que)
         self.com_read = None
+        self.com_read_into = None
         self.com_write = None
         self.port_type = ''
         self.buffer_size = 1
@@ -48,7 +49,10 @@ class Port(threading.Thread):
 
     def run(self):
         if self.port_type == 'report-socket':
-            self.recv_report_proc()
+            if self.com_read_into is not None:
+                self.recv_report_into_proc()
+            else:
+                self.recv_report_proc()
         else:
             self.recv_proc()
             # self.recv_loop()
@@ -243,6 +247,86 @@ class Port(threading.Thread):
         logger.debug('[{}] recv thread had stopped'.format(self.port_type))
         self._connected = False
 
+    def recv_report_into_proc(self, recv_buf_size=64 * 1024):
+        """
+        Report receive loop that reads with recv_into as much as is
+        available into a preallocated bytearray, and hands every whole
+        frame to rx_parse as a memoryview into it, without copying.
+        Consumers may keep those views, so received data is never
+        overwritten: when the buffer runs out of room a new one is
+        allocated and only the partial frame at its end is copied over.
+        """
+        self.alive = True
+        logger.debug('[{}] recv thread start'.format(self.port_type))
+        failed_read_count = 0
+        timeout_count = 0
+        size = 0
+        size_is_not_confirm = False
+
+        buf = memoryview(bytearray(recv_buf_size))
+        start = 0  # start of the next frame
+        end = 0  # end of the received data
+
+        try:
+            while self.connected and self.alive:
+                if recv_buf_size - end < max(self.buffer_size, size):
+                    new_buf = memoryview(bytearray(recv_buf_size))
+                    new_buf[:end - start] = buf[start:end]
+                    buf, start, end = new_buf, 0, end - start
+                try:
+                    num = self.com_read_into(buf[end:])
+                except socket.timeout:
+                    timeout_count += 1
+                    if timeout_count > 3:
+                        self._connected = False
+                        logger.error('[{}] socket read timeout'.format(self.port_type))
+                        break
+                    continue
+                if num == 0:
+                    failed_read_count += 1
+                    if failed_read_count > 5:
+                        self._connected = False
+                        logger.error('[{}] socket read failed, len=0'.format(self.port_type))
+                        break
+                    time.sleep(0.1)
+                    continue
+                timeout_count = 0
+                failed_read_count = 0
+                end += num
+
+                while end - start >= 4:
+                    length = convert.bytes_to_u32(buf[start:start + 4])
+                    if size == 0:
+                        size = length
+                        if size == 233:
+                            size_is_not_confirm = True
+                            size = 245
+                        logger.info('report_data_size: {}, size_is_not_confirm={}'.format(size, size_is_not_confirm))
+                    if end - start < size:
+                        break
+                    if size_is_not_confirm:
+                        size_is_not_confirm = False
+                        if convert.bytes_to_u32(buf[start + 233:start + 237]) == 233:
+                            size = 233
+                            start += 233
+                            continue
+                    if length != size:
+                        logger.error('report data error, close, length={}, size={}'.format(length, size))
+                        self.alive = False
+                        break
+
+                    if self.rx_que.qsize() > 1:
+                        self.rx_que.get()
+                    self.rx_parse.put(buf[start:start + size])
+                    start += size
+        except Exception as e:
+            if self.alive:
+                logger.error('[{}] recv error: {}'.format(self.port_type, e))
+        finally:
+            self.close()
+        logger.debug('[{}] recv thread had stopped'.format(self.port_type))
+        self._connected = False
+
     def recv_proc(self):
         self.alive = True
         logger.debug('[{}] recv thread start'.format(self.port_type))
@@ -136,6 +136,7 @@ class SocketPort(Port):
             # time.sleep(1)
 
             self.com_read = self.com.recv
+            self.com_read_into = self.com.recv_into
             self.com_write = self.com.send
             self.write_lock = threading.Lock()
             self.start()
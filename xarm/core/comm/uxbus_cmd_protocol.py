@@ -8,7 +8,9 @@
 # Author: Vinman <vinman.wen@ufactory.cc> <vinman.cub@gmail.com>
 
 
+import threading
 from ..utils import crc16
+from ..utils import convert
 from ..utils.log import logger
 
 # ux2_hex_protocol define
@@ -98,3 +100,83 @@ class Ux2HexProtocol(object):
                     self.rx_que.put(self.rxbuf)
                     # print(self.rxbuf)
 
+
+class PendingResponse(object):
+    """
+    Reply slot for one request, filled by UxbusTcpDispatcher. If a callback
+    is given it is called with the slot on the recv thread once filled.
+    """
+    __slots__ = ('bus_flag', 'data', 'callback', 'sent_time', '_event')
+
+    def __init__(self, bus_flag, callback=None):
+        self.bus_flag = bus_flag
+        self.data = None
+        self.callback = callback
+        self.sent_time = 0
+        self._event = threading.Event()
+
+    def set(self, data):
+        self.data = data
+        self._event.set()
+        if self.callback is not None:
+            self.callback(self)
+
+    def wait(self, timeout=None):
+        """
+        :return: the reply frame, or None on timeout
+        """
+        self._event.wait(timeout)
+        return self.data
+
+
+class UxbusTcpDispatcher(object):
+    """
+    rx_parse for the uxbus tcp port. Splits the received stream into reply
+    frames by their length field and hands each one to the request waiting
+    on its transaction number (bus_flag), so a caller wakes as soon as its
+    reply arrives and stale replies never reach it.
+    """
+    HEAD_LEN = 6
+
+    def __init__(self, rx_que):
+        self.rx_que = rx_que
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._rxbuf = bytearray()
+
+    def expect(self, bus_flag, callback=None):
+        """
+        Register for the reply to bus_flag, before the request is sent
+        :return: PendingResponse
+        """
+        pending = PendingResponse(bus_flag, callback)
+        with self._lock:
+            self._pending[bus_flag] = pending
+        return pending
+
+    def cancel(self, bus_flag):
+        """
+        :return: True if the reply was still outstanding
+        """
+        with self._lock:
+            return self._pending.pop(bus_flag, None) is not None
+
+    def flush(self, fromid=-1, toid=-1):
+        # Replies are matched by bus_flag, there is nothing stale to wipe
+        pass
+
+    def put(self, rxstr):
+        self._rxbuf += rxstr
+        while len(self._rxbuf) >= self.HEAD_LEN:
+            size = convert.bytes_to_u16(self._rxbuf[4:6]) + self.HEAD_LEN
+            if len(self._rxbuf) < size:
+                break
+            data = bytes(self._rxbuf[:size])
+            del self._rxbuf[:size]
+            bus_flag = convert.bytes_to_u16(data[0:2])
+            with self._lock:
+                pending = self._pending.pop(bus_flag, None)
+            if pending is not None:
+                pending.set(data)
+            else:
+                logger.verbose('drop unmatched reply, bus_flag={}'.format(bus_flag))
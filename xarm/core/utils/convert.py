@@ -24,10 +24,7 @@ def int32_to_bytes(data, is_big_endian=False):
 def int32s_to_bytes(data, n):
     """小端字节序"""
     assert n > 0
-    ret = int32_to_bytes(data[0])
-    for i in range(1, n):
-        ret += int32_to_bytes(data[i])
-    return ret
+    return struct.pack('<%di' % n, *data[:n])
 
 
 def bytes_to_fp32(data):
@@ -43,10 +40,7 @@ def bytes_to_fp32(data):
 def fp32s_to_bytes(data, n):
     """小端字节序"""
     assert n > 0
-    ret = fp32_to_bytes(data[0])
-    for i in range(1, n):
-        ret += fp32_to_bytes(data[i])
-    return ret
+    return struct.pack('<%df' % n, *data[:n])
 
 
 def bytes_to_fp32s(data, n):
@@ -66,12 +60,9 @@ def u16_to_bytes(data):
 
 def u16s_to_bytes(data, num):
     """大端字节序"""
-    bts = b''
-    if num != 0:
-        bts = u16_to_bytes(data[0])
-        for i in range(1, num):
-            bts += u16_to_bytes(data[i])
-    return bts
+    if num == 0:
+        return b''
+    return struct.pack('>%dH' % num, *(val & 0xFFFF for val in data[:num]))
 
 
 def bytes_to_u16(data):
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+#
+# Precompiled decoders for the report socket frames. Each layout is read
+# with a few struct.Struct.unpack_from calls at fixed offsets instead of
+# one convert call per value. The uxbus header fields are big endian and
+# the float blocks are little endian, so a layout is split where the byte
+# order changes.
+
+import struct
+
+# Common to the real, normal and rich reports
+HEAD = struct.Struct('>IBH')            # 0: length, state | mode << 4, cmd_num
+MOTION = struct.Struct('<7f6f7f')       # 7: angles, pose, torque
+MOTION_SIZE = 87
+
+# Real report
+REAL_FT = struct.Struct('<12f')         # 87: ft_ext_force, ft_raw_force
+REAL_FT_SIZE = 135
+
+# Normal report (and the head of the rich report)
+NORMAL = struct.Struct('<4B6f4f2B3f')   # 87: mtbrake, mtable, error_code, warn_code, pose_offset,
+                                        #     tcp_load, collis_sens, teach_sens, gravity_direction
+NORMAL_SIZE = 145
+
+# Rich report
+RICH = struct.Struct('<6B30x12f16B')    # 145: arm_type, axis, master_id, slave_id, motor_tid, motor_fid,
+                                        #      (version), trs_msg, p2p_msg, rot_msg, servo_codes
+RICH_SIZE = 245
+RICH_TEMPERATURES = struct.Struct('7B')  # 245
+RICH_SPEEDS = struct.Struct('<8f')      # 252: tcp speed, joint speeds
+RICH_COUNT = struct.Struct('>I')        # 284
+RICH_WORLD_OFFSET = struct.Struct('<6f')  # 288
+RICH_GPIO_RESET = struct.Struct('2B')   # 312
+RICH_IO = struct.Struct('<3B6f')        # 314: is_simulation_robot, collision_detection, tool_type, tool_params
+RICH_VOLTAGES = struct.Struct('>7H')    # 341
+RICH_CURRENTS = struct.Struct('<7f')    # 355
+RICH_CGPIO = struct.Struct('>2B8H8B8B')  # 383: cgpio states, digital inputs/outputs
+RICH_CGPIO_1300 = struct.Struct('8B8B')  # 417: extra digital inputs/outputs of the 1300 control box
+RICH_FT = struct.Struct('<12f')         # 433: ft_ext_force, ft_raw_force
+RICH_IDEN_PROGRESS = 481
+RICH_POSE_AA = struct.Struct('<3f')     # 482
+
+
+def unpack_motion(data):
+    """
+    Decode the part shared by every report layout.
+    :return: length, state, mode, cmd_num, angles, pose, torque
+    """
+    length, state_mode, cmd_num = HEAD.unpack_from(data, 0)
+    values = MOTION.unpack_from(data, 7)
+    return (length, state_mode & 0x0F, state_mode >> 4, cmd_num,
+            list(values[:7]), list(values[7:13]), list(values[13:]))
+
+
+def unpack_real(data):
+    """
+    Decode a real time report frame.
+    :return: length, state, mode, cmd_num, angles, pose, torque, ft_ext_force, ft_raw_force
+        the force values are None if the frame has no FT sensor data
+    """
+    motion = unpack_motion(data)
+    if len(data) >= REAL_FT_SIZE:
+        ft = REAL_FT.unpack_from(data, MOTION_SIZE)
+        return motion + (list(ft[:6]), list(ft[6:]))
+    return motion + (None, None)
+
+
+def unpack_normal(data):
+    """
+    Decode a normal report frame, or the normal part of a rich one.
+    :return: length, state, mode, cmd_num, angles, pose, torque,
+        mtbrake, mtable, error_code, warn_code, pose_offset, tcp_load,
+        collis_sens, teach_sens, gravity_direction
+    """
+    values = NORMAL.unpack_from(data, MOTION_SIZE)
+    return unpack_motion(data) + values[:4] + (
+        list(values[4:10]), list(values[10:14]), values[14], values[15], list(values[16:]))
+
+
+def unpack_rich(data):
+    """
+    Decode the fixed rich report fields after the normal part.
+    :return: arm_type, axis, master_id, slave_id, motor_tid, motor_fid,
+        trs_msg, p2p_msg, rot_msg, servo_codes
+    """
+    values = RICH.unpack_from(data, NORMAL_SIZE)
+    return values[:6] + (values[6:11], values[11:16], values[16:18], values[18:])
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+
+import struct
+import asyncio
+from ..utils import convert
+from ..utils.log import logger
+from ..config.x_config import XCONF
+from .uxbus_cmd_tcp import TX2_PROT_CON, TX2_BUS_FLAG_MIN, TX2_BUS_FLAG_MAX, XBUS_HEAD
+
+REPLY_HEAD = struct.Struct('>HHH')  # bus_flag, prot_flag, length
+
+
+class UxbusCmdAio(object):
+    """
+    The uxbus TCP protocol on asyncio streams. Every request gets a future
+    keyed by its bus_flag, which the read task resolves when the reply
+    arrives, so any number of coroutines can await commands at once
+    without a thread per request.
+    """
+    def __init__(self, reader, writer, timeout=None):
+        self.reader = reader
+        self.writer = writer
+        self.bus_flag = TX2_BUS_FLAG_MIN
+        self.prot_flag = TX2_PROT_CON
+        self._SET_TIMEOUT = XCONF.UxbusConf.SET_TIMEOUT / 1000 if timeout is None else timeout
+        self._GET_TIMEOUT = XCONF.UxbusConf.GET_TIMEOUT / 1000 if timeout is None else timeout
+        self._pending = {}
+        self._state_is_ready = False
+        self._has_err_warn = False
+        self.last_comm_time = 0
+        self._recv_task = asyncio.ensure_future(self._recv_loop())
+
+    @classmethod
+    async def open(cls, host, port=XCONF.SocketConf.TCP_CONTROL_PORT, timeout=None, connect_timeout=10):
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), connect_timeout)
+        return cls(reader, writer, timeout=timeout)
+
+    @property
+    def connected(self):
+        return not self._recv_task.done()
+
+    @property
+    def state_is_ready(self):
+        return self._state_is_ready
+
+    @property
+    def has_err_warn(self):
+        return self._has_err_warn
+
+    async def close(self):
+        self._recv_task.cancel()
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+    async def _recv_loop(self):
+        try:
+            while True:
+                head = await self.reader.readexactly(REPLY_HEAD.size)
+                bus_flag, _, length = REPLY_HEAD.unpack(head)
+                body = await self.reader.readexactly(length)
+                future = self._pending.pop(bus_flag, None)
+                if future is not None and not future.done():
+                    future.set_result(body)
+        except (asyncio.IncompleteReadError, ConnectionError, OSError) as e:
+            logger.error('[aio] control socket closed, {}'.format(e))
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError('control socket closed'))
+            self._pending.clear()
+
+    def check_xbus_state(self, state):
+        self._state_is_ready = not (state & 0x10)
+        if state & 0x08:
+            return XCONF.UxbusState.INVALID
+        if state & 0x40:
+            self._has_err_warn = True
+            return XCONF.UxbusState.ERR_CODE
+        if state & 0x20:
+            self._has_err_warn = True
+            return XCONF.UxbusState.WAR_CODE
+        self._has_err_warn = False
+        return 0
+
+    async def send(self, funcode, datas=b'', num=0, timeout=None):
+        """
+        Send one request and wait for its reply
+        :param funcode: uxbus register
+        :param datas: payload bytes
+        :param num: number of reply payload bytes
+        :param timeout: seconds, default is the set timeout
+        :return: [code, byte0, byte1, ...], num payload bytes after the code
+        """
+        if not self.connected:
+            return [XCONF.UxbusState.ERR_NOTTCP] * (num + 1)
+        bus_flag = self.bus_flag
+        self.bus_flag = TX2_BUS_FLAG_MIN if bus_flag >= TX2_BUS_FLAG_MAX else bus_flag + 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[bus_flag] = future
+        self.writer.write(XBUS_HEAD.pack(bus_flag, self.prot_flag, len(datas) + 1, funcode) + bytes(datas))
+        try:
+            await self.writer.drain()
+            body = await asyncio.wait_for(future, self._SET_TIMEOUT if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            self._pending.pop(bus_flag, None)
+            return [XCONF.UxbusState.ERR_TOUT] * (num + 1)
+        except (ConnectionError, OSError):
+            self._pending.pop(bus_flag, None)
+            return [XCONF.UxbusState.ERR_NOTTCP] * (num + 1)
+        self.last_comm_time = asyncio.get_running_loop().time()
+        ret = [0] * (num + 1)
+        if body[0] != funcode:
+            ret[0] = XCONF.UxbusState.ERR_FUN
+            return ret
+        ret[0] = self.check_xbus_state(body[1])
+        if ret[0] in [0, XCONF.UxbusState.ERR_CODE, XCONF.UxbusState.WAR_CODE]:
+            ret[1:num + 1] = body[2:num + 2]
+            if len(body) - 2 < num and ret[0] == 0:
+                ret[0] = XCONF.UxbusState.ERR_LENG
+        return ret
+
+    async def set_nu8(self, funcode, datas, num, timeout=None):
+        return await self.send(funcode, bytes(datas[:num]) if num else b'', 0, timeout=timeout)
+
+    async def get_nu8(self, funcode, num):
+        return await self.send(funcode, b'', num, timeout=self._GET_TIMEOUT)
+
+    async def set_nfp32(self, funcode, datas, num):
+        return await self.send(funcode, convert.fp32s_to_bytes(datas, num))
+
+    async def get_nfp32(self, funcode, num):
+        ret = await self.send(funcode, b'', num * 4, timeout=self._GET_TIMEOUT)
+        data = [0] * (1 + num)
+        data[0] = ret[0]
+        data[1:num + 1] = convert.bytes_to_fp32s(bytes(ret[1:num * 4 + 1]), num)
+        return data
+
+    async def motion_en(self, axis_id, enable):
+        return await self.set_nu8(XCONF.UxbusReg.MOTION_EN, [axis_id, int(enable)], 2,
+                                  timeout=max(self._SET_TIMEOUT, 2))
+
+    async def set_state(self, value):
+        return await self.set_nu8(XCONF.UxbusReg.SET_STATE, [value], 1)
+
+    async def get_state(self):
+        return await self.get_nu8(XCONF.UxbusReg.GET_STATE, 1)
+
+    async def get_err_code(self):
+        return await self.get_nu8(XCONF.UxbusReg.GET_ERROR, 2)
+
+    async def clean_err(self):
+        return await self.set_nu8(XCONF.UxbusReg.CLEAN_ERR, [], 0)
+
+    async def clean_war(self):
+        return await self.set_nu8(XCONF.UxbusReg.CLEAN_WAR, [], 0)
+
+    async def set_mode(self, mode):
+        return await self.set_nu8(XCONF.UxbusReg.SET_MODE, [mode], 1)
+
+    async def move_line(self, mvpose, mvvelo, mvacc, mvtime):
+        return await self.set_nfp32(XCONF.UxbusReg.MOVE_LINE, list(mvpose[:6]) + [mvvelo, mvacc, mvtime], 9)
+
+    async def move_lineb(self, mvpose, mvvelo, mvacc, mvtime, mvradii):
+        return await self.set_nfp32(XCONF.UxbusReg.MOVE_LINEB, list(mvpose[:6]) + [mvvelo, mvacc, mvtime, mvradii], 10)
+
+    async def move_joint(self, mvjoint, mvvelo, mvacc, mvtime):
+        return await self.set_nfp32(XCONF.UxbusReg.MOVE_JOINT, list(mvjoint[:7]) + [mvvelo, mvacc, mvtime], 10)
+
+    async def get_tcp_pose(self):
+        return await self.get_nfp32(XCONF.UxbusReg.GET_TCP_POSE, 6)
+
+    async def get_joint_pos(self):
+        return await self.get_nfp32(XCONF.UxbusReg.GET_JOINT_POS, 7)
@@ -81,9 +81,9 @@ class UxbusCmdSer(UxbusCmd):
         return ret
 
     def send_xbus(self, reg, txdata, num):
-        send_data = bytes([self.fromid, self.toid, num + 1, reg])
-        for i in range(num):
-            send_data += bytes([txdata[i]])
+        send_data = bytearray([self.fromid, self.toid, num + 1, reg])
+        if num > 0:
+            send_data.extend(txdata[:num])
         send_data += crc16.crc_modbus(send_data)
         self.arm_port.flush()
         if self._debug:
@@ -9,7 +9,10 @@
 
 
 import time
+import struct
+import threading
 from ..utils import convert
+from ..comm.uxbus_cmd_protocol import UxbusTcpDispatcher
 from .uxbus_cmd import UxbusCmd, lock_require
 from ..config.x_config import XCONF
 
@@ -19,6 +22,20 @@ TX2_PROT_HEAT = 1  # tcp heat prot
 TX2_BUS_FLAG_MIN = 1  # cmd序号 起始值
 TX2_BUS_FLAG_MAX = 5000  # cmd序号 最大值
 
+XBUS_HEAD = struct.Struct('>HHHB')  # bus_flag, prot_flag, length, funcode
+
+# Motion commands that may be pipelined, their replies carry only a status
+PIPELINE_FUNCODES = {
+    XCONF.UxbusReg.MOVE_LINE,
+    XCONF.UxbusReg.MOVE_LINEB,
+    XCONF.UxbusReg.MOVE_JOINT,
+    XCONF.UxbusReg.MOVE_JOINTB,
+    XCONF.UxbusReg.MOVE_CIRCLE,
+    XCONF.UxbusReg.MOVE_LINE_TOOL,
+    XCONF.UxbusReg.MOVE_RELATIVE,
+    XCONF.UxbusReg.MOVE_LINE_AA,
+}
+
 
 def debug_log_datas(datas, label=''):
     print('{}:'.format(label), end=' ')
@@ -38,6 +55,16 @@ class UxbusCmdTcp(UxbusCmd):
         self.TX2_PROT_CON = TX2_PROT_CON
         self._has_err_warn = False
         self._last_comm_time = time.monotonic()
+        self._dispatcher = UxbusTcpDispatcher(arm_port.rx_que)
+        self._pending = None
+        arm_port.rx_parse = self._dispatcher
+
+        # Pipelined motion commands, see set_pipeline
+        self._pipeline_depth = 0
+        self._in_flight = None
+        self._outstanding = {}
+        self._outstanding_lock = threading.Lock()
+        self._pipeline_code = 0
 
     @property
     def has_err_warn(self):
@@ -58,6 +85,73 @@ class UxbusCmdTcp(UxbusCmd):
     def get_prot_flag(self):
         return self.prot_flag
 
+    def set_pipeline(self, depth):
+        """
+        Pipelined mode: up to depth motion commands (PIPELINE_FUNCODES) may
+        wait for their replies at once. They return 0 as soon as they are
+        sent, replies are matched by bus_flag in the background and any
+        error is reported by drain(). Not for use with only_check_type,
+        whose results come back in the reply.
+        :param depth: commands in flight, 0 to wait for every reply
+        """
+        self.drain()
+        self._pipeline_depth = depth
+        self._in_flight = threading.BoundedSemaphore(depth) if depth > 0 else None
+        return 0
+
+    def drain(self, timeout=None):
+        """
+        Wait for the replies of all pipelined commands
+        :return: first error code since the last drain, or 0
+        """
+        timeout = self._SET_TIMEOUT if timeout is None else timeout
+        expired = time.monotonic() + timeout
+        while self._outstanding and time.monotonic() < expired:
+            with self._outstanding_lock:
+                pending = next(iter(self._outstanding.values()), None)
+            if pending is not None:
+                pending.wait(max(0, expired - time.monotonic()))
+        self._expire_outstanding(expired)
+        code, self._pipeline_code = self._pipeline_code, 0
+        return code
+
+    def _pipeline_reply(self, pending):
+        with self._outstanding_lock:
+            if self._outstanding.pop(pending.bus_flag, None) is None:
+                return
+        self._in_flight.release()
+        self._last_comm_time = time.monotonic()
+        code = self.check_xbus_state(pending.data[7])
+        if code not in [0, XCONF.UxbusState.WAR_CODE] and self._pipeline_code == 0:
+            self._pipeline_code = code
+
+    def _expire_outstanding(self, before):
+        """
+        Give up on pipelined replies sent before the given time
+        """
+        with self._outstanding_lock:
+            expired = [pending for pending in self._outstanding.values() if pending.sent_time < before]
+            for pending in expired:
+                del self._outstanding[pending.bus_flag]
+        for pending in expired:
+            self._dispatcher.cancel(pending.bus_flag)
+            self._in_flight.release()
+            if self._pipeline_code == 0:
+                self._pipeline_code = XCONF.UxbusState.ERR_TOUT
+
+    def check_xbus_state(self, state):
+        self._state_is_ready = not (state & 0x10)
+        if state & 0x08:
+            return XCONF.UxbusState.INVALID
+        if state & 0x40:
+            self._has_err_warn = True
+            return XCONF.UxbusState.ERR_CODE
+        if state & 0x20:
+            self._has_err_warn = True
+            return XCONF.UxbusState.WAR_CODE
+        self._has_err_warn = False
+        return 0
+
     def check_xbus_prot(self, data, funcode):
         num = convert.bytes_to_u16(data[0:2])
         prot = convert.bytes_to_u16(data[2:4])
@@ -76,16 +170,9 @@ class UxbusCmdTcp(UxbusCmd):
             return XCONF.UxbusState.ERR_PROT
         if fun != funcode:
             return XCONF.UxbusState.ERR_FUN
-        self._state_is_ready = not (state & 0x10)
-        if state & 0x08:
-            return XCONF.UxbusState.INVALID
-        if state & 0x40:
-            self._has_err_warn = True
-            return XCONF.UxbusState.ERR_CODE
-        if state & 0x20:
-            self._has_err_warn = True
-            return XCONF.UxbusState.WAR_CODE
-        self._has_err_warn = False
+        code = self.check_xbus_state(state)
+        if code != 0:
+            return code
         if len(data) != length + 6:
             return XCONF.UxbusState.ERR_LENG
         # if state & 0x10:
@@ -93,50 +180,63 @@ class UxbusCmdTcp(UxbusCmd):
         return 0
 
     def send_pend(self, funcode, num, timeout):
-        ret = [0] * 320 if num == -1 else [0] * (num + 1)
-        ret[0] = XCONF.UxbusState.ERR_TOUT
-        expired = time.monotonic() + timeout
-        while time.monotonic() < expired:
-            remaining = expired - time.monotonic()
-            rx_data = self.arm_port.read(remaining)
-            if rx_data != -1 and len(rx_data) > 7:
-                self._last_comm_time = time.monotonic()
-                if self._debug:
-                    debug_log_datas(rx_data, label='recv({})'.format(funcode))
-                code = self.check_xbus_prot(rx_data, funcode)
-                if code in [0, XCONF.UxbusState.ERR_CODE, XCONF.UxbusState.WAR_CODE, XCONF.UxbusState.STATE_NOT_READY]:
-                    ret[0] = code
-                    num = (convert.bytes_to_u16(rx_data[4:6]) - 2) if num == -1 else num
-                    ret = ret[:num + 1] if len(ret) <= num + 1 else [ret[0]] * (num + 1)
-                    length = len(rx_data) - 8
-                    for i in range(num):
-                        if i >= length:
-                            break
-                        ret[i + 1] = rx_data[i + 8]
-                    return ret
-                elif code != XCONF.UxbusState.ERR_NUM:
-                    ret[0] = code
-                    return ret
+        pending, self._pending = self._pending, None
+        if pending is not None and pending.callback is not None:
+            # Pipelined, the reply is checked when it arrives
+            return [0] * (num + 1)
+        rx_data = pending.wait(timeout) if pending is not None else None
+        if rx_data is None or len(rx_data) <= 7:
+            if pending is not None:
+                self._dispatcher.cancel(pending.bus_flag)
+            ret = [0] * 320 if num == -1 else [0] * (num + 1)
+            ret[0] = XCONF.UxbusState.ERR_TOUT
+            return ret
+        self._last_comm_time = time.monotonic()
+        if self._debug:
+            debug_log_datas(rx_data, label='recv({})'.format(funcode))
+        code = self.check_xbus_prot(rx_data, funcode)
+        if code in [0, XCONF.UxbusState.ERR_CODE, XCONF.UxbusState.WAR_CODE, XCONF.UxbusState.STATE_NOT_READY]:
+            if num == -1:
+                num = convert.bytes_to_u16(rx_data[4:6]) - 2
+                ret = [code] * (num + 1) if num + 1 < 320 else [code] + [0] * num
             else:
-                time.sleep(0.001)
-            # time.sleep(0.0005)
+                ret = [code] + [0] * num
+            length = min(num, len(rx_data) - 8)
+            ret[1:length + 1] = rx_data[8:8 + length]
+            return ret
+        ret = [0] * 320 if num == -1 else [0] * (num + 1)
+        ret[0] = code
         return ret
 
     def send_xbus(self, funcode, datas, num):
-        send_data = convert.u16_to_bytes(self.bus_flag)
-        send_data += convert.u16_to_bytes(self.prot_flag)
-        send_data += convert.u16_to_bytes(num + 1)
-        send_data += bytes([funcode])
+        # Header and payload assembled in one buffer
+        send_data = bytearray(XBUS_HEAD.size)
+        XBUS_HEAD.pack_into(send_data, 0, self.bus_flag, self.prot_flag, num + 1, funcode)
         if type(datas) == str:
             send_data += datas.encode()
-        else:
-            for i in range(num):
-                send_data += bytes([datas[i]])
-        self.arm_port.flush()
+        elif num > 0:
+            send_data.extend(datas[:num])
         if self._debug:
             debug_log_datas(send_data, label='send({})'.format(funcode))
+        # Register for the reply before it can arrive
+        if self._in_flight is not None and funcode in PIPELINE_FUNCODES:
+            if not self._in_flight.acquire(timeout=self._SET_TIMEOUT):
+                self._expire_outstanding(time.monotonic() - self._SET_TIMEOUT)
+                if not self._in_flight.acquire(timeout=self._SET_TIMEOUT):
+                    return -1
+            self._pending = self._dispatcher.expect(self.bus_flag, callback=self._pipeline_reply)
+            self._pending.sent_time = time.monotonic()
+            with self._outstanding_lock:
+                self._outstanding[self.bus_flag] = self._pending
+        else:
+            self._pending = self._dispatcher.expect(self.bus_flag)
         ret = self.arm_port.write(send_data)
         if ret != 0:
+            if self._dispatcher.cancel(self.bus_flag) and self._pending.callback is not None:
+                with self._outstanding_lock:
+                    self._outstanding.pop(self.bus_flag, None)
+                self._in_flight.release()
+            self._pending = None
             return -1
         self.bus_flag += 1
         if self.bus_flag > TX2_BUS_FLAG_MAX:
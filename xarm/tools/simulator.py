@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+
+"""
+Local xArm controller simulator, for running the SDK, and anything built on
+it, without an arm:
+
+    python -m xarm.tools.simulator --latency 0.002 --report-rate 100
+
+then connect to 127.0.0.1 (e.g. config.xarm1_port = '127.0.0.1'). The
+control port answers the uxbus TCP protocol and the report ports push
+normal and rich report frames. Motion is integrated in cartesian space at
+the commanded speed; there is no kinematics or dynamics, joint angles only
+change with joint moves, and anything the simulator does not know is
+acknowledged without data.
+"""
+
+import math
+import struct
+import asyncio
+import argparse
+import threading
+from ..core.config.x_config import XCONF
+from ..core.utils import report
+from ..core.utils.log import logger
+from ..core.wrapper.uxbus_cmd_tcp import XBUS_HEAD
+
+REPLY_HEAD = struct.Struct('>HHHBB')  # bus_flag, prot_flag, length, funcode, state
+
+VERSION = '6,6,XS1200000000,AC1200000000,v2.0.0'
+ROBOT_SN = 'XS1200000000\0AC1200000000'
+HOME_POSE = [207, 0, 112, math.pi, 0, 0]  # mm, rad
+TRS_MSG = [1000, 1.0, 50000, 0.1, 1000]  # tcp jerk, min/max acc, min/max speed
+P2P_MSG = [20, 0.01, 20.0, 0.0001, 4.0]  # joint jerk, min/max acc, min/max speed
+ROT_MSG = [1000, 50000]  # rot jerk, max acc
+
+
+class Move(object):
+    __slots__ = ('pose', 'angles', 'speed', 'radius')
+
+    def __init__(self, pose=None, angles=None, speed=100, radius=-1):
+        self.pose = pose
+        self.angles = angles
+        self.speed = speed
+        self.radius = radius
+
+
+class XArmSimulator(object):
+    def __init__(self, host='127.0.0.1', port=XCONF.SocketConf.TCP_CONTROL_PORT,
+                 normal_port=XCONF.SocketConf.TCP_REPORT_NORM_PORT,
+                 rich_port=XCONF.SocketConf.TCP_REPORT_RICH_PORT,
+                 latency=0.0, report_rate=100, tick=0.004, axis=6):
+        """
+        :param host: address to listen on
+        :param port: control port, 0 for any free port
+        :param normal_port: normal report port, 0 for any free port, None to disable
+        :param rich_port: rich report port, 0 for any free port, None to disable
+        :param latency: seconds between receiving a command and sending its response
+        :param report_rate: report frames per second
+        :param tick: seconds per motion integration step
+        :param axis: number of joints
+        """
+        self.host = host
+        self.ports = {'control': port, 'normal': normal_port, 'rich': rich_port}
+        self.latency = latency
+        self.report_rate = report_rate
+        self.tick = tick
+        self.axis = axis
+
+        self.state = 2  # 1: moving, 2: ready, 3: paused, 4: stopped
+        self.mode = 0
+        self.motion_enabled = 0xFF
+        self.error_code = 0
+        self.warn_code = 0
+        self.pose = list(HOME_POSE)
+        self.angles = [0.0] * 7
+        self.queue = []
+        self.commands = 0  # commands received, for benchmarks
+
+        self._loop = None
+        self._servers = []
+        self._thread = None
+        self._started = threading.Event()
+
+    # Motion
+
+    def _step(self, dt):
+        if self.state >= 3:
+            return
+        while self.queue:
+            move = self.queue[0]
+            if move.angles is not None:
+                self.angles = move.angles
+                self.queue.pop(0)
+                continue
+            delta = [t - p for t, p in zip(move.pose[:3], self.pose[:3])]
+            distance = math.sqrt(sum(d * d for d in delta))
+            step = move.speed * dt
+            # blended moves hand over to the next one within radius
+            arrive = max(move.radius, 0) if len(self.queue) > 1 else 0
+            if distance - step <= arrive or distance == 0:
+                self.pose = list(move.pose)
+                self.queue.pop(0)
+                dt = max(0, dt - distance / move.speed) if move.speed > 0 else 0
+                if dt > 0:
+                    continue
+                break
+            ratio = step / distance
+            self.pose = [p + (t - p) * ratio for t, p in zip(move.pose, self.pose)]
+            break
+        self.state = 1 if self.queue else 2
+
+    def _add_move(self, move):
+        if self.state == 4 or not self.motion_enabled:
+            return 0x10
+        if self.mode == 7 or self.mode == 1:
+            # online planning and servo mode replace the running command
+            self.queue = [move]
+        else:
+            self.queue.append(move)
+        self.state = 1
+        return 0
+
+    # Commands
+
+    def _state_flags(self):
+        flags = 0
+        if self.state >= 4 or not self.motion_enabled:
+            flags |= 0x10
+        if self.error_code:
+            flags |= 0x40
+        elif self.warn_code:
+            flags |= 0x20
+        return flags
+
+    def handle(self, funcode, data):
+        """
+        Apply one command
+        :return: (state flags, response payload)
+        """
+        self.commands += 1
+        reg = XCONF.UxbusReg
+        flags = 0
+        payload = b''
+        if funcode == reg.GET_VERSION:
+            payload = VERSION.encode().ljust(40, b'\0')
+        elif funcode == reg.GET_ROBOT_SN:
+            payload = ROBOT_SN.encode().ljust(40, b'\0')
+        elif funcode == reg.GET_STATE:
+            payload = bytes([self.state])
+        elif funcode == reg.SET_STATE:
+            if data[0] == 4:
+                self.queue = []
+                self.state = 4
+            elif data[0] == 3:
+                self.state = 3
+            elif data[0] == 0:
+                self.state = 1 if self.queue else 2
+        elif funcode == reg.GET_CMDNUM:
+            payload = struct.pack('>H', len(self.queue))
+        elif funcode == reg.GET_ERROR:
+            payload = bytes([self.error_code, self.warn_code])
+        elif funcode == reg.CLEAN_ERR:
+            self.error_code = 0
+        elif funcode == reg.CLEAN_WAR:
+            self.warn_code = 0
+        elif funcode == reg.MOTION_EN:
+            mask = 0xFF if data[0] == 8 else 1 << (data[0] - 1)
+            self.motion_enabled = self.motion_enabled | mask if data[1] else self.motion_enabled & ~mask
+        elif funcode == reg.SET_MODE:
+            self.mode = data[0]
+            self.queue = []
+            self.state = 4
+        elif funcode == reg.GET_TCP_POSE:
+            payload = struct.pack('<6f', *self.pose)
+        elif funcode == reg.GET_JOINT_POS:
+            payload = struct.pack('<7f', *self.angles)
+        elif funcode in [reg.MOVE_LINE, reg.MOVE_LINEB, reg.MOVE_SERVO_CART]:
+            # MOVE_LINE carries a radius too since firmware 1.10.0
+            values = struct.unpack_from('<10f' if len(data) >= 40 else '<9f', data)
+            radius = values[9] if len(values) > 9 else -1
+            flags = self._add_move(Move(pose=list(values[:6]), speed=values[6], radius=radius))
+        elif funcode == reg.MOVE_CIRCLE:
+            # through pose1 to pose2, the arc is approximated by its chord
+            values = struct.unpack_from('<16f', data)
+            flags = self._add_move(Move(pose=list(values[:6]), speed=values[12], radius=10))
+            if not flags:
+                self.queue.append(Move(pose=list(values[6:12]), speed=values[12]))
+        elif funcode in [reg.MOVE_JOINT, reg.MOVE_SERVOJ]:
+            flags = self._add_move(Move(angles=list(struct.unpack_from('<7f', data))))
+        return flags | self._state_flags(), payload
+
+    # Report frames
+
+    def normal_frame(self):
+        frame = bytearray(report.NORMAL_SIZE)
+        self._pack_normal(frame)
+        return frame
+
+    def rich_frame(self):
+        frame = bytearray(report.RICH_SIZE)
+        self._pack_normal(frame)
+        report.RICH.pack_into(frame, report.NORMAL_SIZE, 6 if self.axis != 7 else 1, self.axis, 0, 0, 0, 0,
+                              *(TRS_MSG + P2P_MSG + ROT_MSG + [0] * 16))
+        return frame
+
+    def _pack_normal(self, frame):
+        report.HEAD.pack_into(frame, 0, len(frame), self.state | self.mode << 4, len(self.queue))
+        report.MOTION.pack_into(frame, 7, *(self.angles + self.pose + [0.0] * 7))
+        report.NORMAL.pack_into(frame, report.MOTION_SIZE, self.motion_enabled, self.motion_enabled,
+                                self.error_code, self.warn_code, *([0.0] * 10), 3, 3, 0, 0, -1)
+
+    # Servers
+
+    async def _serve_control(self, reader, writer):
+        logger.info('[sim] control client connected')
+        try:
+            while True:
+                head = await reader.readexactly(XBUS_HEAD.size)
+                bus_flag, prot_flag, length, funcode = XBUS_HEAD.unpack(head)
+                data = await reader.readexactly(length - 1) if length > 1 else b''
+                if length == 2 and funcode == 0:
+                    continue  # heartbeat
+                flags, payload = self.handle(funcode, data)
+                reply = REPLY_HEAD.pack(bus_flag, prot_flag, len(payload) + 2, funcode, flags) + payload
+                if self.latency > 0:
+                    self._loop.call_later(self.latency, writer.write, reply)
+                else:
+                    writer.write(reply)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            logger.info('[sim] control client disconnected')
+
+    def _serve_report(self, make_frame):
+        async def serve(reader, writer):
+            period = 1.0 / self.report_rate
+            next_time = self._loop.time()
+            try:
+                while True:
+                    writer.write(make_frame())
+                    await writer.drain()
+                    next_time += period
+                    await asyncio.sleep(max(0, next_time - self._loop.time()))
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+            finally:
+                writer.close()
+        return serve
+
+    async def _integrate(self):
+        last = self._loop.time()
+        while True:
+            await asyncio.sleep(self.tick)
+            now = self._loop.time()
+            self._step(now - last)
+            last = now
+
+    async def serve(self):
+        """
+        Run the simulator in the current event loop until cancelled.
+        """
+        self._loop = asyncio.get_running_loop()
+        handlers = {'control': self._serve_control,
+                    'normal': self._serve_report(self.normal_frame),
+                    'rich': self._serve_report(self.rich_frame)}
+        for name, handler in handlers.items():
+            if self.ports[name] is None:
+                continue
+            server = await asyncio.start_server(handler, self.host, self.ports[name])
+            self.ports[name] = server.sockets[0].getsockname()[1]
+            self._servers.append(server)
+            logger.info('[sim] {} port {}'.format(name, self.ports[name]))
+        integrate = asyncio.ensure_future(self._integrate())
+        self._started.set()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            integrate.cancel()
+            for server in self._servers:
+                server.close()
+            self._servers = []
+
+    def start(self):
+        """
+        Run the simulator on a background thread, returns once it listens.
+        """
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._main()), daemon=True)
+        self._thread.start()
+        self._started.wait()
+        return self
+
+    async def _main(self):
+        self._task = asyncio.ensure_future(self.serve())
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._task.cancel)
+        if self._thread is not None:
+            self._thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='xArm controller simulator')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=XCONF.SocketConf.TCP_CONTROL_PORT)
+    parser.add_argument('--latency', type=float, default=0.0, help='response latency in seconds')
+    parser.add_argument('--report-rate', type=float, default=100, help='report frames per second')
+    args = parser.parse_args()
+    simulator = XArmSimulator(host=args.host, port=args.port, latency=args.latency, report_rate=args.report_rate)
+    try:
+        asyncio.run(simulator.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -2569,6 +2569,32 @@ class XArmAPI(object):
         :param timeout: seconds
         """
         return self._arm.set_timeout(timeout)
+
+    def set_pipeline_depth(self, depth):
+        """
+        Let up to depth motion commands (set_position, set_servo_angle, move_circle, ...)
+        wait for their responses at once, instead of waiting for each response before
+        sending the next command. Pipelined motion commands return 0 once sent; use
+        drain_pipeline to collect the result.
+        Note:
+            1. only available on the TCP connection
+            2. not compatible with set_only_check_type, whose result comes back in the response
+
+        :param depth: max commands in flight, 0 to wait for every response (default)
+        :return: code
+            code: See the [API Code Documentation](./xarm_api_code.md#api-code) for details.
+        """
+        return self._arm.set_pipeline_depth(depth)
+
+    def drain_pipeline(self, timeout=None):
+        """
+        Wait for the responses of all pipelined motion commands
+
+        :param timeout: seconds, default is the cmd timeout
+        :return: code, the first error since the last drain, or 0
+            code: See the [API Code Documentation](./xarm_api_code.md#api-code) for details.
+        """
+        return self._arm.drain_pipeline(timeout=timeout)
     
     def set_baud_checkset_enable(self, enable):
         """
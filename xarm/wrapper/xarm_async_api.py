@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+
+import math
+import asyncio
+from ..core.config.x_config import XCONF
+from ..core.utils import convert
+from ..core.utils import report as report_decode
+from ..core.utils.log import logger
+from ..core.wrapper.uxbus_cmd_aio import UxbusCmdAio
+from ..x3.code import APIState
+
+
+class AsyncXArmAPI(object):
+    def __init__(self, port=None, is_radian=False, timeout=None):
+        """
+        Asyncio client of xArm, for use from coroutines instead of threads.
+        It speaks the same uxbus TCP protocol as XArmAPI on asyncio streams,
+        so many calls can be awaited at once without blocking a thread each.
+        Only the core motion, state and report calls are available, use
+        XArmAPI for everything else.
+
+        Example:
+            arm = AsyncXArmAPI('192.168.1.185')
+            await arm.connect()
+            await arm.set_position(x=300, y=0, z=200, wait=True)
+            async for report in arm.reports():
+                print(report['cartesian'])
+
+        :param port: ip-address(such as '192.168.1.185')
+        :param is_radian: set the default unit is radians or not, default is False
+        :param timeout: seconds to wait for a response, default is the XArmAPI cmd timeout
+        """
+        self._port = port
+        self._default_is_radian = is_radian
+        self._timeout = timeout
+        self.arm_cmd = None
+
+        self.state = 4
+        self.mode = 0
+        self.cmd_num = 0
+        self.error_code = 0
+        self.warn_code = 0
+        self._position = [201.5, 0, 140.5, 3.1415926, 0, 0]  # mm, rad
+        self._angles = [0] * 7  # rad
+        self._last_position = self._position.copy()
+        self._last_angles = self._angles.copy()
+        self._last_tcp_speed = 100  # mm/s
+        self._last_tcp_acc = 2000  # mm/s^2
+        self._last_joint_speed = 0.3490658503988659  # 20 °/s
+        self._last_joint_acc = 8.726646259971648  # 500 °/s^2
+
+    @property
+    def connected(self):
+        return self.arm_cmd is not None and self.arm_cmd.connected
+
+    @property
+    def position(self):
+        """
+        Cartesian position from the last report or get_position, [x(mm), y(mm), z(mm), roll, pitch, yaw]
+        """
+        return self._position[:3] + [self._to_unit(v) for v in self._position[3:]]
+
+    @property
+    def angles(self):
+        """
+        Servo angles from the last report or get_servo_angle
+        """
+        return [self._to_unit(v) for v in self._angles]
+
+    def _to_unit(self, value, is_radian=None):
+        is_radian = self._default_is_radian if is_radian is None else is_radian
+        return value if is_radian else math.degrees(value)
+
+    def _from_unit(self, value, is_radian=None):
+        is_radian = self._default_is_radian if is_radian is None else is_radian
+        return value if is_radian else math.radians(value)
+
+    async def connect(self, port=None):
+        """
+        Connect to the control port of xArm
+        :param port: ip-address, default is the port given to the constructor
+        """
+        self._port = port if port is not None else self._port
+        self.arm_cmd = await UxbusCmdAio.open(self._port, timeout=self._timeout)
+        code, pose = await self.get_position(is_radian=True)
+        if code == 0:
+            self._last_position = pose
+        code, angles = await self.get_servo_angle(is_radian=True)
+        if code == 0:
+            self._last_angles = angles
+        await self.get_state()
+        await self.get_err_warn_code()
+        logger.info('[aio] connected to {}'.format(self._port))
+
+    async def disconnect(self):
+        if self.arm_cmd is not None:
+            await self.arm_cmd.close()
+
+    def _check_code(self, code, is_move_cmd=False):
+        if is_move_cmd:
+            if code in [0, XCONF.UxbusState.WAR_CODE]:
+                return 0 if self.arm_cmd.state_is_ready else XCONF.UxbusState.STATE_NOT_READY
+            return code
+        return 0 if code in [0, XCONF.UxbusState.ERR_CODE, XCONF.UxbusState.WAR_CODE] else code
+
+    async def motion_enable(self, enable=True, servo_id=None):
+        ret = await self.arm_cmd.motion_en(8 if servo_id is None else servo_id, int(enable))
+        return ret[0]
+
+    async def set_mode(self, mode=0):
+        ret = await self.arm_cmd.set_mode(mode)
+        return ret[0]
+
+    async def set_state(self, state=0):
+        ret = await self.arm_cmd.set_state(state)
+        return ret[0]
+
+    async def get_state(self):
+        """
+        :return: tuple((code, state)), only when code is 0, the returned result is correct.
+        """
+        ret = await self.arm_cmd.get_state()
+        if ret[0] in [0, XCONF.UxbusState.ERR_CODE, XCONF.UxbusState.WAR_CODE]:
+            self.state = ret[1]
+            ret[0] = 0
+        return ret[0], self.state
+
+    async def get_err_warn_code(self):
+        """
+        :return: tuple((code, [error_code, warn_code])), only when code is 0, the returned result is correct.
+        """
+        ret = await self.arm_cmd.get_err_code()
+        if ret[0] in [0, XCONF.UxbusState.ERR_CODE, XCONF.UxbusState.WAR_CODE]:
+            self.error_code, self.warn_code = ret[1:3]
+            ret[0] = 0
+        return ret[0], [self.error_code, self.warn_code]
+
+    async def clean_error(self):
+        ret = await self.arm_cmd.clean_err()
+        return ret[0]
+
+    async def clean_warn(self):
+        ret = await self.arm_cmd.clean_war()
+        return ret[0]
+
+    async def emergency_stop(self):
+        return await self.set_state(4)
+
+    async def get_position(self, is_radian=None):
+        """
+        :return: tuple((code, [x, y, z, roll, pitch, yaw])), only when code is 0, the returned result is correct.
+        """
+        ret = await self.arm_cmd.get_tcp_pose()
+        code = self._check_code(ret[0])
+        if code == 0:
+            self._position = ret[1:7]
+        return code, self._position[:3] + [self._to_unit(v, is_radian) for v in self._position[3:]]
+
+    async def get_servo_angle(self, is_radian=None):
+        """
+        :return: tuple((code, [angle1, ..., angle7])), only when code is 0, the returned result is correct.
+        """
+        ret = await self.arm_cmd.get_joint_pos()
+        code = self._check_code(ret[0])
+        if code == 0:
+            self._angles = ret[1:8]
+        return code, [self._to_unit(v, is_radian) for v in self._angles]
+
+    async def set_position(self, x=None, y=None, z=None, roll=None, pitch=None, yaw=None, radius=None,
+                           speed=None, mvacc=None, mvtime=None, is_radian=None, wait=False, timeout=None):
+        """
+        Absolute linear motion, see XArmAPI.set_position. Omitted coordinates keep
+        the last used value.
+        :return: code
+        """
+        pose = self._last_position.copy()
+        for i, value in enumerate([x, y, z]):
+            if value is not None:
+                pose[i] = value
+        for i, value in enumerate([roll, pitch, yaw]):
+            if value is not None:
+                pose[3 + i] = self._from_unit(value, is_radian)
+        if speed is not None:
+            self._last_tcp_speed = speed
+        if mvacc is not None:
+            self._last_tcp_acc = mvacc
+        mvtime = 0 if mvtime is None else mvtime
+        if radius is not None and radius >= 0:
+            ret = await self.arm_cmd.move_lineb(pose, self._last_tcp_speed, self._last_tcp_acc, mvtime, radius)
+        else:
+            ret = await self.arm_cmd.move_line(pose, self._last_tcp_speed, self._last_tcp_acc, mvtime)
+        code = self._check_code(ret[0], is_move_cmd=True)
+        if code == 0:
+            self._last_position = pose
+            if wait:
+                code = await self.wait_move(timeout)
+        return code
+
+    async def set_servo_angle(self, angle=None, speed=None, mvacc=None, mvtime=None,
+                              is_radian=None, wait=False, timeout=None):
+        """
+        Absolute joint motion of all servos, see XArmAPI.set_servo_angle
+        :return: code
+        """
+        angles = self._last_angles.copy()
+        for i, value in enumerate(angle or []):
+            if value is not None:
+                angles[i] = self._from_unit(value, is_radian)
+        if speed is not None:
+            self._last_joint_speed = self._from_unit(speed, is_radian)
+        if mvacc is not None:
+            self._last_joint_acc = self._from_unit(mvacc, is_radian)
+        mvtime = 0 if mvtime is None else mvtime
+        ret = await self.arm_cmd.move_joint(angles, self._last_joint_speed, self._last_joint_acc, mvtime)
+        code = self._check_code(ret[0], is_move_cmd=True)
+        if code == 0:
+            self._last_angles = angles
+            if wait:
+                code = await self.wait_move(timeout)
+        return code
+
+    async def wait_move(self, timeout=None, interval=0.05):
+        """
+        Wait until the arm has stopped moving
+        :param timeout: seconds, None to wait forever
+        :return: code
+        """
+        expired = None if timeout is None else asyncio.get_running_loop().time() + timeout
+        await asyncio.sleep(interval)
+        while expired is None or asyncio.get_running_loop().time() < expired:
+            code, state = await self.get_state()
+            if code != 0:
+                return code
+            if self.arm_cmd.has_err_warn:
+                code, (error_code, _) = await self.get_err_warn_code()
+                if error_code != 0:
+                    return APIState.HAS_ERROR
+            if state >= 4:
+                return APIState.EMERGENCY_STOP
+            if state != 1:
+                return 0
+            await asyncio.sleep(interval)
+        return APIState.WAIT_FINISH_TIMEOUT
+
+    async def reports(self, port=XCONF.SocketConf.TCP_REPORT_NORM_PORT):
+        """
+        Report frames as they arrive, as an async iterator of dicts with the keys
+        state, mode, cmdnum, joints, cartesian, and for the normal and rich
+        reports also error_code, warn_code, mtable and mtbrake. The cached
+        state, position and angles follow the reports. Ends when the report
+        socket closes.
+        :param port: report port, default is the normal report
+        """
+        reader, writer = await asyncio.open_connection(self._port, port)
+        carry = b''
+        size = 0
+        try:
+            while True:
+                head = carry + await reader.readexactly(4 - len(carry))
+                carry = b''
+                length = convert.bytes_to_u32(head)
+                if size == 0:
+                    size = length
+                    frame = head + await reader.readexactly(size - 4)
+                    if size == 233:
+                        # rich report of old firmware, 233 or 245 bytes long
+                        probe = await reader.readexactly(4)
+                        if convert.bytes_to_u32(probe) == 233:
+                            carry = probe
+                        else:
+                            size = 245
+                            frame += probe + await reader.readexactly(8)
+                else:
+                    frame = head + await reader.readexactly(size - 4)
+                yield self._decode_report(frame)
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            logger.error('[aio] report socket closed, {}'.format(e))
+        finally:
+            writer.close()
+
+    def _decode_report(self, frame):
+        if len(frame) >= report_decode.NORMAL_SIZE:
+            values = report_decode.unpack_normal(frame)
+        else:
+            values = report_decode.unpack_motion(frame)
+        _, self.state, self.mode, self.cmd_num, angles, pose, _ = values[:7]
+        self._angles = angles
+        self._position = pose
+        ret = {
+            'state': self.state,
+            'mode': self.mode,
+            'cmdnum': self.cmd_num,
+            'joints': self.angles,
+            'cartesian': self.position,
+        }
+        if len(values) > 7:
+            mtbrake, mtable, self.error_code, self.warn_code = values[7:11]
+            ret['error_code'] = self.error_code
+            ret['warn_code'] = self.warn_code
+            ret['mtable'] = [bool(mtable >> i & 0x01) for i in range(8)]
+            ret['mtbrake'] = [bool(mtbrake >> i & 0x01) for i in range(8)]
+        return ret
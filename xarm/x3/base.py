@@ -32,6 +32,7 @@ from ..core.comm import SerialPort, SocketPort
 from ..core.wrapper import UxbusCmdSer, UxbusCmdTcp
 from ..core.utils.log import logger, pretty_print
 from ..core.utils import convert
+from ..core.utils import report
 from ..core.config.x_code import ControllerWarn, ControllerError, ControllerErrorCodeMap, ControllerWarnCodeMap
 from .utils import compare_time, compare_version, filter_invaild_number
 from .decorator import xarm_is_connected, xarm_is_ready, xarm_is_not_simulation_mode, xarm_wait_until_cmdnum_lt_max, xarm_wait_until_not_pause
@@ -980,6 +981,21 @@ class Base(BaseObject, Events):
         if self.arm_cmd is not None:
             self._cmd_timeout = self.arm_cmd.set_timeout(self._cmd_timeout)
         return self._cmd_timeout
+
+    def set_pipeline_depth(self, depth):
+        if self.arm_cmd is None or not hasattr(self.arm_cmd, 'set_pipeline'):
+            return APIState.NOT_CONNECTED if self.arm_cmd is None else APIState.API_EXCEPTION
+        if depth > 0 and self._only_check_type > 0:
+            return APIState.API_EXCEPTION
+        self.log_api_info('API -> set_pipeline_depth -> depth={}'.format(depth), code=0)
+        return self.arm_cmd.set_pipeline(depth)
+
+    def drain_pipeline(self, timeout=None):
+        if self.arm_cmd is None or not hasattr(self.arm_cmd, 'drain'):
+            return 0
+        code = self.arm_cmd.drain(timeout)
+        self.log_api_info('API -> drain_pipeline -> code={}'.format(code), code=code)
+        return code
     
     def set_baud_checkset_enable(self, enable):
         self._baud_checkset = enable
@@ -1383,11 +1399,8 @@ class Base(BaseObject, Events):
             self._first_report_over = True
 
         def __handle_report_real(rx_data):
-            state, mode = rx_data[4] & 0x0F, rx_data[4] >> 4
-            cmd_num = convert.bytes_to_u16(rx_data[5:7])
-            angles = convert.bytes_to_fp32s(rx_data[7:7 * 4 + 7], 7)
-            pose = convert.bytes_to_fp32s(rx_data[35:6 * 4 + 35], 6)
-            torque = convert.bytes_to_fp32s(rx_data[59:7 * 4 + 59], 7)
+            (_, state, mode, cmd_num, angles, pose, torque,
+             ft_ext_force, ft_raw_force) = report.unpack_real(rx_data)
             if cmd_num != self._cmd_num:
                 self._cmd_num = cmd_num
                 self._report_cmdnum_changed_callback()
@@ -1419,11 +1432,10 @@ class Base(BaseObject, Events):
             if not self._is_sync and self._state not in [4, 5]:
                 self._sync()
                 self._is_sync = True
-            length = len(rx_data)
-            if length >= 135:
+            if ft_ext_force is not None:
                 # FT_SENSOR
-                self._ft_ext_force = convert.bytes_to_fp32s(rx_data[87:111], 6)
-                self._ft_raw_force = convert.bytes_to_fp32s(rx_data[111:135], 6)
+                self._ft_ext_force = ft_ext_force
+                self._ft_raw_force = ft_raw_force
 
         def __handle_report_normal(rx_data):
             report_time = time.monotonic()
@@ -1431,23 +1443,16 @@ class Base(BaseObject, Events):
             self._max_report_interval = max(self._max_report_interval, interval)
             self._last_report_time = report_time
             # print('length:', convert.bytes_to_u32(rx_data[0:4]), len(rx_data))
-            state, mode = rx_data[4] & 0x0F, rx_data[4] >> 4
+            (length, state, mode, cmd_num, angles, pose, torque,
+             mtbrake, mtable, error_code, warn_code, pose_offset, tcp_load,
+             collis_sens, teach_sens, gravity_direction) = report.unpack_normal(rx_data)
             # if state != self._state or mode != self._mode:
             #     print('mode: {}, state={}, time={}'.format(mode, state, time.monotonic()))
-            cmd_num = convert.bytes_to_u16(rx_data[5:7])
-            angles = convert.bytes_to_fp32s(rx_data[7:7 * 4 + 7], 7)
-            pose = convert.bytes_to_fp32s(rx_data[35:6 * 4 + 35], 6)
-            torque = convert.bytes_to_fp32s(rx_data[59:7 * 4 + 59], 7)
-            mtbrake, mtable, error_code, warn_code = rx_data[87:91]
-            pose_offset = convert.bytes_to_fp32s(rx_data[91:6 * 4 + 91], 6)
-            tcp_load = convert.bytes_to_fp32s(rx_data[115:4 * 4 + 115], 4)
-            collis_sens, teach_sens = rx_data[131:133]
             # if (collis_sens not in list(range(6)) or teach_sens not in list(range(6))) \
             #         and ((error_code != 0 and error_code not in controller_error_keys) or (warn_code != 0 and warn_code not in controller_warn_keys)):
             #     self._stream_report.close()
             #     logger.warn('ReportDataException: data={}'.format(rx_data))
             #     return
-            length = convert.bytes_to_u32(rx_data[0:4])
             data_len = len(rx_data)
             if (length != data_len and (length != 233 or data_len != 245)) or collis_sens not in list(range(6)) or teach_sens not in list(range(6)) \
                 or mode not in list(range(12)) or state not in list(range(10)):
@@ -1459,7 +1464,7 @@ class Base(BaseObject, Events):
                     state, mode, collis_sens, teach_sens, error_code, warn_code
                 ))
                 return
-            self._gravity_direction = convert.bytes_to_fp32s(rx_data[133:3*4 + 133], 3)
+            self._gravity_direction = gravity_direction
 
             reset_tgpio_params = False
             reset_linear_track_params = False
@@ -1618,14 +1623,17 @@ class Base(BaseObject, Events):
              self._arm_master_id,
              self._arm_slave_id,
              self._arm_motor_tid,
-             self._arm_motor_fid) = rx_data[145:151]
+             self._arm_motor_fid,
+             trs_msg,
+             p2p_msg,
+             rot_msg,
+             servo_codes) = report.unpack_rich(rx_data)
 
             if 7 >= arm_axis >= 5:
                 self._arm_axis = arm_axis
 
             # self._version = str(rx_data[151:180], 'utf-8')
 
-            trs_msg = convert.bytes_to_fp32s(rx_data[181:201], 5)
             # trs_msg = [i[0] for i in trs_msg]
             (self._tcp_jerk,
              self._min_tcp_acc,
@@ -1636,7 +1644,6 @@ class Base(BaseObject, Events):
             #     self._tcp_jerk, self._min_tcp_acc, self._max_tcp_acc, self._min_tcp_speed, self._max_tcp_speed
             # ))
 
-            p2p_msg = convert.bytes_to_fp32s(rx_data[201:221], 5)
             # p2p_msg = [i[0] for i in p2p_msg]
             (self._joint_jerk,
              self._min_joint_acc,
@@ -1648,12 +1655,10 @@ class Base(BaseObject, Events):
             #     self._min_joint_speed, self._max_joint_speed
             # ))
 
-            rot_msg = convert.bytes_to_fp32s(rx_data[221:229], 2)
             # rot_msg = [i[0] for i in rot_msg]
             self._rot_jerk, self._max_rot_acc = rot_msg
             # print('rot_jerk: {}, mac_acc: {}'.format(self._rot_jerk, self._max_rot_acc))
 
-            servo_codes = [val for val in rx_data[229:245]]
             for i in range(self.axis):
                 if self._servo_codes[i][0] != servo_codes[i * 2] or self._servo_codes[i][1] != servo_codes[i * 2 + 1]:
                     print('servo_error_code, servo_id={}, status={}, code={}'.format(i + 1, servo_codes[i * 2], servo_codes[i * 2 + 1]))
@@ -1665,24 +1670,24 @@ class Base(BaseObject, Events):
             # length = convert.bytes_to_u32(rx_data[0:4])
             length = len(rx_data)
             if length >= 252:
-                temperatures = list(map(int, rx_data[245:252]))
+                temperatures = list(report.RICH_TEMPERATURES.unpack_from(rx_data, 245))
                 if temperatures != self.temperatures:
                     self._temperatures = temperatures
                     self._report_temperature_changed_callback()
             if length >= 284:
-                speeds = convert.bytes_to_fp32s(rx_data[252:8 * 4 + 252], 8)
+                speeds = list(report.RICH_SPEEDS.unpack_from(rx_data, 252))
                 self._realtime_tcp_speed = speeds[0]
                 self._realtime_joint_speeds = speeds[1:]
                 # print(speeds[0], speeds[1:])
             if length >= 288:
-                count = convert.bytes_to_u32(rx_data[284:288])
+                count, = report.RICH_COUNT.unpack_from(rx_data, 284)
                 # print(count, rx_data[284:288])
                 if self._count != -1 and count != self._count:
                     self._count = count
                     self._report_count_changed_callback()
                 self._count = count
             if length >= 312:
-                world_offset = convert.bytes_to_fp32s(rx_data[288:6 * 4 + 288], 6)
+                world_offset = list(report.RICH_WORLD_OFFSET.unpack_from(rx_data, 288))
                 for i in range(len(world_offset)):
                     if i < 3:
                         world_offset[i] = float('{:.3f}'.format(world_offset[i]))
@@ -1691,40 +1696,42 @@ class Base(BaseObject, Events):
                 if math.inf not in world_offset and -math.inf not in world_offset and not (10 <= self._error_code <= 17):
                     self._world_offset = world_offset
             if length >= 314:
-                self._cgpio_reset_enable, self._tgpio_reset_enable = rx_data[312:314]
+                self._cgpio_reset_enable, self._tgpio_reset_enable = report.RICH_GPIO_RESET.unpack_from(rx_data, 312)
             if length >= 417:
-                self._is_simulation_robot = bool(rx_data[314])
-                self._is_collision_detection, self._collision_tool_type = rx_data[315:317]
-                self._collision_tool_params = convert.bytes_to_fp32s(rx_data[317:341], 6)
+                io = report.RICH_IO.unpack_from(rx_data, 314)
+                self._is_simulation_robot = bool(io[0])
+                self._is_collision_detection, self._collision_tool_type = io[1:3]
+                self._collision_tool_params = list(io[3:])
 
-                voltages = convert.bytes_to_u16s(rx_data[341:355], 7)
+                voltages = report.RICH_VOLTAGES.unpack_from(rx_data, 341)
                 voltages = list(map(lambda x: x / 100, voltages))
                 self._voltages = voltages
 
-                currents = convert.bytes_to_fp32s(rx_data[355:383], 7)
+                currents = list(report.RICH_CURRENTS.unpack_from(rx_data, 355))
                 self._currents = currents
 
-                cgpio_states = []
-                cgpio_states.extend(rx_data[383:385])
-                cgpio_states.extend(convert.bytes_to_u16s(rx_data[385:401], 8))
+                cgpio = report.RICH_CGPIO.unpack_from(rx_data, 383)
+                cgpio_states = list(cgpio[:10])
                 cgpio_states[6:10] = list(map(lambda x: x / 4095.0 * 10.0, cgpio_states[6:10]))
-                cgpio_states.append(list(map(int, rx_data[401:409])))
-                cgpio_states.append(list(map(int, rx_data[409:417])))
+                cgpio_states.append(list(cgpio[10:18]))
+                cgpio_states.append(list(cgpio[18:26]))
                 if self._control_box_type_is_1300 and length >= 433:
-                    cgpio_states[-2].extend(list(map(int, rx_data[417:425])))
-                    cgpio_states[-1].extend(list(map(int, rx_data[425:433])))
+                    cgpio_1300 = report.RICH_CGPIO_1300.unpack_from(rx_data, 417)
+                    cgpio_states[-2].extend(cgpio_1300[:8])
+                    cgpio_states[-1].extend(cgpio_1300[8:])
                 self._cgpio_states = cgpio_states
             if length >= 481:
                 # FT_SENSOR
-                self._ft_ext_force = convert.bytes_to_fp32s(rx_data[433:457], 6)
-                self._ft_raw_force = convert.bytes_to_fp32s(rx_data[457:481], 6)
+                ft = report.RICH_FT.unpack_from(rx_data, 433)
+                self._ft_ext_force = list(ft[:6])
+                self._ft_raw_force = list(ft[6:])
             if length >= 482:
-                iden_progress = rx_data[481]
+                iden_progress = rx_data[report.RICH_IDEN_PROGRESS]
                 if iden_progress != self._iden_progress:
                     self._iden_progress = iden_progress
                     self._report_iden_progress_changed_callback()
             if length >= 494:
-                pose_aa = convert.bytes_to_fp32s(rx_data[482:494], 3)
+                pose_aa = list(report.RICH_POSE_AA.unpack_from(rx_data, 482))
                 for i in range(len(pose_aa)):
                     pose_aa[i] = filter_invaild_number(pose_aa[i], 6, default=self._pose_aa[i])
                 self._pose_aa = self._position[:3] + pose_aa